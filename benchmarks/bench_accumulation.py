@@ -0,0 +1,163 @@
+"""Benchmarks the training with different micro-batch sizes and numbers of
+gradient accumulation steps.
+
+For each setting `<micro-batch size>x<accumulation steps>`, a fresh process
+trains the full model (VGG16 with random weights, its last layers trainable)
+for one epoch over synthetic images and reports the throughput (images/sec)
+and the peak resident memory (RSS), both in total and above the RSS before
+the training. Settings with the same effective batch size make the same
+number of updates of the weights.
+
+Usage:
+    python -m benchmarks.bench_accumulation --settings 16x1 8x2 4x4
+"""
+
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import multiprocessing
+
+from pathlib import Path
+from zipfile import ZipFile
+
+from benchmarks.synthetic_data import create_synthetic_dataset
+from benchmarks.bench_decoding import _rss_mb
+
+
+def _run(
+    data_dir: str,
+    batch_size: int,
+    accumulation_steps: int,
+    image_size: int,
+    trainable_layers: int,
+    queue,
+):
+    """Trains the model for one epoch, in a fresh process."""
+    import tensorflow as tf
+
+    from DeepClassifier.components.prepare_base_model import PrepareBaseModel
+    from DeepClassifier.components.training_models import GradientAccumulationModel
+
+    model = PrepareBaseModel._prepare_full_model(
+        base_model=tf.keras.applications.vgg16.VGG16(
+            input_shape=[image_size, image_size, 3], weights=None, include_top=False
+        ),
+        classes=2,
+        freeze_all=False,
+        freeze_till=trainable_layers,
+        learning_rate=0.01,
+    )
+    if accumulation_steps > 1:
+        model = GradientAccumulationModel(
+            model=model, accumulation_steps=accumulation_steps
+        )
+        model.compile_like_wrapped_model()
+
+    generator = tf.keras.preprocessing.image.ImageDataGenerator(
+        rescale=1.0 / 255
+    ).flow_from_directory(
+        directory=data_dir,
+        target_size=(image_size, image_size),
+        batch_size=batch_size,
+        interpolation="bilinear",
+    )
+    steps_per_epoch = generator.samples // batch_size
+
+    rss_before = _rss_mb()
+    start_time = time.perf_counter()
+    model.fit(generator, epochs=1, steps_per_epoch=steps_per_epoch, verbose=0)
+    seconds = time.perf_counter() - start_time
+    # `ru_maxrss` is in KB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    queue.put(
+        {
+            "effective_batch_size": batch_size * accumulation_steps,
+            "updates": steps_per_epoch // accumulation_steps,
+            "images_per_second": steps_per_epoch * batch_size / seconds,
+            "peak_rss_mb": peak_rss,
+            "peak_rss_increase_mb": peak_rss - rss_before,
+        }
+    )
+
+
+def benchmark(
+    data_dir: Path,
+    batch_size: int,
+    accumulation_steps: int,
+    image_size: int,
+    trainable_layers: int,
+) -> dict:
+    """Runs the benchmark of a setting in a fresh process, so that the peak
+    RSS of one setting does not hide the one of the others.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=_run,
+        args=(
+            str(data_dir),
+            batch_size,
+            accumulation_steps,
+            image_size,
+            trainable_layers,
+            queue,
+        ),
+    )
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--settings",
+        nargs="+",
+        default=["16x1", "8x2", "4x4"],
+        help="<micro-batch size>x<accumulation steps>",
+    )
+    parser.add_argument("--images", type=int, default=64)
+    parser.add_argument("--image-size", type=int, default=224)
+    parser.add_argument(
+        "--trainable-layers",
+        type=int,
+        default=4,
+        help="Number of layers (from the end) of VGG16 that are trained",
+    )
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="deep_classifier_accumulation_"))
+    try:
+        zip_path = workdir / "data.zip"
+        create_synthetic_dataset(
+            path=zip_path,
+            images_per_class=args.images // 2,
+            corrupt_fraction=0.0,
+            zero_byte_fraction=0.0,
+        )
+        with ZipFile(zip_path) as zf:
+            zf.extractall(workdir)
+
+        results = {}
+        for setting in args.settings:
+            batch_size, accumulation_steps = map(int, setting.split("x"))
+            results[setting] = benchmark(
+                data_dir=workdir / "PetImages",
+                batch_size=batch_size,
+                accumulation_steps=accumulation_steps,
+                image_size=args.image_size,
+                trainable_layers=args.trainable_layers,
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
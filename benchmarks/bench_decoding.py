@@ -0,0 +1,126 @@
+"""Benchmarks the input pipeline with full and scaled JPEG decoding.
+
+For each mode, a fresh process iterates once over a `DirectoryIterator` of
+synthetic JPEG images and reports the throughput (images/sec) and the peak
+resident memory (RSS), both in total and above the RSS before the iteration.
+
+Usage:
+    python -m benchmarks.bench_decoding --images 400 --min-size 500 --max-size 1000
+"""
+
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import multiprocessing
+
+from pathlib import Path
+from zipfile import ZipFile
+
+from benchmarks.synthetic_data import create_synthetic_dataset
+
+
+def _rss_mb() -> float:
+    """Returns the current RSS of the process in MB."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _run(data_dir: str, scaled_decoding: bool, image_size: int, batch_size: int, queue):
+    """Iterates once over the images, in a fresh process."""
+    import tensorflow as tf
+
+    from DeepClassifier.components.image_loading import flow_from_directory
+
+    generator = flow_from_directory(
+        datagen=tf.keras.preprocessing.image.ImageDataGenerator(rescale=1.0 / 255),
+        directory=data_dir,
+        scaled_decoding=scaled_decoding,
+        target_size=(image_size, image_size),
+        batch_size=batch_size,
+        interpolation="bilinear",
+        shuffle=False,
+    )
+    rss_before = _rss_mb()
+    start_time = time.perf_counter()
+    for index in range(len(generator)):
+        generator[index]
+    seconds = time.perf_counter() - start_time
+    # `ru_maxrss` is in KB on Linux
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    queue.put(
+        {
+            "images_per_second": generator.samples / seconds,
+            "peak_rss_mb": peak_rss,
+            "peak_rss_increase_mb": peak_rss - rss_before,
+        }
+    )
+
+
+def benchmark(
+    data_dir: Path, scaled_decoding: bool, image_size: int, batch_size: int
+) -> dict:
+    """Runs the benchmark of a mode in a fresh process, so that the peak RSS
+    of one mode does not hide the one of the other.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(
+        target=_run,
+        args=(str(data_dir), scaled_decoding, image_size, batch_size, queue),
+    )
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--images", type=int, default=400)
+    parser.add_argument("--min-size", type=int, default=500)
+    parser.add_argument("--max-size", type=int, default=1000)
+    parser.add_argument("--image-size", type=int, default=224)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="deep_classifier_decoding_"))
+    try:
+        zip_path = workdir / "data.zip"
+        create_synthetic_dataset(
+            path=zip_path,
+            images_per_class=args.images // 2,
+            min_size=args.min_size,
+            max_size=args.max_size,
+            corrupt_fraction=0.0,
+            zero_byte_fraction=0.0,
+        )
+        with ZipFile(zip_path) as zf:
+            zf.extractall(workdir)
+
+        results = {
+            mode: benchmark(
+                data_dir=workdir / "PetImages",
+                scaled_decoding=mode == "scaled",
+                image_size=args.image_size,
+                batch_size=args.batch_size,
+            )
+            for mode in ["full", "scaled"]
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results["speedup"] = (
+        results["scaled"]["images_per_second"] / results["full"]["images_per_second"]
+    )
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Benchmarks the memory of concurrent inference workers and their cold-start
+load time, with `tf.keras.models.load_model` on the `.h5` model and with the
+memory-mapped flat weights file.
+
+For each format, the files are evicted from the page cache, then `--workers`
+fresh processes load the model and predict a batch at the same time. While all
+of them are alive, each one reports its load time and its resident memory:
+the private (anonymous) part, the part shared with the page cache (file), and
+its proportional share (PSS), in which the shared pages are divided among the
+processes that map them.
+
+Usage:
+    python -m benchmarks.bench_shared_weights --workers 4
+"""
+
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+
+import numpy as np
+
+from pathlib import Path
+
+
+def _memory_mb() -> dict:
+    """Returns the RSS of the process, its anonymous and file parts, and its
+    PSS, in MB.
+    """
+    memory = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, value = line.split(":", 1)
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                memory[key] = int(value.split()[0]) / 1024
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                memory["Pss"] = int(line.split()[1]) / 1024
+    return {
+        "rss_mb": memory["VmRSS"],
+        "rss_anonymous_mb": memory["RssAnon"],
+        "rss_file_mb": memory["RssFile"],
+        "pss_mb": memory["Pss"],
+    }
+
+
+def _evict_from_page_cache(path: Path):
+    """Drops the pages of a file from the page cache, so that the next load is
+    a cold start.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def _save_models(directory: Path, image_size: int) -> dict:
+    """Saves the full model as `.h5` and as a flat weights file."""
+    import tensorflow as tf
+
+    from DeepClassifier.components.prepare_base_model import PrepareBaseModel
+    from DeepClassifier.components.shared_weights import save_flat_model
+
+    model = PrepareBaseModel._prepare_full_model(
+        base_model=tf.keras.applications.vgg16.VGG16(
+            input_shape=[image_size, image_size, 3], weights=None, include_top=False
+        ),
+        classes=2,
+        freeze_all=True,
+        freeze_till=None,
+        learning_rate=0.01,
+    )
+    paths = {"h5": directory / "model.h5", "flat": directory / "model.flat"}
+    model.save(paths["h5"])
+    save_flat_model(model=model, path=paths["flat"])
+    return {name: str(path) for name, path in paths.items()}
+
+
+def _worker(model_format: str, path: str, image_size: int, barrier, queue):
+    """Loads the model and predicts a batch, in a fresh process."""
+    import tensorflow as tf
+
+    from DeepClassifier.components.shared_weights import load_flat_model
+
+    start_time = time.perf_counter()
+    if model_format == "flat":
+        model = load_flat_model(path=Path(path))
+    else:
+        model = tf.keras.models.load_model(path)
+    load_seconds = time.perf_counter() - start_time
+    model.predict(np.zeros((4, image_size, image_size, 3), dtype=np.float32), verbose=0)
+
+    # Measuring while all the workers hold the model
+    barrier.wait()
+    queue.put({"load_seconds": load_seconds, **_memory_mb()})
+    barrier.wait()
+
+
+def benchmark(model_format: str, path: str, workers: int, image_size: int) -> dict:
+    """Runs `workers` concurrent workers and returns their mean results, and
+    the total PSS of the workers.
+    """
+    _evict_from_page_cache(Path(path))
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    queue = context.Queue()
+    processes = [
+        context.Process(
+            target=_worker, args=(model_format, path, image_size, barrier, queue)
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    summary = {
+        key: float(np.mean([result[key] for result in results])) for key in results[0]
+    }
+    summary["total_pss_mb"] = float(sum(result["pss_mb"] for result in results))
+    summary["file_size_mb"] = os.path.getsize(path) / 1024**2
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--image-size", type=int, default=224)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="deep_classifier_shared_weights_"))
+    try:
+        # Saving the models in a separate process, so that the workers do not
+        # find the weights in the page cache
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            paths = pool.apply(_save_models, (workdir, args.image_size))
+
+        results = {
+            model_format: benchmark(
+                model_format=model_format,
+                path=path,
+                workers=args.workers,
+                image_size=args.image_size,
+            )
+            for model_format, path in paths.items()
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmarks the full model with and without XLA (`jit_compile`) on CPU.
+
+For each mode, it reports the compile time (the time of the first step, which
+traces and compiles the model) and the steady-state throughput (images/sec)
+of training and inference steps on synthetic inputs.
+
+Usage:
+    python benchmarks/bench_xla.py --image-size 224 --batch-size 16 --steps 10
+"""
+
+import json
+import time
+import argparse
+
+import numpy as np
+import tensorflow as tf
+
+from DeepClassifier.components.prepare_base_model import PrepareBaseModel
+
+
+def build_model(image_size: int, jit_compile: bool) -> tf.keras.Model:
+    """Builds the full model from an untrained VGG16 base model."""
+    base_model = tf.keras.applications.vgg16.VGG16(
+        input_shape=[image_size, image_size, 3], weights=None, include_top=False
+    )
+    return PrepareBaseModel._prepare_full_model(
+        base_model=base_model,
+        classes=2,
+        freeze_all=True,
+        freeze_till=None,
+        learning_rate=0.01,
+        jit_compile=jit_compile,
+    )
+
+
+def time_steps(step_function, steps: int, batch_size: int) -> dict:
+    """Times the first call and the following `steps` calls of a step."""
+    start_time = time.perf_counter()
+    step_function()
+    compile_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(steps):
+        step_function()
+    seconds = time.perf_counter() - start_time
+
+    return {
+        "compile_seconds": compile_seconds,
+        "images_per_second": steps * batch_size / seconds,
+    }
+
+
+def benchmark(image_size: int, batch_size: int, steps: int, jit_compile: bool) -> dict:
+    """Benchmarks training and inference steps of the full model."""
+    model = build_model(image_size=image_size, jit_compile=jit_compile)
+    images = np.random.rand(batch_size, image_size, image_size, 3).astype(np.float32)
+    labels = tf.keras.utils.to_categorical(np.arange(batch_size) % 2, num_classes=2)
+
+    return {
+        "training": time_steps(
+            lambda: model.train_on_batch(images, labels), steps, batch_size
+        ),
+        "inference": time_steps(
+            lambda: model.predict_on_batch(images), steps, batch_size
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--image-size", type=int, default=224)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {
+        f"jit_compile={jit_compile}": benchmark(
+            image_size=args.image_size,
+            batch_size=args.batch_size,
+            steps=args.steps,
+            jit_compile=jit_compile,
+        )
+        for jit_compile in [False, True]
+    }
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""Runs the end-to-end benchmark suite on a synthetic PetImages-shaped dataset.
+
+The suite times data ingestion, the input pipeline, one training epoch with a
+tiny backbone, evaluation, and single-image and batch inference. The results
+are written to a JSON file and compared against a stored baseline.
+
+Usage:
+    python -m benchmarks.run_benchmarks --images-per-class 200
+    python -m benchmarks.run_benchmarks --save-baseline
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import yaml
+
+from pathlib import Path
+
+from benchmarks.synthetic_data import create_synthetic_dataset
+
+REPO_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_OUTPUT_PATH = REPO_DIR / "benchmarks" / "results.json"
+DEFAULT_BASELINE_PATH = REPO_DIR / "benchmarks" / "baseline.json"
+
+
+def setup_workdir(workdir: Path, args: argparse.Namespace) -> dict:
+    """Creates the config files and the synthetic dataset in the working
+    directory, which the pipeline then uses as its project root.
+
+    Returns:
+        dict: The number of valid, corrupt and zero-byte files.
+    """
+    (workdir / "configs").mkdir(parents=True, exist_ok=True)
+    shutil.copy(REPO_DIR / "configs" / "config.yaml", workdir / "configs")
+
+    with open(REPO_DIR / "params.yaml") as f:
+        params = yaml.safe_load(f)
+    params.update(
+        IMAGE_SIZE=[args.image_size, args.image_size, 3],
+        BATCH_SIZE=args.batch_size,
+        EPOCHS=1,
+        HARD_EXAMPLE_WARMUP_EPOCHS=0,
+        TTA=False,
+    )
+    with open(workdir / "params.yaml", "w") as f:
+        yaml.safe_dump(params, f)
+
+    return create_synthetic_dataset(
+        path=workdir / "artifacts" / "data_ingestion" / "data.zip",
+        images_per_class=args.images_per_class,
+        seed=args.seed,
+    )
+
+
+def save_tiny_model(image_size: list, learning_rate: float, path: Path):
+    """Saves a full model with a tiny backbone instead of VGG16, so that the
+    training benchmark measures the pipeline rather than the convolutions.
+    """
+    import tensorflow as tf
+
+    from DeepClassifier.components import PrepareBaseModel
+
+    inputs = tf.keras.Input(shape=image_size)
+    x = tf.keras.layers.Conv2D(8, 3, activation="relu", padding="same")(inputs)
+    x = tf.keras.layers.MaxPool2D()(x)
+    x = tf.keras.layers.Conv2D(16, 3, activation="relu", padding="same")(x)
+    x = tf.keras.layers.MaxPool2D()(x)
+    base_model = tf.keras.models.Model(inputs=inputs, outputs=x)
+
+    full_model = PrepareBaseModel._prepare_full_model(
+        base_model=base_model,
+        classes=2,
+        freeze_all=False,
+        freeze_till=None,
+        learning_rate=learning_rate,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    PrepareBaseModel.save_model(model=full_model, path=path)
+
+
+def bench_data_ingestion(context: dict) -> dict:
+    from DeepClassifier.config import ConfigurationManager
+    from DeepClassifier.components import DataIngestion
+
+    data_ingestion = DataIngestion(
+        config=ConfigurationManager().get_data_ingestion_config()
+    )
+    start_time = time.perf_counter()
+    data_ingestion.download_data_file()
+    data_ingestion.unzip_and_clean_data_file()
+    seconds = time.perf_counter() - start_time
+
+    number_of_files = sum(context["dataset"].values())
+    return {"seconds": seconds, "files_per_second": number_of_files / seconds}
+
+
+def bench_input_pipeline(context: dict) -> dict:
+    from DeepClassifier.config import ConfigurationManager
+    from DeepClassifier.components import Training
+
+    training = Training(config=ConfigurationManager().get_training_config())
+    training.train_val_generator()
+
+    generator = training.train_generator
+    start_time = time.perf_counter()
+    for index in range(len(generator)):
+        generator[index]
+    seconds = time.perf_counter() - start_time
+    return {"seconds": seconds, "images_per_second": generator.samples / seconds}
+
+
+def _bench_training(context: dict, sampling: str) -> dict:
+    from dataclasses import replace
+
+    from DeepClassifier.config import ConfigurationManager
+    from DeepClassifier.components import Training
+
+    training_config = replace(
+        ConfigurationManager().get_training_config(), params_sampling=sampling
+    )
+    save_tiny_model(
+        image_size=training_config.params_image_size,
+        learning_rate=context["params"]["LEARNING_RATE"],
+        path=training_config.updated_base_model_path,
+    )
+
+    training = Training(config=training_config)
+    training.get_updated_base_model()
+    training.train_val_generator()
+    start_time = time.perf_counter()
+    training.train_model(callbacks=[])
+    seconds = time.perf_counter() - start_time
+
+    with open(training_config.training_report_path) as f:
+        report = json.load(f)
+    return {
+        "seconds": seconds,
+        "images_per_second": report["images_per_second"],
+        "images_seen": report["images_seen"],
+        "accuracy_per_compute_hour": report["accuracy_per_compute_hour"],
+    }
+
+
+def bench_training_epoch(context: dict) -> dict:
+    return _bench_training(context=context, sampling="uniform")
+
+
+def bench_training_epoch_hard_example(context: dict) -> dict:
+    # The epoch draws `HARD_EXAMPLE_FRACTION` of the training images, as there
+    # is no warm-up epoch in the benchmarks
+    return _bench_training(context=context, sampling="hard_example")
+
+
+def bench_evaluation(context: dict) -> dict:
+    from DeepClassifier.config import ConfigurationManager
+    from DeepClassifier.components import Evaluation
+
+    evaluation = Evaluation(config=ConfigurationManager().get_evaluation_config())
+    start_time = time.perf_counter()
+    evaluation.evaluation(force_refresh=True)
+    seconds = time.perf_counter() - start_time
+
+    number_of_images = evaluation.validation_generator.samples
+    return {"seconds": seconds, "images_per_second": number_of_images / seconds}
+
+
+def _get_prediction(context: dict):
+    from DeepClassifier.config import ConfigurationManager
+    from DeepClassifier.components import Prediction
+
+    if "prediction" not in context:
+        prediction = Prediction(config=ConfigurationManager().get_prediction_config())
+        prediction.get_model()
+        context["prediction"] = prediction
+        context["image_paths"] = sorted(
+            Path("artifacts/data_ingestion/PetImages").glob("*/*.jpg")
+        )
+    return context["prediction"], context["image_paths"]
+
+
+def bench_single_image_inference(context: dict, repeats: int = 20) -> dict:
+    prediction, image_paths = _get_prediction(context)
+    prediction.predict_images(paths=image_paths[:1])  # warm-up
+
+    latencies = []
+    for image_path in image_paths[:repeats]:
+        start_time = time.perf_counter()
+        prediction.predict_images(paths=[image_path])
+        latencies.append(time.perf_counter() - start_time)
+
+    return {
+        "seconds": float(np.sum(latencies)),
+        "latency_ms_p50": float(np.percentile(latencies, 50) * 1000),
+        "latency_ms_p95": float(np.percentile(latencies, 95) * 1000),
+    }
+
+
+def bench_batch_inference(context: dict, number_of_batches: int = 4) -> dict:
+    prediction, image_paths = _get_prediction(context)
+    batch_size = context["params"]["BATCH_SIZE"]
+    images = np.stack(
+        [
+            prediction.load_image(path=path)
+            for path in image_paths[: batch_size * number_of_batches]
+        ]
+    )
+    prediction.predict(images=images[:batch_size])  # warm-up
+
+    start_time = time.perf_counter()
+    prediction.predict(images=images)
+    seconds = time.perf_counter() - start_time
+    return {"seconds": seconds, "images_per_second": len(images) / seconds}
+
+
+BENCHMARKS = {
+    "data_ingestion": bench_data_ingestion,
+    "input_pipeline": bench_input_pipeline,
+    "training_epoch": bench_training_epoch,
+    "training_epoch_hard_example": bench_training_epoch_hard_example,
+    "evaluation": bench_evaluation,
+    "single_image_inference": bench_single_image_inference,
+    "batch_inference": bench_batch_inference,
+}
+
+
+def compare_with_baseline(
+    results: dict, baseline: dict, tolerance: float, min_delta: float
+) -> list:
+    """Compares the time of each benchmark with the baseline.
+
+    Args:
+        results (dict): The results of the benchmarks.
+        baseline (dict): The baseline results of the benchmarks.
+        tolerance (float): The allowed relative slowdown.
+        min_delta (float): The allowed absolute slowdown in seconds, so that
+            the noise of very short benchmarks is not reported.
+
+    Returns:
+        list: The names of the benchmarks that regressed.
+    """
+    regressions = []
+    print(f"{'benchmark':<30} {'seconds':>10} {'baseline':>10} {'ratio':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<30} {result['seconds']:>10.3f} {'-':>10} {'-':>8}")
+            continue
+        baseline_seconds = baseline[name]["seconds"]
+        ratio = result["seconds"] / baseline_seconds
+        regressed = result["seconds"] > baseline_seconds + max(
+            tolerance * baseline_seconds, min_delta
+        )
+        if regressed:
+            regressions.append(name)
+        print(
+            f"{name:<30} {result['seconds']:>10.3f} {baseline[name]['seconds']:>10.3f}"
+            f" {ratio:>8.2f}{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--images-per-class", type=int, default=200)
+    parser.add_argument("--image-size", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS)
+    )
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT_PATH)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Save the results as the new baseline",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed relative slowdown against the baseline",
+    )
+    parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.25,
+        help="Allowed absolute slowdown in seconds against the baseline",
+    )
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        default=None,
+        help="Working directory to keep. Defaults to a temporary directory",
+    )
+    args = parser.parse_args()
+
+    output_path = args.output.resolve()
+    baseline_path = args.baseline.resolve()
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="deep_classifier_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    current_dir = os.getcwd()
+
+    try:
+        context = {"dataset": setup_workdir(workdir=workdir, args=args)}
+        os.chdir(workdir)
+        with open("params.yaml") as f:
+            context["params"] = yaml.safe_load(f)
+
+        results = {}
+        for name in args.benchmarks:
+            print(f"Running the benchmark: {name}")
+            results[name] = BENCHMARKS[name](context)
+    finally:
+        os.chdir(current_dir)
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "settings": {
+            "images_per_class": args.images_per_class,
+            "image_size": args.image_size,
+            "batch_size": args.batch_size,
+            "dataset": context["dataset"],
+        },
+        "results": results,
+    }
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results saved at: {output_path}")
+
+    if args.save_baseline:
+        shutil.copy(output_path, baseline_path)
+        print(f"Baseline saved at: {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print(f"No baseline found at: {baseline_path}")
+        return
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline["settings"] != report["settings"]:
+        print("The settings differ from the ones of the baseline")
+    regressions = compare_with_baseline(
+        results=results,
+        baseline=baseline["results"],
+        tolerance=args.tolerance,
+        min_delta=args.min_delta,
+    )
+    if regressions:
+        print(f"Regressions: {regressions}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
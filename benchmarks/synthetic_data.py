@@ -0,0 +1,112 @@
+"""Creates a synthetic zip file with the same layout as the PetImages dataset.
+
+The zip file contains the 'PetImages/Cat' and 'PetImages/Dog' directories
+with JPEG images of random sizes, plus the kinds of files that data ingestion
+has to clean up: zero-byte images, corrupt (non-JPEG) images and files that
+are not images at all.
+"""
+
+import io
+import argparse
+
+import numpy as np
+
+from pathlib import Path
+from zipfile import ZipFile
+from PIL import Image
+
+
+def _create_jpeg(rng: np.random.Generator, min_size: int, max_size: int) -> bytes:
+    """Creates the bytes of a JPEG image of random size and smooth content, so
+    that its file size is close to the one of a real photo.
+    """
+    width, height = rng.integers(min_size, max_size + 1, size=2)
+    low_resolution = rng.integers(0, 256, size=(8, 8, 3), dtype=np.uint8)
+    image = Image.fromarray(low_resolution).resize(
+        (int(width), int(height)), resample=Image.BICUBIC
+    )
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def create_synthetic_dataset(
+    path: Path,
+    images_per_class: int = 200,
+    min_size: int = 200,
+    max_size: int = 500,
+    corrupt_fraction: float = 0.02,
+    zero_byte_fraction: float = 0.01,
+    seed: int = 42,
+) -> dict:
+    """Creates a synthetic PetImages-shaped zip file.
+
+    Args:
+        path (Path): Path of the zip file to be created.
+        images_per_class (int, optional): Number of files per class, including
+            the corrupt and zero-byte ones. Defaults to 200.
+        min_size (int, optional): Minimum width and height of the images.
+            Defaults to 200.
+        max_size (int, optional): Maximum width and height of the images.
+            Defaults to 500.
+        corrupt_fraction (float, optional): Fraction of the files that are
+            corrupt. Defaults to 0.02.
+        zero_byte_fraction (float, optional): Fraction of the files that have
+            zero bytes. Defaults to 0.01.
+        seed (int, optional): The random seed. Defaults to 42.
+
+    Returns:
+        dict: The number of valid, corrupt and zero-byte files.
+    """
+    rng = np.random.default_rng(seed)
+    counts = {"valid": 0, "corrupt": 0, "zero_byte": 0}
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with ZipFile(path, mode="w") as zf:
+        for class_name in ["Cat", "Dog"]:
+            for i in range(images_per_class):
+                file_name = f"PetImages/{class_name}/{i}.jpg"
+                draw = rng.random()
+                if draw < zero_byte_fraction:
+                    zf.writestr(file_name, b"")
+                    counts["zero_byte"] += 1
+                elif draw < zero_byte_fraction + corrupt_fraction:
+                    zf.writestr(file_name, rng.bytes(int(rng.integers(64, 4096))))
+                    counts["corrupt"] += 1
+                else:
+                    zf.writestr(file_name, _create_jpeg(rng, min_size, max_size))
+                    counts["valid"] += 1
+            zf.writestr(f"PetImages/{class_name}/Thumbs.db", rng.bytes(1024))
+
+        # Files outside of the image directories, as in the real zip file
+        zf.writestr("CDLA-Permissive-2.0.pdf", rng.bytes(1024))
+        zf.writestr("readme[1].txt", b"Synthetic PetImages dataset")
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--images-per-class", type=int, default=200)
+    parser.add_argument("--min-size", type=int, default=200)
+    parser.add_argument("--max-size", type=int, default=500)
+    parser.add_argument("--corrupt-fraction", type=float, default=0.02)
+    parser.add_argument("--zero-byte-fraction", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    counts = create_synthetic_dataset(
+        path=args.path,
+        images_per_class=args.images_per_class,
+        min_size=args.min_size,
+        max_size=args.max_size,
+        corrupt_fraction=args.corrupt_fraction,
+        zero_byte_fraction=args.zero_byte_fraction,
+        seed=args.seed,
+    )
+    print(f"Created '{args.path}' with: {counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Runs all the stages of the pipeline in a single process.
+
+Unlike `dvc repro`, which runs each stage in a separate process, this imports
+TensorFlow once and passes the models and the data generators from one stage
+to the next in memory. The stages still write the same artifacts, so DVC can
+track them.
+"""
+
+import time
+
+from DeepClassifier.utils import monitor_resources
+from DeepClassifier import logger, event_stream
+from DeepClassifier.pipeline import (
+    stage_01_data_ingestion,
+    stage_02_prepare_base_model,
+    stage_03_training,
+    stage_04_evaluation,
+)
+
+
+def run_stage(stage_name: str, stage_function, timings: dict, **kwargs):
+    """Runs a stage and records its wall time and, in
+    `artifacts/telemetry/<stage>.json`, the resources it used.
+
+    Args:
+        stage_name (str): Name of the stage.
+        stage_function (Callable): The `main` function of the stage.
+        timings (dict): The dictionary in which the wall time is recorded.
+
+    Returns:
+        Any: The value returned by the stage.
+    """
+    logger.info(f">>>>>>>>>>>> {stage_name} Stage Started <<<<<<<<<<<<")
+    start_time = time.perf_counter()
+    with event_stream(stage_name), monitor_resources(stage_name):
+        output = stage_function(**kwargs)
+    timings[stage_name] = time.perf_counter() - start_time
+    logger.info(
+        f">>>>>>>>>>>> {stage_name} Stage Completed in {timings[stage_name]:.2f} s <<<<<<<<<<<<\n\n\n\n"
+    )
+    return output
+
+
+def main():
+    timings: dict = {}
+
+    run_stage(stage_01_data_ingestion.STAGE_NAME, stage_01_data_ingestion.main, timings)
+
+    updated_base_model = run_stage(
+        stage_02_prepare_base_model.STAGE_NAME,
+        stage_02_prepare_base_model.main,
+        timings,
+    )
+
+    training = run_stage(
+        stage_03_training.STAGE_NAME,
+        stage_03_training.main,
+        timings,
+        updated_base_model=updated_base_model,
+    )
+
+    run_stage(
+        stage_04_evaluation.STAGE_NAME,
+        stage_04_evaluation.main,
+        timings,
+        model=training.trained_model,
+        validation_generator=training.validation_generator,
+    )
+
+    # Reporting the wall time of each stage
+    report = "\n".join(
+        [
+            f"{stage_name:<20} {seconds:>10.2f} s"
+            for stage_name, seconds in timings.items()
+        ]
+        + [f"{'Total':<20} {sum(timings.values()):>10.2f} s"]
+    )
+    logger.info(f"Wall time of the stages:\n{report}")
+    print(report)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as e:
+        logger.exception(e)
+        raise e
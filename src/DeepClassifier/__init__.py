@@ -1,21 +1,193 @@
 import os
 import sys
+import json
+import time
+import queue
+import atexit
 import logging
+import threading
+import contextlib
 
+from logging.handlers import QueueHandler, QueueListener
 
 logging_str = "[%(asctime)s: %(levelname)s: %(module)s]: %(message)s"
 log_dir = "logs"
 log_filepath = os.path.join(log_dir, "running_logs.log")
+events_dir = os.path.join(log_dir, "events")
+# Set this environment variable to 1 to write the JSON event stream of the
+# stages to `events_dir`
+log_events_env_var = "DEEPCLASSIFIER_LOG_EVENTS"
 
 os.makedirs(log_dir, exist_ok=True)
 
+# The log records are only put in a queue by the calling thread, and written to
+# the log file by the background thread of `log_listener`, so that logging
+# never waits on the file system
+file_handler = logging.FileHandler(log_filepath)
+file_handler.setFormatter(logging.Formatter(logging_str))
+
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = QueueHandler(log_queue)
+# Only the message is formatted by the calling thread, the rest is formatted by
+# the handlers of `log_listener`
+queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
 logging.basicConfig(
     level=logging.INFO,
-    format=logging_str,
-    handlers=[
-        logging.FileHandler(log_filepath),
-        # logging.StreamHandler(sys.stdout),
-    ],
+    handlers=[queue_handler],
+)
+
+
+class _FlushingQueueListener(QueueListener):
+    """QueueListener that also handles the flush markers of `flush_logs`."""
+
+    def handle(self, record: logging.LogRecord):
+        flushed = getattr(record, "flushed", None)
+        if flushed is not None:
+            # All the records queued before the marker are written
+            flushed.set()
+            return
+        super().handle(record)
+
+
+log_listener = _FlushingQueueListener(
+    log_queue,
+    file_handler,
+    # logging.StreamHandler(sys.stdout),
+    respect_handler_level=True,
 )
+# Whether the background thread of `log_listener` is running
+log_listener_running = False
+
+
+def _start_log_listener():
+    """Starts the background thread that writes the queued log records."""
+    global log_listener_running
+    log_listener.start()
+    log_listener_running = True
+
+
+def _stop_log_listener():
+    """Writes the queued log records and stops the background thread."""
+    global log_listener_running
+    if log_listener_running:
+        log_listener.stop()
+        log_listener_running = False
+
+
+_start_log_listener()
 
 logger = logging.getLogger("DeepClassifierLogger")
+
+
+def flush_logs(timeout: float = 10.0):
+    """Waits until all the queued log records are written.
+
+    Args:
+        timeout (float, optional): Maximum number of seconds to wait. Defaults
+            to 10.0.
+    """
+    if not log_listener_running:
+        return
+    flushed = threading.Event()
+    log_queue.put(logging.makeLogRecord({"flushed": flushed}))
+    flushed.wait(timeout)
+
+
+def _restart_log_listener():
+    """Restarts the background thread in a forked child process, where it does
+    not exist. A new queue is used, as the one of the parent may have been
+    copied in the middle of an operation.
+    """
+    global log_queue, log_listener, log_listener_running
+    log_queue = queue.SimpleQueue()
+    queue_handler.queue = log_queue
+    log_listener = _FlushingQueueListener(
+        log_queue, *log_listener.handlers, respect_handler_level=True
+    )
+    log_listener_running = False
+    _start_log_listener()
+
+
+atexit.register(_stop_log_listener)
+# `os.register_at_fork` is not available on Windows, where processes are not
+# forked
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_log_listener)
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats a log record as a line of JSON, with the fields of the event, if
+    the record was logged with `log_event`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": record.created,
+            "level": record.levelname,
+            "module": record.module,
+            "message": record.getMessage(),
+        }
+        if hasattr(record, "event"):
+            data["event"] = getattr(record, "event")
+            data.update(getattr(record, "fields"))
+        return json.dumps(data, default=str)
+
+
+def log_event(event: str, **fields):
+    """Logs a structured event. In the JSON event stream, the fields are saved
+    as they are. In the log file, they are formatted in the message.
+
+    Args:
+        event (str): Name of the event.
+        **fields: The fields of the event.
+    """
+    message = ", ".join(f"{key}={value}" for key, value in fields.items())
+    logger.info(
+        f"{event}: {message}",
+        extra={"event": event, "fields": fields},
+        # The module of the caller is logged instead of this one
+        stacklevel=2,
+    )
+
+
+@contextlib.contextmanager
+def event_stream(stage_name: str):
+    """Writes the log records of a stage to `events_dir/<stage>.jsonl` as JSON
+    lines, if the environment variable `DEEPCLASSIFIER_LOG_EVENTS` is 1. Also
+    logs the start and the end of the stage as events.
+
+    Args:
+        stage_name (str): Name of the stage.
+    """
+    handler = None
+    if os.environ.get(log_events_env_var) == "1":
+        os.makedirs(events_dir, exist_ok=True)
+        events_path = os.path.join(
+            events_dir, f"{stage_name.lower().replace(' ', '_')}.jsonl"
+        )
+        handler = logging.FileHandler(events_path, mode="w")
+        handler.setFormatter(JSONFormatter())
+        # Writing the queued records first, so that the handler only receives
+        # the records of the stage
+        flush_logs()
+        log_listener.handlers = log_listener.handlers + (handler,)
+
+    log_event("stage_started", stage=stage_name)
+    start_time = time.perf_counter()
+    status = "failed"
+    try:
+        yield
+        status = "completed"
+    finally:
+        log_event(
+            f"stage_{status}",
+            stage=stage_name,
+            seconds=time.perf_counter() - start_time,
+        )
+        if handler is not None:
+            flush_logs()
+            log_listener.handlers = tuple(
+                h for h in log_listener.handlers if h is not handler
+            )
+            handler.close()
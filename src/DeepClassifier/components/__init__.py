@@ -1,5 +1,54 @@
-from DeepClassifier.components.data_ingestion import DataIngestion
-from DeepClassifier.components.prepare_base_model import PrepareBaseModel
-from DeepClassifier.components.prepare_callbacks import PrepareCallbacks
-from DeepClassifier.components.training import Training
-from DeepClassifier.components.evaluation import Evaluation
+# The components are imported lazily (PEP 562), so that importing one of them
+# (e.g., `DataIngestion`) does not import TensorFlow through the others
+import importlib
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from DeepClassifier.components.data_ingestion import DataIngestion
+    from DeepClassifier.components.prepare_base_model import PrepareBaseModel
+    from DeepClassifier.components.prepare_callbacks import PrepareCallbacks
+    from DeepClassifier.components.training import Training
+    from DeepClassifier.components.incremental_training import IncrementalTraining
+    from DeepClassifier.components.evaluation import Evaluation
+    from DeepClassifier.components.prediction import Prediction
+    from DeepClassifier.components.embedding_index import EmbeddingIndex
+    from DeepClassifier.components.cross_validation import CrossValidation
+    from DeepClassifier.components.auto_tuning import AutoTuner
+    from DeepClassifier.components.multi_head import MultiHeadEngine
+    from DeepClassifier.components.cascade import Cascade
+    from DeepClassifier.components.compression import Compression
+    from DeepClassifier.components.export import Export
+
+
+_COMPONENT_MODULES = {
+    "DataIngestion": "DeepClassifier.components.data_ingestion",
+    "PrepareBaseModel": "DeepClassifier.components.prepare_base_model",
+    "PrepareCallbacks": "DeepClassifier.components.prepare_callbacks",
+    "Training": "DeepClassifier.components.training",
+    "IncrementalTraining": "DeepClassifier.components.incremental_training",
+    "Evaluation": "DeepClassifier.components.evaluation",
+    "Prediction": "DeepClassifier.components.prediction",
+    "EmbeddingIndex": "DeepClassifier.components.embedding_index",
+    "CrossValidation": "DeepClassifier.components.cross_validation",
+    "AutoTuner": "DeepClassifier.components.auto_tuning",
+    "MultiHeadEngine": "DeepClassifier.components.multi_head",
+    "Cascade": "DeepClassifier.components.cascade",
+    "Compression": "DeepClassifier.components.compression",
+    "Export": "DeepClassifier.components.export",
+}
+
+__all__ = list(_COMPONENT_MODULES)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _COMPONENT_MODULES:
+        component = getattr(importlib.import_module(_COMPONENT_MODULES[name]), name)
+        # Caching the component so that `__getattr__` is not called again
+        globals()[name] = component
+        return component
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,222 @@
+"""This module contains the code for AutoTuner.
+
+The auto-tuner builds the full model of `PrepareBaseModel` and times a few
+training and inference steps on synthetic inputs for each candidate batch size
+and thread setting. TensorFlow's threads can only be set before it runs its
+first operation, so each thread setting is probed in a fresh process, with the
+batch sizes in increasing order until the peak memory of the process exceeds
+the memory limit.
+
+The fastest configuration within the memory limit is chosen for training and,
+separately, for inference, and saved to the tuning file, whose values
+`ConfigurationManager` then uses instead of the ones of params.yaml.
+"""
+
+import os
+import time
+import socket
+import multiprocessing
+import numpy as np
+import tensorflow as tf
+
+from queue import Empty
+
+from DeepClassifier.entities import AutoTuningConfig
+from DeepClassifier.components.prepare_base_model import PrepareBaseModel
+from DeepClassifier.components.tf_threads import configure_threads
+from DeepClassifier.utils import save_yaml, get_available_memory_mb
+from DeepClassifier import logger, log_event, flush_logs
+
+
+def _probe(task: dict, queue):
+    """Times the steps of a mode for each batch size with a thread setting, in
+    a fresh process. The result of each batch size is put in the queue as soon
+    as it is known, followed by None.
+    """
+    # `resource` is only available on Unix, where the probes run
+    import resource
+
+    configure_threads(
+        intra_op_threads=task["intra_op_threads"],
+        inter_op_threads=task["inter_op_threads"],
+    )
+    model = PrepareBaseModel._prepare_full_model(
+        # The weights do not change the speed, so they are not downloaded
+        base_model=tf.keras.applications.vgg16.VGG16(
+            input_shape=task["image_size"],
+            weights=None,
+            include_top=task["include_top"],
+        ),
+        classes=task["classes"],
+        freeze_all=True,
+        freeze_till=0,
+        learning_rate=task["learning_rate"],
+    )
+
+    rng = np.random.default_rng(42)
+    for batch_size in sorted(task["batch_sizes"]):
+        images = rng.random((batch_size, *task["image_size"]), dtype=np.float32)
+        labels = tf.keras.utils.to_categorical(
+            rng.integers(0, task["classes"], size=batch_size),
+            num_classes=task["classes"],
+        )
+        if task["mode"] == "training":
+            step = lambda: model.train_on_batch(images, labels)  # noqa: E731
+        else:
+            step = lambda: model.predict_on_batch(images)  # noqa: E731
+
+        # Warming up, which traces the function for the batch size
+        step()
+        start_time = time.perf_counter()
+        for _ in range(task["steps"]):
+            step()
+        seconds = time.perf_counter() - start_time
+        # `ru_maxrss` is in KB on Linux
+        peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+        within_memory_limit = peak_rss_mb <= task["memory_limit_mb"]
+        queue.put(
+            {
+                "mode": task["mode"],
+                "batch_size": batch_size,
+                "intra_op_threads": task["intra_op_threads"],
+                "inter_op_threads": task["inter_op_threads"],
+                "images_per_second": batch_size * task["steps"] / seconds,
+                "peak_rss_mb": peak_rss_mb,
+                "within_memory_limit": within_memory_limit,
+            }
+        )
+        if not within_memory_limit:
+            # The larger batch sizes need even more memory
+            break
+    flush_logs()
+    queue.put(None)
+
+
+class AutoTuner:
+    def __init__(self, config: AutoTuningConfig) -> None:
+        """Inits AutoTuner.
+
+        Args:
+            config (AutoTuningConfig): The AutoTuningConfig.
+        """
+        logger.info(">>>>>>>>>>>> AutoTuner Log Started <<<<<<<<<<<<")
+        self.config = config
+
+    @staticmethod
+    def get_thread_settings() -> list:
+        """Returns the candidate (intra-op, inter-op) thread settings: all, half
+        and a quarter of the CPU cores for a single operation, with 1 or 2
+        concurrent operations.
+
+        Returns:
+            list: The thread settings.
+        """
+        if hasattr(os, "sched_getaffinity"):
+            cores = len(os.sched_getaffinity(0))
+        else:
+            cores = os.cpu_count() or 1
+        intra_op_threads = sorted({max(cores // divisor, 1) for divisor in (1, 2, 4)})
+        return [(intra, inter) for intra in intra_op_threads for inter in (1, 2)]
+
+    def _run_probes(self, task: dict) -> list:
+        """Runs the probes of a mode and a thread setting in a fresh process.
+
+        Returns:
+            list: The result of each probed batch size.
+        """
+        # TensorFlow is not fork-safe, so the probes are spawned
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(target=_probe, args=(task, queue))
+        process.start()
+
+        results = []
+        while True:
+            try:
+                result = queue.get(timeout=1)
+            except Empty:
+                if process.is_alive():
+                    continue
+                # E.g., when the process was killed for using too much memory
+                logger.warning(
+                    f"The probe process exited with the code {process.exitcode}"
+                )
+                break
+            if result is None:
+                break
+            log_event("auto_tuning_probe", **result)
+            results.append(result)
+        process.join()
+        return results
+
+    def run(self) -> dict:
+        """Probes the batch sizes and the thread settings, and saves the
+        fastest configuration within the memory limit for training and for
+        inference to the tuning file.
+
+        Raises:
+            RuntimeError: If no configuration of a mode stays within the memory
+                limit.
+
+        Returns:
+            dict: The content of the tuning file.
+        """
+        memory_limit_mb = self.config.params_memory_limit_mb or (
+            0.8 * get_available_memory_mb()
+        )
+        logger.info(f"Memory limit of the probes: {memory_limit_mb:.0f} MB")
+
+        thread_settings = self.get_thread_settings()
+        tuning: dict = {
+            "host": socket.gethostname(),
+            "memory_limit_mb": float(memory_limit_mb),
+        }
+        probes = []
+        for mode in ["training", "inference"]:
+            mode_results = []
+            for intra_op_threads, inter_op_threads in thread_settings:
+                logger.info(
+                    f"Probing {mode} with {intra_op_threads} intra-op and {inter_op_threads} inter-op threads"
+                )
+                mode_results.extend(
+                    self._run_probes(
+                        task={
+                            "mode": mode,
+                            "intra_op_threads": intra_op_threads,
+                            "inter_op_threads": inter_op_threads,
+                            "batch_sizes": list(self.config.params_batch_sizes),
+                            "steps": self.config.params_steps,
+                            "memory_limit_mb": memory_limit_mb,
+                            "image_size": list(self.config.params_image_size),
+                            "include_top": self.config.params_include_top,
+                            "classes": self.config.params_classes,
+                            "learning_rate": self.config.params_learning_rate,
+                        }
+                    )
+                )
+            probes.extend(mode_results)
+
+            candidates = [
+                result for result in mode_results if result["within_memory_limit"]
+            ]
+            if not candidates:
+                raise RuntimeError(
+                    f"No probed configuration of {mode} stays within the memory limit"
+                )
+            best = max(candidates, key=lambda result: result["images_per_second"])
+            logger.info(f"Fastest configuration of {mode}: {best}")
+            tuning[mode] = {
+                # The values that override the ones of params.yaml
+                "params": {
+                    "BATCH_SIZE": best["batch_size"],
+                    "INTRA_OP_THREADS": best["intra_op_threads"],
+                    "INTER_OP_THREADS": best["inter_op_threads"],
+                },
+                "images_per_second": best["images_per_second"],
+                "peak_rss_mb": best["peak_rss_mb"],
+            }
+
+        tuning["probes"] = probes
+        save_yaml(path=self.config.tuning_file_path, data=tuning)
+        return tuning
@@ -0,0 +1,265 @@
+"""This module contains the code for Cascade.
+
+The cascade runs a small, fast model on every image, and the trained model
+(VGG16) only on the images whose highest softmax probability from the small
+model, its confidence, is below a threshold. The small model takes the same
+inputs as the trained model and resizes them itself, so both run on the same
+preprocessed images.
+
+The threshold is calibrated on the validation subset of `Evaluation`: it is
+the lowest threshold, i.e., the fewest escalations to the trained model, for
+which the accuracy of the cascade meets the target accuracy. The target is
+capped at the accuracy of the trained model, which the cascade reaches by
+escalating every image.
+"""
+
+import time
+import numpy as np
+import tensorflow as tf
+
+from DeepClassifier.entities import CascadeConfig
+from DeepClassifier.components.tf_threads import configure_threads
+from DeepClassifier.components.image_loading import flow_from_directory
+from DeepClassifier.components.shared_weights import load_flat_model
+from DeepClassifier.utils import save_json
+from DeepClassifier import logger, log_event
+
+
+def build_small_model(
+    image_size: list, small_image_size: int, classes: int, learning_rate: float
+) -> tf.keras.Model:
+    """Builds and compiles the small model of the cascade: four convolutional
+    blocks on the inputs resized to `small_image_size`, and a softmax output.
+
+    Args:
+        image_size (list): The image size of the inputs, as in `IMAGE_SIZE`.
+        small_image_size (int): Side of the images the model runs on.
+        classes (int): Number of classes.
+        learning_rate (float): The learning rate.
+
+    Returns:
+        tf.keras.Model: The small model.
+    """
+    inputs = tf.keras.layers.Input(shape=image_size)
+    x = tf.keras.layers.Resizing(height=small_image_size, width=small_image_size)(
+        inputs
+    )
+    for filters in [16, 32, 64, 128]:
+        x = tf.keras.layers.Conv2D(
+            filters=filters, kernel_size=3, padding="same", activation="relu"
+        )(x)
+        x = tf.keras.layers.MaxPooling2D()(x)
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    outputs = tf.keras.layers.Dense(units=classes, activation="softmax")(x)
+
+    model = tf.keras.models.Model(inputs=inputs, outputs=outputs)
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+        loss=tf.keras.losses.CategoricalCrossentropy(),
+        metrics=["accuracy"],
+    )
+    return model
+
+
+def calibrate_threshold(
+    confidences: np.ndarray,
+    small_correct: np.ndarray,
+    full_correct: np.ndarray,
+    target_accuracy: float,
+) -> float:
+    """Returns the lowest confidence threshold for which the accuracy of the
+    cascade meets the target accuracy, capped at the accuracy of the full
+    model. The images whose confidence is below the threshold are escalated
+    to the full model.
+
+    Args:
+        confidences (np.ndarray): The confidence of the small model for each
+            image.
+        small_correct (np.ndarray): Whether the small model is correct for each
+            image.
+        full_correct (np.ndarray): Whether the full model is correct for each
+            image.
+        target_accuracy (float): The target accuracy.
+
+    Returns:
+        float: The confidence threshold.
+    """
+    order = np.argsort(confidences, kind="stable")
+    sorted_confidences = confidences[order]
+    # Accuracy of the cascade when the `k` least confident images are
+    # escalated, for `k` from 0 to the number of images
+    gains = np.cumsum(
+        full_correct[order].astype(float) - small_correct[order].astype(float)
+    )
+    accuracies = (small_correct.sum() + np.concatenate([[0.0], gains])) / len(order)
+    target_accuracy = min(target_accuracy, float(np.mean(full_correct)))
+
+    for k, accuracy in enumerate(accuracies):
+        # With ties in the confidences, only some values of `k` are reachable
+        # by a threshold
+        reachable = k in (0, len(order)) or (
+            sorted_confidences[k] > sorted_confidences[k - 1]
+        )
+        if reachable and accuracy >= target_accuracy - 1e-9:
+            if k == len(order):
+                # Escalating all the images
+                return float(np.nextafter(sorted_confidences[-1], np.inf))
+            return float(sorted_confidences[k])
+    return float(np.nextafter(sorted_confidences[-1], np.inf))
+
+
+class Cascade:
+    def __init__(self, config: CascadeConfig) -> None:
+        """Inits Cascade.
+
+        Args:
+            config (CascadeConfig): The CascadeConfig.
+        """
+        logger.info(">>>>>>>>>>>> Cascade Log Started <<<<<<<<<<<<")
+        self.config = config
+        configure_threads(
+            intra_op_threads=self.config.params_intra_op_threads,
+            inter_op_threads=self.config.params_inter_op_threads,
+        )
+
+    def _generator(self, subset: str, augmentation: bool, shuffle: bool):
+        """Creates a generator of a subset of the training data, preprocessed
+        as for the trained model.
+        """
+        datagen_kwargs: dict = dict(
+            rescale=1.0 / 255,
+            validation_split=self.config.params_validation_split,
+        )
+        if augmentation:
+            datagen_kwargs.update(
+                rotation_range=self.config.params_rotation_range,
+                horizontal_flip=self.config.params_horizontal_flip,
+                width_shift_range=self.config.params_width_shift_range,
+                height_shift_range=self.config.params_height_shift_range,
+                shear_range=self.config.params_shear_range,
+                zoom_range=self.config.params_zoom_range,
+            )
+        return flow_from_directory(
+            datagen=tf.keras.preprocessing.image.ImageDataGenerator(**datagen_kwargs),
+            directory=self.config.training_data_dir,
+            target_size=self.config.params_image_size[:-1],
+            batch_size=self.config.params_batch_size,
+            interpolation="bilinear",
+            scaled_decoding=self.config.params_scaled_decoding,
+            subset=subset,
+            shuffle=shuffle,
+        )
+
+    def train_small_model(self):
+        """Trains the small model on the training subset, and saves it."""
+        train_generator = self._generator(
+            subset="training",
+            augmentation=self.config.params_augmentation,
+            shuffle=True,
+        )
+        self.small_model = build_small_model(
+            image_size=self.config.params_image_size,
+            small_image_size=self.config.params_small_image_size,
+            classes=self.config.params_classes,
+            learning_rate=self.config.params_learning_rate,
+        )
+        logger.info("Training the small model of the cascade")
+        self.small_model.fit(train_generator, epochs=self.config.params_epochs)
+        logger.info(f"Saving the small model to: {self.config.small_model_path}")
+        self.small_model.save(self.config.small_model_path)
+
+    def calibrate(self) -> dict:
+        """Calibrates the confidence threshold on the validation subset, and
+        saves it with the escalation rate, the accuracy and the latency of the
+        cascade and of the trained model alone. The latency is the time of
+        the models per image, without the decoding, which both pay.
+
+        Returns:
+            dict: The cascade report.
+        """
+        if self.config.params_shared_weights:
+            full_model = load_flat_model(
+                path=self.config.flat_model_path, compile=False
+            )
+        else:
+            full_model = tf.keras.models.load_model(filepath=self.config.model_path)
+        validation_generator = self._generator(
+            subset="validation", augmentation=False, shuffle=False
+        )
+
+        # Warming up both models on the first and the last (partial) batches,
+        # so that their tracing is not timed
+        for index in {0, len(validation_generator) - 1}:
+            images, _ = validation_generator[index]
+            self.small_model.predict_on_batch(images)
+            full_model.predict_on_batch(images)
+
+        # Running both models on all the validation images
+        small_probabilities, full_probabilities, labels = [], [], []
+        small_seconds = full_seconds = 0.0
+        for index in range(len(validation_generator)):
+            images, batch_labels = validation_generator[index]
+            start_time = time.perf_counter()
+            small_probabilities.append(self.small_model.predict_on_batch(images))
+            small_seconds += time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            full_probabilities.append(full_model.predict_on_batch(images))
+            full_seconds += time.perf_counter() - start_time
+            labels.append(np.argmax(batch_labels, axis=1))
+        small_probability = np.concatenate(small_probabilities)
+        full_probability = np.concatenate(full_probabilities)
+        label = np.concatenate(labels)
+
+        confidences = small_probability.max(axis=1)
+        small_correct = small_probability.argmax(axis=1) == label
+        full_correct = full_probability.argmax(axis=1) == label
+        threshold = calibrate_threshold(
+            confidences=confidences,
+            small_correct=small_correct,
+            full_correct=full_correct,
+            target_accuracy=self.config.params_target_accuracy,
+        )
+        escalated = confidences < threshold
+        logger.info(
+            f"Confidence threshold: {threshold:.4f}, escalating {escalated.mean():.2%} of the validation images"
+        )
+
+        # Timing the cascade itself, which runs the trained model only on the
+        # escalated images of each batch
+        cascade_seconds = 0.0
+        for index in range(len(validation_generator)):
+            images, _ = validation_generator[index]
+            start_time = time.perf_counter()
+            confidence = self.small_model.predict_on_batch(images).max(axis=1)
+            if np.any(confidence < threshold):
+                full_model.predict_on_batch(images[confidence < threshold])
+            cascade_seconds += time.perf_counter() - start_time
+
+        number_of_images = len(label)
+        report: dict = {
+            "threshold": threshold,
+            "target_accuracy": self.config.params_target_accuracy,
+            "escalation_rate": float(escalated.mean()),
+            "validation_images": number_of_images,
+            "cascade": {
+                "accuracy": float(
+                    np.mean(np.where(escalated, full_correct, small_correct))
+                ),
+                "seconds_per_image": cascade_seconds / number_of_images,
+            },
+            "full_model": {
+                "accuracy": float(full_correct.mean()),
+                "seconds_per_image": full_seconds / number_of_images,
+            },
+            "small_model": {
+                "accuracy": float(small_correct.mean()),
+                "seconds_per_image": small_seconds / number_of_images,
+            },
+        }
+        report["speedup"] = (
+            report["full_model"]["seconds_per_image"]
+            / report["cascade"]["seconds_per_image"]
+        )
+        log_event("cascade_report", **report)
+        save_json(path=self.config.report_path, data=report)
+        return report
@@ -0,0 +1,322 @@
+"""This module contains the code for Compression.
+
+The kernels of the convolutional and dense layers of the trained model are
+pruned iteratively by magnitude: at each iteration, the smallest weights of
+each kernel are set to zero, with a sparsity increasing up to the target one
+(following the cubic schedule of Zhu & Gupta, 2017), and the model is
+fine-tuned for a few batches with the pruned weights kept at zero. The
+remaining weights of each kernel can then be clustered, i.e., replaced by the
+closest of a few shared values found by k-means.
+
+The compressed model is saved with a bit mask of the non-zero weights of each
+kernel, and either their values or, when they take at most 256 distinct values
+(e.g., when they are clustered), their uint8 indices in these values. Loading
+it restores dense kernels, so the compression reduces the size of the artifact
+to store and ship, not the compute of TensorFlow's dense kernels.
+"""
+
+import io
+import os
+import time
+import numpy as np
+import tensorflow as tf
+
+from pathlib import Path
+
+from DeepClassifier.entities import CompressionConfig
+from DeepClassifier.components.tf_threads import configure_threads
+from DeepClassifier.components.image_loading import flow_from_directory
+from DeepClassifier.utils import save_json
+from DeepClassifier import logger, log_event
+
+
+def get_pruning_mask(weights: np.ndarray, sparsity: float) -> np.ndarray:
+    """Returns the mask that keeps the largest weights by magnitude, and
+    prunes the `sparsity` fraction with the smallest magnitudes.
+
+    Args:
+        weights (np.ndarray): The weights.
+        sparsity (float): Fraction of the weights to prune.
+
+    Returns:
+        np.ndarray: The boolean mask of the kept weights.
+    """
+    pruned = int(round(sparsity * weights.size))
+    if pruned == 0:
+        return np.ones(weights.shape, dtype=bool)
+    magnitudes = np.abs(weights).ravel()
+    # The magnitude of the `pruned`-th smallest weight; ties are broken by
+    # the order of the weights, so exactly `pruned` weights are pruned
+    order = np.argpartition(magnitudes, pruned - 1)
+    mask = np.ones(weights.size, dtype=bool)
+    mask[order[:pruned]] = False
+    return mask.reshape(weights.shape)
+
+
+def cluster_weights(values: np.ndarray, clusters: int, iterations: int = 20) -> tuple:
+    """Clusters weights with a 1-D k-means, initialized with centroids spread
+    linearly between the smallest and the largest weight.
+
+    Args:
+        values (np.ndarray): The weights to be clustered.
+        clusters (int): Number of clusters, at most 256.
+        iterations (int, optional): Number of k-means iterations. Defaults to
+            20.
+
+    Returns:
+        tuple: The uint8 cluster index of each weight and the float32
+            centroids.
+    """
+    if not 0 < clusters <= 256:
+        raise ValueError(f"The number of clusters must be in [1, 256]: {clusters}")
+    centroids = np.linspace(values.min(), values.max(), num=clusters)
+    for _ in range(iterations):
+        # In 1-D, the closest centroid is found between the midpoints of the
+        # sorted centroids
+        centroids = np.sort(centroids)
+        indices = np.searchsorted((centroids[1:] + centroids[:-1]) / 2, values)
+        sums = np.bincount(indices, weights=values, minlength=clusters)
+        counts = np.bincount(indices, minlength=clusters)
+        # Empty clusters keep their centroid
+        centroids = np.where(counts > 0, sums / np.maximum(counts, 1), centroids)
+    centroids = np.sort(centroids)
+    indices = np.searchsorted((centroids[1:] + centroids[:-1]) / 2, values)
+    return indices.astype(np.uint8), centroids.astype(np.float32)
+
+
+def _get_kernels(model: tf.keras.Model) -> list:
+    """Returns the kernels of the convolutional and dense layers of a model."""
+    return [
+        layer.kernel
+        for layer in model.layers
+        if isinstance(layer, (tf.keras.layers.Conv2D, tf.keras.layers.Dense))
+    ]
+
+
+def save_compressed_model(model: tf.keras.Model, path: Path):
+    """Saves a pruned model with the bit masks of its kernels and their
+    non-zero weights, or the indices of the weights in their distinct values
+    if there are at most 256 of them.
+
+    Args:
+        model (tf.keras.Model): The pruned model.
+        path (Path): Path of the compressed model (`.npz`).
+    """
+    kernel_names = {kernel.name for kernel in _get_kernels(model)}
+    arrays = {"architecture": np.frombuffer(model.to_json().encode(), np.uint8)}
+    for index, variable in enumerate(model.weights):
+        weights = variable.numpy()
+        if variable.name not in kernel_names:
+            arrays[f"{index}/dense"] = weights
+            continue
+        mask = weights != 0
+        arrays[f"{index}/shape"] = np.array(weights.shape)
+        arrays[f"{index}/mask"] = np.packbits(mask)
+        centroids, indices = np.unique(weights[mask], return_inverse=True)
+        if len(centroids) <= 256:
+            arrays[f"{index}/indices"] = indices.astype(np.uint8)
+            arrays[f"{index}/centroids"] = centroids
+        else:
+            arrays[f"{index}/values"] = weights[mask]
+
+    logger.info(f"Saving the compressed model to: {path}")
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    with open(path, "wb") as f:
+        f.write(buffer.getvalue())
+
+
+def load_compressed_model(path: Path) -> tf.keras.Model:
+    """Loads a model saved with `save_compressed_model`, with dense kernels.
+
+    Args:
+        path (Path): Path of the compressed model.
+
+    Returns:
+        tf.keras.Model: The model, not compiled.
+    """
+    with np.load(path) as arrays:
+        model = tf.keras.models.model_from_json(arrays["architecture"].tobytes())
+        weights = []
+        for index in range(len(model.weights)):
+            if f"{index}/dense" in arrays:
+                weights.append(arrays[f"{index}/dense"])
+                continue
+            shape = tuple(arrays[f"{index}/shape"])
+            mask = np.unpackbits(arrays[f"{index}/mask"], count=int(np.prod(shape)))
+            mask = mask.astype(bool).reshape(shape)
+            weight = np.zeros(shape, dtype=np.float32)
+            if f"{index}/indices" in arrays:
+                weight[mask] = arrays[f"{index}/centroids"][arrays[f"{index}/indices"]]
+            else:
+                weight[mask] = arrays[f"{index}/values"]
+            weights.append(weight)
+    model.set_weights(weights)
+    return model
+
+
+class PruningMasks(tf.keras.callbacks.Callback):
+    def __init__(self, masks: list) -> None:
+        """Inits PruningMasks, which sets the pruned weights back to zero after
+        each batch of the fine-tuning.
+
+        Args:
+            masks (list): The pruned kernels and their masks (1 for the
+                kept weights, 0 for the pruned ones).
+        """
+        super().__init__()
+        self.masks = masks
+
+    def on_train_batch_end(self, batch, logs=None):
+        for variable, mask in self.masks:
+            variable.assign(variable * mask)
+
+
+class Compression:
+    def __init__(self, config: CompressionConfig) -> None:
+        """Inits Compression.
+
+        Args:
+            config (CompressionConfig): The CompressionConfig.
+        """
+        logger.info(">>>>>>>>>>>> Compression Log Started <<<<<<<<<<<<")
+        self.config = config
+        configure_threads(
+            intra_op_threads=self.config.params_intra_op_threads,
+            inter_op_threads=self.config.params_inter_op_threads,
+        )
+
+    def _generator(self, subset: str, shuffle: bool):
+        """Creates a generator of a subset of the training data."""
+        return flow_from_directory(
+            datagen=tf.keras.preprocessing.image.ImageDataGenerator(
+                rescale=1.0 / 255,
+                validation_split=self.config.params_validation_split,
+            ),
+            directory=self.config.training_data_dir,
+            target_size=self.config.params_image_size[:-1],
+            batch_size=self.config.params_batch_size,
+            interpolation="bilinear",
+            scaled_decoding=self.config.params_scaled_decoding,
+            subset=subset,
+            shuffle=shuffle,
+        )
+
+    def prune(self):
+        """Loads the trained model, and prunes it iteratively with a short
+        fine-tuning after each iteration. The pruned model is saved in the
+        variable `self.model`.
+        """
+        logger.info("Loading the trained model")
+        self.model = tf.keras.models.load_model(filepath=self.config.model_path)
+        self.model.optimizer.learning_rate.assign(self.config.params_learning_rate)
+        train_generator = self._generator(subset="training", shuffle=True)
+        kernels = _get_kernels(self.model)
+
+        iterations = self.config.params_pruning_iterations
+        for iteration in range(1, iterations + 1):
+            sparsity = self.config.params_sparsity * (
+                1 - (1 - iteration / iterations) ** 3
+            )
+            masks = [
+                (kernel, get_pruning_mask(kernel.numpy(), sparsity).astype(np.float32))
+                for kernel in kernels
+            ]
+            for kernel, mask in masks:
+                kernel.assign(kernel * mask)
+            logger.info(
+                f"Pruning iteration {iteration}/{iterations}: sparsity {sparsity:.2%}"
+            )
+            if self.config.params_finetune_steps > 0:
+                self.model.fit(
+                    train_generator,
+                    epochs=1,
+                    steps_per_epoch=min(
+                        self.config.params_finetune_steps, len(train_generator)
+                    ),
+                    callbacks=[PruningMasks(masks=masks)],
+                )
+
+    def cluster(self):
+        """Replaces the remaining weights of each kernel by the centroid of
+        their cluster, if `params_clusters` is not 0.
+        """
+        if not self.config.params_clusters:
+            return
+        logger.info(
+            f"Clustering the weights of each kernel in {self.config.params_clusters} clusters"
+        )
+        for kernel in _get_kernels(self.model):
+            weights = kernel.numpy()
+            mask = weights != 0
+            indices, centroids = cluster_weights(
+                weights[mask], self.config.params_clusters
+            )
+            weights[mask] = centroids[indices]
+            kernel.assign(weights)
+
+    def _latency(self, model: tf.keras.Model, image: np.ndarray) -> float:
+        """Returns the median CPU latency of a single-image prediction."""
+        model.predict_on_batch(image)
+        seconds = []
+        for _ in range(self.config.params_latency_runs):
+            start_time = time.perf_counter()
+            model.predict_on_batch(image)
+            seconds.append(time.perf_counter() - start_time)
+        return float(np.median(seconds))
+
+    def _accuracy(self, model: tf.keras.Model, generator) -> float:
+        """Returns the accuracy of a model on a generator."""
+        correct = 0
+        for index in range(len(generator)):
+            images, labels = generator[index]
+            predictions = model.predict_on_batch(images)
+            correct += int(
+                np.sum(np.argmax(predictions, axis=1) == np.argmax(labels, axis=1))
+            )
+        return correct / generator.samples
+
+    def export(self) -> dict:
+        """Saves the compressed model, and reports its sparsity, its size, its
+        CPU latency and its accuracy against the uncompressed model.
+
+        Returns:
+            dict: The compression report.
+        """
+        save_compressed_model(model=self.model, path=self.config.compressed_model_path)
+
+        # Comparing the model loaded back from the compressed artifact with
+        # the uncompressed model
+        compressed_model = load_compressed_model(path=self.config.compressed_model_path)
+        uncompressed_model = tf.keras.models.load_model(filepath=self.config.model_path)
+        validation_generator = self._generator(subset="validation", shuffle=False)
+        image = validation_generator[0][0][:1]
+
+        kernels = [kernel.numpy() for kernel in _get_kernels(compressed_model)]
+        kernel_weights = sum(kernel.size for kernel in kernels)
+        zero_weights = sum(int(np.sum(kernel == 0)) for kernel in kernels)
+        report = {
+            "sparsity": zero_weights / kernel_weights,
+            "clusters": self.config.params_clusters,
+            "layers": {
+                layer.name: float(np.mean(layer.kernel.numpy() == 0))
+                for layer in compressed_model.layers
+                if hasattr(layer, "kernel")
+            },
+            "uncompressed": {
+                "size_mb": os.path.getsize(self.config.model_path) / 1024**2,
+                "latency_seconds": self._latency(uncompressed_model, image),
+                "accuracy": self._accuracy(uncompressed_model, validation_generator),
+            },
+            "compressed": {
+                "size_mb": os.path.getsize(self.config.compressed_model_path) / 1024**2,
+                "latency_seconds": self._latency(compressed_model, image),
+                "accuracy": self._accuracy(compressed_model, validation_generator),
+            },
+        }
+        report["compression_ratio"] = (
+            report["uncompressed"]["size_mb"] / report["compressed"]["size_mb"]
+        )
+        log_event("compression_report", **report)
+        save_json(path=self.config.report_path, data=report)
+        return report
@@ -0,0 +1,395 @@
+"""This module contains the code for CrossValidation.
+
+The k folds are stratified by class and built once. Each fold trains the
+updated base model in its own process, pinned to its own CPU cores, and the
+number of concurrent processes is bounded by the available memory.
+
+The images are decoded once, into a memory-mapped file that all the folds
+share. When the backbone is frozen and there is no augmentation, the features
+of the backbone are cached instead, and each fold only trains the head.
+"""
+
+import os
+import json
+import math
+import time
+import hashlib
+import multiprocessing
+import numpy as np
+import tensorflow as tf
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from DeepClassifier.entities import CrossValidationConfig
+from DeepClassifier.components.image_loading import flow_from_directory
+from DeepClassifier.utils import save_json, get_file_hash, get_available_memory_mb
+from DeepClassifier import logger, flush_logs
+
+
+class MemmapSequence(tf.keras.utils.Sequence):
+    def __init__(
+        self,
+        inputs_path: Path,
+        labels: np.ndarray,
+        indices: np.ndarray,
+        batch_size: int,
+        datagen=None,
+        shuffle: bool = False,
+        seed: int = 42,
+    ) -> None:
+        """Inits MemmapSequence, which reads the batches of a subset of the
+        cached inputs from their memory-mapped file, so that a worker never
+        holds more than a batch in memory.
+
+        Args:
+            inputs_path (Path): Path of the cached inputs (`.npy`).
+            labels (np.ndarray): The one-hot labels of all the inputs.
+            indices (np.ndarray): Indices of the inputs of the subset.
+            batch_size (int): The batch size.
+            datagen (ImageDataGenerator, optional): Applied to each image, for
+                the rescaling and the augmentation. Defaults to None, i.e., the
+                inputs are used as they are.
+            shuffle (bool, optional): Whether to shuffle the subset after each
+                epoch. Defaults to False.
+            seed (int, optional): The random seed. Defaults to 42.
+        """
+        super().__init__()
+        self.inputs = np.load(inputs_path, mmap_mode="r")
+        self.labels = labels
+        self.indices = np.array(indices)
+        self.batch_size = batch_size
+        self.datagen = datagen
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.on_epoch_end()
+
+    def __len__(self) -> int:
+        return math.ceil(len(self.indices) / self.batch_size)
+
+    def __getitem__(self, index: int) -> tuple:
+        # Sorting the indices of the batch makes the reads sequential
+        batch_indices = np.sort(
+            self.indices[index * self.batch_size : (index + 1) * self.batch_size]
+        )
+        x = self.inputs[batch_indices].astype(np.float32)
+        if self.datagen is not None:
+            for i in range(len(x)):
+                x[i] = self.datagen.standardize(self.datagen.random_transform(x[i]))
+        return x, self.labels[batch_indices]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
+
+
+def _init_worker(core_sets):
+    """Pins a worker process to its own CPU cores, and sizes the thread pools
+    of TensorFlow accordingly.
+
+    Args:
+        core_sets (multiprocessing.Queue): The CPU cores of each worker.
+    """
+    cores = core_sets.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    tf.config.threading.set_intra_op_parallelism_threads(len(cores))
+    tf.config.threading.set_inter_op_parallelism_threads(2)
+
+
+def _train_fold(task: dict) -> dict:
+    """Trains the model on all the folds but one and evaluates it on that one.
+    Runs in a worker process.
+
+    Args:
+        task (dict): The fold and everything needed to train on it.
+
+    Returns:
+        dict: The fold, its scores and its training time.
+    """
+    start_time = time.perf_counter()
+    fold = task["fold"]
+    if hasattr(os, "sched_getaffinity"):
+        logger.info(
+            f"Training the fold {fold} on the CPU cores {os.sched_getaffinity(0)}"
+        )
+    else:
+        logger.info(f"Training the fold {fold}")
+    model = tf.keras.models.load_model(task["model_path"])
+
+    train_datagen = validation_datagen = None
+    if task["augmentation_kwargs"] is not None:
+        train_datagen = tf.keras.preprocessing.image.ImageDataGenerator(
+            rescale=1.0 / 255, **task["augmentation_kwargs"]
+        )
+        validation_datagen = tf.keras.preprocessing.image.ImageDataGenerator(
+            rescale=1.0 / 255
+        )
+
+    sequence_kwargs = dict(
+        inputs_path=task["inputs_path"],
+        labels=task["labels"],
+        batch_size=task["batch_size"],
+    )
+    train_sequence = MemmapSequence(
+        indices=np.flatnonzero(task["folds"] != fold),
+        datagen=train_datagen,
+        shuffle=True,
+        seed=fold,
+        **sequence_kwargs,
+    )
+    validation_sequence = MemmapSequence(
+        indices=np.flatnonzero(task["folds"] == fold),
+        datagen=validation_datagen,
+        **sequence_kwargs,
+    )
+
+    model.fit(train_sequence, epochs=task["epochs"], verbose=0)
+    loss, accuracy = model.evaluate(validation_sequence, verbose=0)
+    seconds = time.perf_counter() - start_time
+    logger.info(f"Fold {fold}: loss = {loss}, accuracy = {accuracy}")
+    # The worker processes exit without running the `atexit` functions
+    flush_logs()
+    return {
+        "fold": fold,
+        "loss": float(loss),
+        "accuracy": float(accuracy),
+        "seconds": seconds,
+    }
+
+
+class CrossValidation:
+    def __init__(self, config: CrossValidationConfig) -> None:
+        """Inits CrossValidation.
+
+        Args:
+            config (CrossValidationConfig): The CrossValidationConfig.
+        """
+        logger.info(">>>>>>>>>>>> CrossValidation Log Started <<<<<<<<<<<<")
+        self.config = config
+
+    def _generator(self):
+        """Creates a generator over all the images, without rescaling."""
+        return flow_from_directory(
+            datagen=tf.keras.preprocessing.image.ImageDataGenerator(),
+            directory=self.config.training_data_dir,
+            scaled_decoding=self.config.params_scaled_decoding,
+            target_size=self.config.params_image_size[:-1],
+            batch_size=self.config.params_batch_size,
+            interpolation="bilinear",
+            shuffle=False,
+        )
+
+    def build_folds(self):
+        """Assigns each image to a fold, stratified by class, and saves the
+        folds. The saved folds are reused if the images did not change.
+        """
+        self.generator = self._generator()
+        filenames = list(self.generator.filenames)
+        classes = self.generator.classes
+        self.labels = tf.keras.utils.to_categorical(
+            classes, num_classes=len(self.generator.class_indices)
+        )
+
+        if os.path.exists(self.config.folds_path):
+            with open(self.config.folds_path) as f:
+                saved = json.load(f)
+            if (
+                saved["filenames"] == filenames
+                and saved["number_of_folds"] == self.config.params_folds
+            ):
+                logger.info("Reusing the saved folds")
+                self.folds = np.array(saved["folds"])
+                return
+
+        logger.info(f"Building {self.config.params_folds} folds")
+        rng = np.random.default_rng(42)
+        self.folds = np.empty(len(filenames), dtype=np.int64)
+        for label in np.unique(classes):
+            indices = np.flatnonzero(classes == label)
+            rng.shuffle(indices)
+            self.folds[indices] = np.arange(len(indices)) % self.config.params_folds
+        save_json(
+            path=self.config.folds_path,
+            data={
+                "number_of_folds": self.config.params_folds,
+                "filenames": filenames,
+                "folds": self.folds.tolist(),
+            },
+        )
+
+    def cache_inputs(self):
+        """Decodes the images once, and saves them (or, if the backbone is
+        frozen and there is no augmentation, their features) to a
+        memory-mapped file shared by the folds. The cache is reused if its
+        inputs did not change.
+        """
+        model = tf.keras.models.load_model(self.config.updated_base_model_path)
+        # Only the output layer is trainable if the backbone is frozen
+        frozen_backbone = len(model.trainable_weights) == len(
+            model.layers[-1].trainable_weights
+        )
+        self.cache_features = frozen_backbone and not self.config.params_augmentation
+        self.model_path = self.config.updated_base_model_path
+
+        cache_key_data = {
+            "filenames": list(self.generator.filenames),
+            "image_size": list(self.config.params_image_size),
+            "scaled_decoding": self.config.params_scaled_decoding,
+            "features": self.cache_features,
+        }
+        if self.cache_features:
+            cache_key_data["model_hash"] = get_file_hash(self.model_path)
+            self.inputs_path = Path(self.config.cache_dir) / "features.npy"
+            # Each fold only trains the head, on the features
+            self.model_path = Path(self.config.cache_dir) / "head.h5"
+        else:
+            self.inputs_path = Path(self.config.cache_dir) / "images.npy"
+        cache_key = hashlib.sha256(
+            json.dumps(cache_key_data, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        cache_key_path = Path(self.config.cache_dir) / "cache_key.txt"
+        if (
+            os.path.exists(cache_key_path)
+            and cache_key_path.read_text() == cache_key
+            and os.path.exists(self.inputs_path)
+            and os.path.exists(self.model_path)
+        ):
+            logger.info(f"Reusing the cached inputs: {self.inputs_path}")
+            return
+
+        if self.cache_features:
+            logger.info("The backbone is frozen. Hence, caching its features")
+            encoder = tf.keras.models.Model(
+                inputs=model.input, outputs=model.layers[-2].output
+            )
+            shape = encoder.output_shape[1:]
+            dtype = np.float32
+            self._save_head(model=model, input_shape=shape)
+        else:
+            logger.info("Caching the decoded images")
+            shape, dtype = tuple(self.config.params_image_size), np.uint8
+
+        inputs = np.lib.format.open_memmap(
+            self.inputs_path,
+            mode="w+",
+            dtype=dtype,
+            shape=(self.generator.samples,) + tuple(shape),
+        )
+        start = 0
+        for i in range(len(self.generator)):
+            images, _ = self.generator[i]
+            if self.cache_features:
+                batch = encoder.predict_on_batch(images / 255.0)
+            else:
+                batch = images.astype(np.uint8)
+            inputs[start : start + len(batch)] = batch
+            start += len(batch)
+        inputs.flush()
+        cache_key_path.write_text(cache_key)
+
+    def _save_head(self, model: tf.keras.Model, input_shape: tuple):
+        """Saves the output layer of the model as a model on the features,
+        compiled like the model.
+        """
+        inputs = tf.keras.Input(shape=input_shape)
+        head = tf.keras.models.Model(inputs=inputs, outputs=model.layers[-1](inputs))
+        head.compile(
+            optimizer=model.optimizer.__class__.from_config(
+                model.optimizer.get_config()
+            ),
+            loss=model.loss,
+            metrics=["accuracy"],
+        )
+        head.save(self.model_path)
+
+    def _get_core_sets(self) -> list:
+        """Returns the CPU cores of each worker. The number of workers is
+        bounded by the number of folds, of CPU cores and by the available
+        memory.
+        """
+        if hasattr(os, "sched_getaffinity"):
+            cores = sorted(os.sched_getaffinity(0))
+        else:
+            cores = list(range(os.cpu_count() or 1))
+        memory_bound = max(
+            int(get_available_memory_mb() // self.config.params_worker_memory_mb), 1
+        )
+        workers = min(
+            self.config.params_workers or len(cores),
+            self.config.params_folds,
+            len(cores),
+            memory_bound,
+        )
+        logger.info(
+            f"Using {workers} workers (CPU cores: {len(cores)}, memory bound: {memory_bound})"
+        )
+        return [cores[i::workers] for i in range(workers)]
+
+    def run(self) -> dict:
+        """Trains and evaluates the model on each fold, concurrently, and saves
+        the scores of each fold and their mean and variance.
+
+        Returns:
+            dict: The mean and the variance of the scores over the folds.
+        """
+        start_time = time.perf_counter()
+        self.build_folds()
+        self.cache_inputs()
+
+        augmentation_kwargs = None
+        if not self.cache_features:
+            augmentation_kwargs = {}
+            if self.config.params_augmentation:
+                augmentation_kwargs = dict(
+                    rotation_range=self.config.params_rotation_range,
+                    horizontal_flip=self.config.params_horizontal_flip,
+                    width_shift_range=self.config.params_width_shift_range,
+                    height_shift_range=self.config.params_height_shift_range,
+                    shear_range=self.config.params_shear_range,
+                    zoom_range=self.config.params_zoom_range,
+                )
+        tasks = [
+            {
+                "fold": fold,
+                "folds": self.folds,
+                "labels": self.labels,
+                "inputs_path": str(self.inputs_path),
+                "model_path": str(self.model_path),
+                "epochs": self.config.params_epochs,
+                "batch_size": self.config.params_batch_size,
+                "augmentation_kwargs": augmentation_kwargs,
+            }
+            for fold in range(self.config.params_folds)
+        ]
+
+        # TensorFlow is not fork-safe, so the workers are spawned
+        context = multiprocessing.get_context("spawn")
+        core_sets = self._get_core_sets()
+        core_queue = context.Queue()
+        for core_set in core_sets:
+            core_queue.put(core_set)
+        with ProcessPoolExecutor(
+            max_workers=len(core_sets),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(core_queue,),
+        ) as pool:
+            fold_scores = list(pool.map(_train_fold, tasks))
+
+        losses = [scores["loss"] for scores in fold_scores]
+        accuracies = [scores["accuracy"] for scores in fold_scores]
+        aggregates = {
+            "cv_folds": self.config.params_folds,
+            "cv_loss_mean": float(np.mean(losses)),
+            "cv_loss_variance": float(np.var(losses, ddof=1)),
+            "cv_accuracy_mean": float(np.mean(accuracies)),
+            "cv_accuracy_variance": float(np.var(accuracies, ddof=1)),
+            "cv_seconds": time.perf_counter() - start_time,
+        }
+        logger.info(f"Cross-validation scores: {aggregates}")
+        save_json(
+            path=self.config.scores_path,
+            data={"folds": fold_scores, **aggregates},
+        )
+        return aggregates
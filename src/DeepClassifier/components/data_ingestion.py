@@ -9,7 +9,7 @@ from tqdm import tqdm
 
 from DeepClassifier.entities import DataIngestionConfig
 from DeepClassifier import logger
-from DeepClassifier.utils import get_size
+from DeepClassifier.utils import get_size, save_json, LogSummary
 
 
 class DataIngestion:
@@ -60,7 +60,9 @@ class DataIngestion:
 
         return updated_list_of_files
 
-    def _preprocess(self, zf: ZipFile, file: Path, working_dir: Path) -> None:
+    def _preprocess(
+        self, zf: ZipFile, file: Path, working_dir: Path, summary: LogSummary
+    ) -> bool:
         """Extracts a file from the zipped data file.
 
         Args:
@@ -68,6 +70,11 @@ class DataIngestion:
             file (str): The file (path) in the zip data to be extracted.
             working_dir (str): The directory in which the file is to be
                 extracted.
+            summary (LogSummary): The summary in which the extracted and the
+                deleted files are counted, instead of logging each file.
+
+        Returns:
+            bool: Whether the file was kept.
         """
         # Creating the path of the file that is to be extracted
         target_file_path = Path(os.path.join(working_dir, file))
@@ -75,13 +82,23 @@ class DataIngestion:
         # We extract the file only if it does not already exists
         if not os.path.exists(target_file_path):
             zf.extract(str(file), str(working_dir))
+            summary.add("extracted")
 
         # If the size of the extracted file is 0 KB, we delete it
         if os.path.getsize(target_file_path) == 0:
-            logger.info(
-                f"The file '{target_file_path}' has zero size. Hence, deleting it"
-            )
+            summary.add("deleted_zero_size", example=target_file_path)
+            os.remove(target_file_path)
+            return False
+
+        # If the extracted file does not start with the JPEG SOI marker, it is
+        # either corrupt or not a JPEG image at all. So, we delete it
+        with open(target_file_path, "rb") as f:
+            is_jpeg = f.read(3) == b"\xff\xd8\xff"
+        if not is_jpeg:
+            summary.add("deleted_not_jpeg", example=target_file_path)
             os.remove(target_file_path)
+            return False
+        return True
 
     def unzip_and_clean_data_file(self) -> None:
         """Unzips and cleans the data file."""
@@ -102,7 +119,22 @@ class DataIngestion:
 
             # Extracting the files
             logger.info("Extracting and clearning the files")
+            summary = LogSummary(name="Data ingestion")
+            manifest = {}
             for file in tqdm(updated_list_of_files):
-                self._preprocess(
-                    zf=zf, file=file, working_dir=self.config.unzipped_file_dir
+                kept = self._preprocess(
+                    zf=zf,
+                    file=file,
+                    working_dir=self.config.unzipped_file_dir,
+                    summary=summary,
                 )
+                if kept:
+                    # The CRC-32 and the size are read from the zip directory,
+                    # so the content of the file is not read again
+                    info = zf.getinfo(file)
+                    manifest[file] = f"{info.CRC:08x}-{info.file_size}"
+            summary.close()
+
+        # Saving the manifest of the kept images, so that the images added
+        # since a training run can be found by comparing the manifests
+        save_json(path=Path(self.config.manifest_path), data=manifest)
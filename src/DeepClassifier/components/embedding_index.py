@@ -0,0 +1,208 @@
+"""This module contains the code for EmbeddingIndex."""
+
+import json
+import math
+import numpy as np
+import tensorflow as tf
+
+from pathlib import Path
+
+from DeepClassifier.entities import EmbeddingIndexConfig
+from DeepClassifier.components.image_loading import flow_from_directory, load_image
+from DeepClassifier.utils import save_json, PCA, IVFIndex
+from DeepClassifier import logger
+
+
+class EmbeddingIndex:
+    def __init__(self, config: EmbeddingIndexConfig) -> None:
+        """Inits EmbeddingIndex.
+
+        Args:
+            config (EmbeddingIndexConfig): The EmbeddingIndexConfig.
+        """
+        logger.info(">>>>>>>>>>>> EmbeddingIndex Log Started <<<<<<<<<<<<")
+        self.config = config
+
+    def get_embedding_model(self):
+        """Loads the trained model and saves the model that outputs its
+        penultimate layer (the flattened VGG16 features) in the variable
+        `self.embedding_model`.
+        """
+        logger.info("Loading the trained model")
+        model = tf.keras.models.load_model(filepath=self.config.model_path)
+
+        logger.info(f"Using the layer '{model.layers[-2].name}' as the embedding")
+        self.embedding_model = tf.keras.models.Model(
+            inputs=model.input, outputs=model.layers[-2].output
+        )
+
+    def _image_generator(self, shuffle: bool):
+        """Creates a generator over all the images, without labels.
+
+        Args:
+            shuffle (bool): Whether to shuffle the images.
+
+        Returns:
+            DirectoryIterator: The generator.
+        """
+        datagen = tf.keras.preprocessing.image.ImageDataGenerator(rescale=1.0 / 255)
+        return flow_from_directory(
+            datagen=datagen,
+            directory=self.config.training_data_dir,
+            scaled_decoding=self.config.params_scaled_decoding,
+            target_size=self.config.params_image_size[:-1],
+            batch_size=self.config.params_batch_size,
+            interpolation="bilinear",
+            class_mode=None,
+            shuffle=shuffle,
+            seed=42,
+        )
+
+    def _fit_pca(self):
+        """Fits the PCA on a random sample of the images and saves it."""
+        generator = self._image_generator(shuffle=True)
+        number_of_batches = min(
+            math.ceil(self.config.params_pca_samples / generator.batch_size),
+            len(generator),
+        )
+        logger.info(f"Fitting the PCA on {number_of_batches} batches of images")
+        sample = np.concatenate(
+            [
+                self.embedding_model.predict_on_batch(generator[i])
+                for i in range(number_of_batches)
+            ]
+        )
+        self.pca = PCA(n_components=self.config.params_pca_components).fit(sample)
+        self.pca.save(self.config.pca_path)
+
+    def _to_embeddings(self, features: np.ndarray) -> np.ndarray:
+        """Reduces (with the PCA, if any) and L2-normalizes the features, so
+        that the L2 distance ranks the images like the cosine distance.
+
+        Args:
+            features (np.ndarray): The features of the penultimate layer.
+
+        Returns:
+            np.ndarray: The embeddings.
+        """
+        if self.config.params_pca_components > 0:
+            features = self.pca.transform(features)
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        return (features / np.maximum(norms, 1e-12)).astype(np.float32)
+
+    def extract_embeddings(self):
+        """Streams all the images through the embedding model and writes their
+        embeddings to a memory-mapped `.npy` file, batch by batch.
+        """
+        if self.config.params_pca_components > 0:
+            self._fit_pca()
+
+        generator = self._image_generator(shuffle=False)
+        if self.config.params_pca_components > 0:
+            # The PCA keeps fewer components if it is fitted on fewer images
+            embedding_size = len(self.pca.components)
+        else:
+            embedding_size = self.embedding_model.output_shape[-1]
+        logger.info(
+            f"Extracting the embeddings of size {embedding_size} of {generator.samples} images"
+        )
+        embeddings = np.lib.format.open_memmap(
+            self.config.embeddings_path,
+            mode="w+",
+            dtype=np.float32,
+            shape=(generator.samples, embedding_size),
+        )
+        start = 0
+        for i in range(len(generator)):
+            batch_embeddings = self._to_embeddings(
+                self.embedding_model.predict_on_batch(generator[i])
+            )
+            embeddings[start : start + len(batch_embeddings)] = batch_embeddings
+            start += len(batch_embeddings)
+        embeddings.flush()
+
+        save_json(
+            path=self.config.filenames_path,
+            data={"filenames": list(generator.filenames)},
+        )
+
+    def build_index(self):
+        """Builds the nearest-neighbour index over the embeddings and saves
+        it.
+        """
+        embeddings = np.load(self.config.embeddings_path, mmap_mode="r")
+        n_lists = self.config.params_index_lists or int(math.sqrt(len(embeddings)))
+        logger.info(f"Building the index with {n_lists} lists")
+        IVFIndex.build(embeddings=embeddings, n_lists=n_lists).save(
+            self.config.index_dir
+        )
+
+    def load_index(self):
+        """Loads the index, the memory-mapped embeddings, the filenames and the
+        PCA, so that the index can be queried.
+        """
+        logger.info("Loading the embedding index")
+        embeddings = np.load(self.config.embeddings_path, mmap_mode="r")
+        self.index = IVFIndex.load(
+            index_dir=self.config.index_dir, embeddings=embeddings
+        )
+        with open(self.config.filenames_path) as f:
+            self.filenames = json.load(f)["filenames"]
+        self.filename_ids = {filename: i for i, filename in enumerate(self.filenames)}
+        if self.config.params_pca_components > 0:
+            self.pca = PCA.load(self.config.pca_path)
+
+    def query_embedding(self, embedding: np.ndarray, k: int = 10) -> list:
+        """Returns the `k` nearest neighbours of an embedding.
+
+        Args:
+            embedding (np.ndarray): The embedding.
+            k (int, optional): Number of neighbours. Defaults to 10.
+
+        Returns:
+            list: The filename and the distance of each neighbour.
+        """
+        distances, ids = self.index.search(
+            embedding, k=k, n_probe=self.config.params_index_probes
+        )
+        return [
+            {"filename": self.filenames[i], "distance": float(distance)}
+            for distance, i in zip(distances[0], ids[0])
+            if i >= 0
+        ]
+
+    def query_filename(self, filename: str, k: int = 10) -> list:
+        """Returns the `k` nearest neighbours of an indexed image, without
+        running the model.
+
+        Args:
+            filename (str): The filename of the image, relative to the training
+                data directory (e.g., 'Cat/0.jpg').
+            k (int, optional): Number of neighbours. Defaults to 10.
+
+        Returns:
+            list: The filename and the distance of each neighbour.
+        """
+        embedding = self.index.embeddings[self.filename_ids[filename]]
+        return self.query_embedding(embedding=np.asarray(embedding), k=k)
+
+    def query_image(self, path: Path, k: int = 10) -> list:
+        """Returns the `k` nearest neighbours of any image. This runs the
+        embedding model, which is loaded if needed.
+
+        Args:
+            path (Path): Path of the image.
+            k (int, optional): Number of neighbours. Defaults to 10.
+
+        Returns:
+            list: The filename and the distance of each neighbour.
+        """
+        if not hasattr(self, "embedding_model"):
+            self.get_embedding_model()
+        image = load_image(
+            path=path,
+            image_size=self.config.params_image_size,
+            scaled_decoding=self.config.params_scaled_decoding,
+        )[np.newaxis]
+        embedding = self._to_embeddings(self.embedding_model.predict_on_batch(image))
+        return self.query_embedding(embedding=embedding, k=k)
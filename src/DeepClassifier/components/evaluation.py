@@ -1,10 +1,21 @@
 """This module contains the code for Evaluation."""
 
+import os
+import json
+import time
+import hashlib
 import tensorflow as tf
 from pathlib import Path
+from typing import Optional
 
 from DeepClassifier.entities import EvaluationConfig
-from DeepClassifier.utils import save_json
+from DeepClassifier.components.tf_threads import configure_threads
+from DeepClassifier.components.tta import build_tta_model
+from DeepClassifier.components.xla import evaluate_fixed_shape
+from DeepClassifier.components.image_loading import flow_from_directory
+from DeepClassifier.components.shared_weights import load_flat_model
+from DeepClassifier.utils import save_json, get_file_hash
+from DeepClassifier import logger
 
 
 class Evaluation:
@@ -15,6 +26,10 @@ class Evaluation:
             config (EvaluationConfig): The EvaluationConfig.
         """
         self.config = config
+        configure_threads(
+            intra_op_threads=self.config.params_intra_op_threads,
+            inter_op_threads=self.config.params_inter_op_threads,
+        )
 
     def _val_generator(self):
         """Creates validation generator for evaluation."""
@@ -31,22 +46,233 @@ class Evaluation:
 
         val_datagen = tf.keras.preprocessing.image.ImageDataGenerator(**datagen_kwargs)
 
-        self.validation_generator = val_datagen.flow_from_directory(
+        self.validation_generator = flow_from_directory(
+            datagen=val_datagen,
             directory=self.config.training_data_dir,
+            scaled_decoding=self.config.params_scaled_decoding,
             subset="validation",
             shuffle=False,
             **dataflow_kwargs,
         )
 
-    def evaluation(self):
-        """Evaluates the model."""
-        self.model = self.load_model(path=self.config.model_path)
-        self._val_generator()
-        self.scores = self.model.evaluate(self.validation_generator)
+    def _get_cache_key(self, tta_views=None) -> str:
+        """Returns the key under which the scores of the model are cached.
+
+        The key is a hash of the model weights, the files (and labels) of the
+        validation split, and the parameters that affect the scores. The
+        model file that is loaded (the flat weights file with
+        `params_shared_weights`) is hashed directly, so a cache hit never has
+        to load the model.
+
+        Args:
+            tta_views (list, optional): The TTA views used for the evaluation.
+                Defaults to None, i.e., no TTA.
+
+        Returns:
+            str: The cache key.
+        """
+        if not hasattr(self, "model_hash"):
+            # Hashing the file the model is loaded from
+            if self.config.params_shared_weights:
+                model_path = self.config.flat_model_path
+            else:
+                model_path = self.config.model_path
+            self.model_hash = get_file_hash(Path(model_path))
+
+        key_data = {
+            "model_hash": self.model_hash,
+            "validation_files": list(self.validation_generator.filenames),
+            "validation_labels": self.validation_generator.classes.tolist(),
+            "image_size": list(self.config.params_image_size),
+            "batch_size": self.config.params_batch_size,
+            "validation_split": self.config.params_validation_split,
+            "tta_views": list(tta_views) if tta_views else None,
+            "jit_compile": self.config.params_jit_compile,
+            "scaled_decoding": self.config.params_scaled_decoding,
+        }
+        return hashlib.sha256(
+            json.dumps(key_data, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def _load_cached_result(self, key: str):
+        """Loads the cached result for a given cache key.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            dict | None: The cached scores and evaluation time, or `None` if
+                they are not cached.
+        """
+        cache_file_path = Path(os.path.join(self.config.cache_dir, f"{key}.json"))
+        if not os.path.exists(cache_file_path):
+            return None
+
+        with open(cache_file_path) as f:
+            result = json.load(f)
+
+        # Touching the file so that eviction removes the least recently used
+        # results first
+        os.utime(cache_file_path)
+        return result
+
+    def _save_result_to_cache(self, key: str, scores: list, seconds: float):
+        """Saves the result to the cache and evicts the least recently used
+        results if the cache holds more than `params_cache_size` of them.
+
+        Args:
+            key (str): The cache key.
+            scores (list): The scores (loss and accuracy) to be cached.
+            seconds (float): The time taken by the evaluation.
+        """
+        cache_file_path = Path(os.path.join(self.config.cache_dir, f"{key}.json"))
+        save_json(
+            path=cache_file_path,
+            data={
+                "model_path": str(self.config.model_path),
+                "scores": scores,
+                "seconds": seconds,
+            },
+        )
+
+        cached_files = sorted(
+            Path(self.config.cache_dir).glob("*.json"),
+            key=lambda path: os.path.getmtime(path),
+        )
+        number_of_files_to_evict = len(cached_files) - self.config.params_cache_size
+        for path in cached_files[: max(number_of_files_to_evict, 0)]:
+            logger.info(f"Evicting the cached evaluation result: {path}")
+            os.remove(path)
+
+    def _evaluate(self, tta_views=None, force_refresh: bool = False) -> tuple:
+        """Evaluates the model, or returns its cached result.
+
+        Args:
+            tta_views (list, optional): The TTA views to evaluate the model
+                with. Defaults to None, i.e., no TTA.
+            force_refresh (bool, optional): Whether to ignore the cached
+                result. Defaults to False.
+
+        Returns:
+            tuple: The scores (loss and accuracy) and the evaluation time in
+                seconds.
+        """
+        cache_key = self._get_cache_key(tta_views=tta_views)
+
+        if not force_refresh:
+            cached_result = self._load_cached_result(key=cache_key)
+            if cached_result is not None:
+                logger.info(f"Evaluation cache hit for the key: {cache_key}")
+                return cached_result["scores"], cached_result["seconds"]
+            logger.info(f"Evaluation cache miss for the key: {cache_key}")
+        else:
+            logger.info("Forced refresh. Ignoring the evaluation cache")
+
+        # The model is loaded only on the first miss
+        if not hasattr(self, "model"):
+            if self.config.params_shared_weights:
+                self.model = load_flat_model(path=self.config.flat_model_path)
+            else:
+                self.model = self.load_model(path=self.config.model_path)
+        if tta_views:
+            model = build_tta_model(
+                model=self.model,
+                views=tta_views,
+                jit_compile=self.config.params_jit_compile,
+            )
+        else:
+            model = self.model
+            # `jit_compile` is not saved with the model, so it is set again
+            model.jit_compile = self.config.params_jit_compile
+
+        start_time = time.perf_counter()
+        if self.config.params_jit_compile:
+            scores = evaluate_fixed_shape(
+                model=model, generator=self.validation_generator
+            )
+        else:
+            scores = list(model.evaluate(self.validation_generator))
+        seconds = time.perf_counter() - start_time
+
+        self._save_result_to_cache(key=cache_key, scores=scores, seconds=seconds)
+        return scores, seconds
 
-    def save_scores(self):
-        """Saves the scores (loss and accuracy) of the evaluated model."""
-        scores = {"loss": self.scores[0], "accuracy": self.scores[1]}
+    def evaluation(
+        self,
+        force_refresh: bool = False,
+        model: tf.keras.Model = None,
+        validation_generator=None,
+    ):
+        """Evaluates the model, and additionally evaluates it with TTA if
+        `params_tta` is `True`.
+
+        The scores are looked up in the evaluation cache first, and the model
+        is only loaded and evaluated on a miss.
+
+        Args:
+            force_refresh (bool, optional): Whether to ignore the cached
+                scores and evaluate the model again. Defaults to False.
+            model (tf.keras.Model, optional): The model saved at `model_path`,
+                if it is already in memory. Defaults to None, i.e., it is
+                loaded from `model_path` if needed.
+            validation_generator (optional): The validation generator, if it
+                is already in memory. It must be created with the same
+                parameters as in `_val_generator`. Defaults to None, i.e., it
+                is created.
+        """
+        if model is not None:
+            logger.info("Using the model already in memory")
+            self.model = model
+
+        if validation_generator is not None:
+            logger.info("Using the validation generator already in memory")
+            self.validation_generator = validation_generator
+        else:
+            self._val_generator()
+        self.scores, self.evaluation_seconds = self._evaluate(
+            force_refresh=force_refresh
+        )
+
+        if self.config.params_tta:
+            logger.info(f"Evaluating with TTA views: {self.config.params_tta_views}")
+            self.tta_scores, self.tta_evaluation_seconds = self._evaluate(
+                tta_views=self.config.params_tta_views,
+                force_refresh=force_refresh,
+            )
+
+    def save_scores(self, cross_validation_scores: Optional[dict] = None):
+        """Saves the scores (loss and accuracy) of the evaluated model.
+
+        Args:
+            cross_validation_scores (dict, optional): The mean and the variance
+                of the scores of cross-validation, saved with the scores.
+                Defaults to None, i.e., cross-validation was not run.
+        """
+        scores = {
+            "loss": self.scores[0],
+            "accuracy": self.scores[1],
+            # The batch size and the threads may come from tuning.yaml, which
+            # DVC does not track
+            "batch_size": self.config.params_batch_size,
+            "intra_op_threads": self.config.params_intra_op_threads,
+            "inter_op_threads": self.config.params_inter_op_threads,
+        }
+        if self.config.params_tta:
+            # Reporting the gain in accuracy and the extra cost of TTA
+            scores.update(
+                {
+                    "tta_loss": self.tta_scores[0],
+                    "tta_accuracy": self.tta_scores[1],
+                    "tta_accuracy_delta": self.tta_scores[1] - self.scores[1],
+                    "tta_views": len(self.config.params_tta_views),
+                    "evaluation_seconds": self.evaluation_seconds,
+                    "tta_evaluation_seconds": self.tta_evaluation_seconds,
+                    "tta_cost_ratio": self.tta_evaluation_seconds
+                    / self.evaluation_seconds,
+                }
+            )
+        if cross_validation_scores is not None:
+            scores.update(cross_validation_scores)
         save_json(path=Path("scores.json"), data=scores)
 
     @staticmethod
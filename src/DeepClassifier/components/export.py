@@ -0,0 +1,252 @@
+"""This module contains the code for Export.
+
+The trained model is exported as a minimal inference bundle: a SavedModel
+whose signatures take the raw images, either as uint8 pixels or as encoded
+JPEG bytes, and run the decoding, the resize and the 1/255 rescale of the
+training data in the graph before the model. Only the weights of the model are
+saved with the signatures, without the optimizer state, the compile
+configuration or the Keras layer functions, so the clients send 4x smaller
+requests than float32 images, and loading the bundle only reads what inference
+needs.
+
+The bundle is loaded with `tf.saved_model.load`, and its signatures return the
+class probabilities under the key `probabilities`:
+
+- `serving_default`: a batch of uint8 images of shape (batch, height, width,
+  3), of any height and width;
+- `serving_jpeg`: a batch of encoded JPEG images, as a string tensor of shape
+  (batch,).
+"""
+
+import os
+import shutil
+import time
+import numpy as np
+import tensorflow as tf
+
+from pathlib import Path
+
+from DeepClassifier.entities import ExportConfig
+from DeepClassifier.components.tf_threads import configure_threads
+from DeepClassifier.components.image_loading import flow_from_directory, load_image
+from DeepClassifier.utils import save_json
+from DeepClassifier import logger, log_event
+
+
+def build_serving_module(model: tf.keras.Model, image_size: list) -> tf.Module:
+    """Wraps a model in a module with the serving signatures of the bundle,
+    which preprocess the images in the graph.
+
+    Args:
+        model (tf.keras.Model): The trained model.
+        image_size (list): The image size, as in `IMAGE_SIZE`.
+
+    Returns:
+        tf.Module: The module, which only tracks the weights of the model.
+    """
+    target_size = tuple(image_size[:2])
+
+    def resize(images: tf.Tensor) -> tf.Tensor:
+        # Same bilinear resize as the training data, which PIL antialiases
+        return tf.image.resize(tf.cast(images, tf.float32), target_size, antialias=True)
+
+    def predict(images: tf.Tensor) -> dict:
+        return {"probabilities": model(images / 255.0, training=False)}
+
+    @tf.function(input_signature=[tf.TensorSpec([None, None, None, 3], tf.uint8)])
+    def serving_default(images):
+        return predict(resize(images))
+
+    def decode(jpeg: tf.Tensor) -> tf.Tensor:
+        # `INTEGER_ACCURATE` is the default DCT method of libjpeg, as in PIL
+        return resize(
+            tf.io.decode_jpeg(jpeg, channels=3, dct_method="INTEGER_ACCURATE")
+        )
+
+    @tf.function(input_signature=[tf.TensorSpec([None], tf.string)])
+    def serving_jpeg(jpegs):
+        # The images may have different sizes, so they are decoded and resized
+        # one by one before being batched
+        images = tf.map_fn(
+            decode, jpegs, fn_output_signature=tf.TensorSpec(target_size + (3,))
+        )
+        return predict(images)
+
+    module = tf.Module()
+    # Tracking the weights of the model rather than the model itself, so the
+    # optimizer and the Keras layer functions are not saved
+    module.weights = list(model.weights)
+    module.serving_default = serving_default
+    module.serving_jpeg = serving_jpeg
+    return module
+
+
+def save_bundle(model: tf.keras.Model, image_size: list, path: Path):
+    """Saves the inference bundle of a model.
+
+    Args:
+        model (tf.keras.Model): The trained model.
+        image_size (list): The image size, as in `IMAGE_SIZE`.
+        path (Path): Directory of the bundle, replaced if it exists.
+    """
+    module = build_serving_module(model=model, image_size=image_size)
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    logger.info(f"Saving the inference bundle to: {path}")
+    tf.saved_model.save(
+        module,
+        str(path),
+        signatures={
+            "serving_default": module.serving_default,
+            "serving_jpeg": module.serving_jpeg,
+        },
+    )
+
+
+def _get_directory_size(path: Path) -> int:
+    """Returns the total size in bytes of the files in a directory."""
+    return sum(
+        os.path.getsize(os.path.join(root, filename))
+        for root, _, filenames in os.walk(path)
+        for filename in filenames
+    )
+
+
+class Export:
+    def __init__(self, config: ExportConfig) -> None:
+        """Inits Export.
+
+        Args:
+            config (ExportConfig): The ExportConfig.
+        """
+        logger.info(">>>>>>>>>>>> Export Log Started <<<<<<<<<<<<")
+        self.config = config
+        configure_threads(
+            intra_op_threads=self.config.params_intra_op_threads,
+            inter_op_threads=self.config.params_inter_op_threads,
+        )
+
+    def export(self):
+        """Loads the trained model and saves its inference bundle."""
+        logger.info("Loading the trained model")
+        model = tf.keras.models.load_model(filepath=self.config.model_path)
+        save_bundle(
+            model=model,
+            image_size=self.config.params_image_size,
+            path=self.config.bundle_dir,
+        )
+
+    def _load_seconds(self, load) -> float:
+        """Returns the median wall time of a model loading function."""
+        seconds = []
+        for _ in range(self.config.params_load_runs):
+            start_time = time.perf_counter()
+            load()
+            seconds.append(time.perf_counter() - start_time)
+        return float(np.median(seconds))
+
+    def _get_check_paths(self) -> list:
+        """Returns the paths of the validation images the bundle is checked
+        on.
+        """
+        validation_generator = flow_from_directory(
+            datagen=tf.keras.preprocessing.image.ImageDataGenerator(
+                validation_split=self.config.params_validation_split,
+            ),
+            directory=self.config.training_data_dir,
+            target_size=self.config.params_image_size[:-1],
+            batch_size=self.config.params_batch_size,
+            interpolation="bilinear",
+            scaled_decoding=self.config.params_scaled_decoding,
+            subset="validation",
+            shuffle=False,
+        )
+        return validation_generator.filepaths[: self.config.params_check_images]
+
+    def report(self) -> dict:
+        """Checks the predictions of the bundle against the trained model on
+        validation images, and reports the size, the load time and the request
+        payload size of both.
+
+        Returns:
+            dict: The export report.
+        """
+        model = tf.keras.models.load_model(filepath=self.config.model_path)
+        bundle = tf.saved_model.load(str(self.config.bundle_dir))
+        batch_size = self.config.params_batch_size
+
+        # The current path: decoding, resizing and rescaling outside the
+        # model, and float32 images sent to it
+        paths = self._get_check_paths()
+        images = np.stack(
+            [
+                load_image(
+                    path=Path(path),
+                    image_size=self.config.params_image_size,
+                    scaled_decoding=self.config.params_scaled_decoding,
+                )
+                for path in paths
+            ]
+        )
+        expected = model.predict(images, batch_size=batch_size, verbose=0)
+
+        # The bundle, with the same images as uint8 pixels, and with the
+        # encoded JPEG files
+        pixels = np.round(images * 255.0).astype(np.uint8)
+        jpegs = []
+        for path in paths:
+            with open(path, "rb") as f:
+                jpegs.append(f.read())
+        from_pixels = np.concatenate(
+            [
+                bundle.signatures["serving_default"](
+                    tf.constant(pixels[start : start + batch_size])
+                )["probabilities"].numpy()
+                for start in range(0, len(paths), batch_size)
+            ]
+        )
+        from_jpegs = np.concatenate(
+            [
+                bundle.signatures["serving_jpeg"](
+                    tf.constant(jpegs[start : start + batch_size])
+                )["probabilities"].numpy()
+                for start in range(0, len(paths), batch_size)
+            ]
+        )
+
+        def agreement(probabilities: np.ndarray) -> dict:
+            return {
+                "max_abs_difference": float(np.max(np.abs(probabilities - expected))),
+                "label_agreement": float(
+                    np.mean(
+                        np.argmax(probabilities, axis=1) == np.argmax(expected, axis=1)
+                    )
+                ),
+            }
+
+        image_values = int(np.prod(self.config.params_image_size))
+        report = {
+            "check_images": len(paths),
+            "h5": {
+                "size_mb": os.path.getsize(self.config.model_path) / 1024**2,
+                "load_seconds": self._load_seconds(
+                    lambda: tf.keras.models.load_model(filepath=self.config.model_path)
+                ),
+            },
+            "bundle": {
+                "size_mb": _get_directory_size(self.config.bundle_dir) / 1024**2,
+                "load_seconds": self._load_seconds(
+                    lambda: tf.saved_model.load(str(self.config.bundle_dir))
+                ),
+            },
+            "request_bytes_per_image": {
+                "float32": image_values * 4,
+                "uint8": image_values,
+                "jpeg": float(np.mean([len(jpeg) for jpeg in jpegs])),
+            },
+            "uint8": agreement(from_pixels),
+            "jpeg": agreement(from_jpegs),
+        }
+        log_event("export_report", **report)
+        save_json(path=self.config.report_path, data=report)
+        return report
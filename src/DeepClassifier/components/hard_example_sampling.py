@@ -0,0 +1,196 @@
+"""This module contains the code for loss-based hard-example sampling.
+
+Each epoch draws a fraction of the training samples. The warm-up epochs walk
+through shuffled passes over all the samples, and last until every sample has
+been trained on at least once, so that the loss table holds a loss for every
+sample. After that, the samples are drawn with probabilities proportional to
+their latest loss (mixed with a uniform distribution, so that every sample
+keeps a chance to be drawn). Each drawn sample is weighted by `1 / (N * p)`,
+which keeps the gradients unbiased.
+"""
+
+import math
+import time
+import numpy as np
+import tensorflow as tf
+
+from typing import Optional
+
+from DeepClassifier.components.image_loading import ImageListSequence
+from DeepClassifier.utils import save_json
+from DeepClassifier import logger
+
+
+def _get_peak_rss_mb() -> Optional[float]:
+    """Returns the peak RSS of the process in MB, or None where the
+    `resource` module is not available, e.g., on Windows.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # `ru_maxrss` is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class HardExampleSequence(tf.keras.utils.Sequence):
+    def __init__(
+        self,
+        images: ImageListSequence,
+        loss_table: tf.Variable,
+        fraction: float,
+        uniform_mix: float,
+        warmup_epochs: int,
+        seed: int = 42,
+    ) -> None:
+        """Inits HardExampleSequence.
+
+        Args:
+            images (ImageListSequence): The training images, which are loaded
+                and augmented the same way as without sampling.
+            loss_table (tf.Variable): The latest loss of each sample, e.g., of
+                `HardExampleModel`.
+            fraction (float): Fraction of the samples drawn per epoch.
+            uniform_mix (float): Weight of the uniform distribution in the
+                sampling distribution.
+            warmup_epochs (int): Minimum number of epochs that draw the samples
+                uniformly. The warm-up goes on until every sample was drawn.
+            seed (int, optional): The random seed. Defaults to 42.
+        """
+        super().__init__()
+        self.images = images
+        self.loss_table = loss_table
+        self.fraction = fraction
+        self.uniform_mix = uniform_mix
+        self.warmup_epochs = warmup_epochs
+        self.number_of_samples = len(images.paths)
+        self.batch_size = images.batch_size
+        self.samples_per_epoch = math.ceil(fraction * self.number_of_samples)
+        self.rng = np.random.default_rng(seed)
+        self.epoch = 0
+        # The samples not drawn yet by the warm-up
+        self.unseen = np.ones(self.number_of_samples, dtype=bool)
+        self.warmup_queue = np.array([], dtype=int)
+        self._draw_samples()
+
+    def _draw_warmup_samples(self):
+        """Draws the next samples of the shuffled passes over all the samples."""
+        # Only the samples of the full batches are trained on
+        drawn = len(self) * self.batch_size
+        while len(self.warmup_queue) < drawn:
+            self.warmup_queue = np.concatenate(
+                [self.warmup_queue, self.rng.permutation(self.number_of_samples)]
+            )
+        self.sample_ids = self.warmup_queue[:drawn]
+        self.warmup_queue = self.warmup_queue[drawn:]
+        self.unseen[self.sample_ids] = False
+        self.importance_weights = np.ones(drawn, np.float32)
+
+    def _draw_samples(self):
+        """Draws the samples (and their importance weights) of the epoch."""
+        if self.epoch < self.warmup_epochs or np.any(self.unseen):
+            self._draw_warmup_samples()
+            return
+
+        losses = np.maximum(self.loss_table.numpy(), 1e-8)
+        probabilities = (1 - self.uniform_mix) * losses / losses.sum()
+        probabilities += self.uniform_mix / self.number_of_samples
+        self.sample_ids = self.rng.choice(
+            self.number_of_samples, self.samples_per_epoch, p=probabilities
+        )
+        self.importance_weights = (
+            1.0 / (self.number_of_samples * probabilities[self.sample_ids])
+        ).astype(np.float32)
+        logger.info(
+            f"Epoch {self.epoch}: drew {self.samples_per_epoch} samples weighted by "
+            f"their loss (mean loss of the drawn samples: {losses[self.sample_ids].mean():.4f}, "
+            f"of all samples: {losses.mean():.4f})"
+        )
+
+    def __len__(self) -> int:
+        # Only full batches, like the `steps_per_epoch` of uniform sampling
+        return max(self.samples_per_epoch // self.batch_size, 1)
+
+    def __getitem__(self, index: int) -> tuple:
+        batch = slice(index * self.batch_size, (index + 1) * self.batch_size)
+        sample_ids = self.sample_ids[batch]
+        images, labels = self.images.get_images(sample_ids)
+        return (
+            (images, sample_ids.astype(np.int32)),
+            labels,
+            self.importance_weights[batch],
+        )
+
+    def on_epoch_end(self):
+        self.epoch += 1
+        self._draw_samples()
+
+
+class TrainingReport(tf.keras.callbacks.Callback):
+    def __init__(
+        self,
+        path,
+        sampling: str,
+        batch_size: int,
+        accumulation_steps: int = 1,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+    ) -> None:
+        """Inits TrainingReport, which saves the throughput, the peak memory
+        and the accuracy per compute-hour of the training, so that the
+        sampling modes and the batch settings can be compared.
+
+        Args:
+            path (Path): Path of the JSON report.
+            sampling (str): The sampling mode.
+            batch_size (int): The batch size.
+            accumulation_steps (int, optional): Number of batches per update of
+                the weights. Defaults to 1.
+            intra_op_threads (int, optional): Number of threads used to run a
+                single operation, 0 for the TensorFlow default. Defaults to 0.
+            inter_op_threads (int, optional): Number of operations run
+                concurrently, 0 for the TensorFlow default. Defaults to 0.
+        """
+        super().__init__()
+        self.path = path
+        self.sampling = sampling
+        self.batch_size = batch_size
+        self.accumulation_steps = accumulation_steps
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+
+    def on_train_begin(self, logs=None):
+        self.images_seen = 0
+        self.training_seconds = 0.0
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch_start_time = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.images_seen += self.batch_size
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.training_seconds += time.perf_counter() - self.epoch_start_time
+        self.logs = logs or {}
+
+    def on_train_end(self, logs=None):
+        compute_hours = self.training_seconds / 3600
+        accuracy = self.logs.get("val_accuracy", self.logs.get("accuracy", 0.0))
+        report = {
+            "sampling": self.sampling,
+            "batch_size": self.batch_size,
+            "accumulation_steps": self.accumulation_steps,
+            "effective_batch_size": self.batch_size * self.accumulation_steps,
+            # The batch size and the threads may come from tuning.yaml, which
+            # DVC does not track
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+            "images_seen": self.images_seen,
+            "training_seconds": self.training_seconds,
+            "images_per_second": self.images_seen / self.training_seconds,
+            "accuracy": accuracy,
+            "accuracy_per_compute_hour": accuracy / compute_hours,
+            "peak_rss_mb": _get_peak_rss_mb(),
+        }
+        logger.info(f"Training report: {report}")
+        save_json(path=self.path, data=report)
@@ -0,0 +1,231 @@
+"""This module contains the code to load the images with scaled JPEG decoding.
+
+A JPEG image can be decoded directly at 1/2, 1/4 or 1/8 of its resolution by
+scaling its DCT coefficients, which costs a fraction of the CPU and memory of
+a full decoding. The largest ratio that keeps the image at or above the
+target size is chosen, and the image is then resized to the target size as
+before.
+"""
+
+import math
+import numpy as np
+import tensorflow as tf
+
+from pathlib import Path
+from PIL import Image
+
+_PIL_INTERPOLATION_METHODS = {
+    "nearest": Image.Resampling.NEAREST,
+    "bilinear": Image.Resampling.BILINEAR,
+    "bicubic": Image.Resampling.BICUBIC,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+
+
+def load_img_scaled(
+    path: Path,
+    target_size: tuple,
+    interpolation: str = "bilinear",
+) -> Image.Image:
+    """Loads an image as RGB and resizes it to the target size. JPEG images
+    are decoded at the smallest resolution that is not smaller than the target
+    size. Other images are decoded at full resolution.
+
+    Args:
+        path (Path): Path of the image.
+        target_size (tuple): The (height, width) of the loaded image.
+        interpolation (str, optional): Interpolation method of the final
+            resize. Defaults to "bilinear".
+
+    Returns:
+        Image.Image: The loaded image.
+    """
+    height, width = target_size
+    with Image.open(path) as image_file:
+        # Only changes the decoder of JPEG images, before any decoding
+        image_file.draft("RGB", (width, height))
+        img = image_file.convert("RGB")
+    if img.size != (width, height):
+        img = img.resize(
+            (width, height), resample=_PIL_INTERPOLATION_METHODS[interpolation]
+        )
+    return img
+
+
+def load_image(path: Path, image_size: list, scaled_decoding: bool) -> np.ndarray:
+    """Loads and preprocesses an image the same way as the training data.
+
+    Args:
+        path (Path): Path of the image.
+        image_size (list): The image size, as in `IMAGE_SIZE`.
+        scaled_decoding (bool): Whether to use scaled JPEG decoding.
+
+    Returns:
+        np.ndarray: The preprocessed image.
+    """
+    if scaled_decoding:
+        image = load_img_scaled(
+            path=path, target_size=tuple(image_size[:-1]), interpolation="bilinear"
+        )
+    else:
+        image = tf.keras.preprocessing.image.load_img(
+            path, target_size=image_size[:-1], interpolation="bilinear"
+        )
+    return tf.keras.preprocessing.image.img_to_array(image) / 255.0
+
+
+class ImageListSequence(tf.keras.utils.Sequence):
+    def __init__(
+        self,
+        paths: list,
+        labels: np.ndarray,
+        datagen: tf.keras.preprocessing.image.ImageDataGenerator,
+        image_size: list,
+        batch_size: int,
+        scaled_decoding: bool,
+        shuffle: bool = True,
+        seed: int = 42,
+        interpolation: str = "bilinear",
+    ) -> None:
+        """Inits ImageListSequence, which loads the batches of a list of
+        images the same way as `flow_from_directory`, e.g., for a subset of
+        the images of a directory.
+
+        Args:
+            paths (list): Paths of the images.
+            labels (np.ndarray): The labels of the images, e.g., one-hot.
+            datagen (ImageDataGenerator): Applied to each image, for the
+                rescaling and the augmentation.
+            image_size (list): The image size, as in `IMAGE_SIZE`.
+            batch_size (int): The batch size.
+            scaled_decoding (bool): Whether to use scaled JPEG decoding.
+            shuffle (bool, optional): Whether to shuffle the images at each
+                epoch. Defaults to True.
+            seed (int, optional): Seed of the shuffling. Defaults to 42.
+            interpolation (str, optional): Interpolation method of the resize.
+                Defaults to "bilinear".
+        """
+        self.paths = list(paths)
+        self.labels = labels
+        self.datagen = datagen
+        self.target_size = tuple(image_size[:-1])
+        self.batch_size = batch_size
+        self.scaled_decoding = scaled_decoding
+        self.shuffle = shuffle
+        self.interpolation = interpolation
+        self.rng = np.random.default_rng(seed)
+        self.order = np.arange(len(self.paths))
+        self.on_epoch_end()
+
+    def __len__(self) -> int:
+        return math.ceil(len(self.paths) / self.batch_size)
+
+    def _load(self, path: Path) -> np.ndarray:
+        if self.scaled_decoding:
+            image = load_img_scaled(
+                path=path,
+                target_size=self.target_size,
+                interpolation=self.interpolation,
+            )
+        else:
+            image = tf.keras.preprocessing.image.load_img(
+                path, target_size=self.target_size, interpolation=self.interpolation
+            )
+        x = tf.keras.preprocessing.image.img_to_array(image)
+        params = self.datagen.get_random_transform(x.shape)
+        x = self.datagen.apply_transform(x, params)
+        return self.datagen.standardize(x)
+
+    def get_images(self, indices: np.ndarray) -> tuple:
+        """Loads some of the images, in any order.
+
+        Args:
+            indices (np.ndarray): The indices of the images in `paths`.
+
+        Returns:
+            tuple: The images and their labels.
+        """
+        images = np.stack([self._load(self.paths[i]) for i in indices])
+        return images, self.labels[indices]
+
+    def __getitem__(self, index: int) -> tuple:
+        batch = self.order[index * self.batch_size : (index + 1) * self.batch_size]
+        return self.get_images(batch)
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.rng.shuffle(self.order)
+
+
+class ScaledDirectorySequence(ImageListSequence):
+    def __init__(
+        self, iterator: tf.keras.preprocessing.image.DirectoryIterator
+    ) -> None:
+        """Inits ScaledDirectorySequence, which loads the images listed by a
+        `DirectoryIterator` with scaled JPEG decoding, and has the same public
+        attributes, e.g., `samples`, `classes` and `filenames`.
+
+        Create it with `flow_from_directory` of this module. Only the RGB color
+        mode and the 'categorical', 'binary', 'sparse' and None class modes are
+        supported.
+
+        Args:
+            iterator (DirectoryIterator): The iterator listing the images,
+                whose batches are never loaded.
+        """
+        if iterator.class_mode == "categorical":
+            labels = tf.keras.utils.to_categorical(
+                iterator.classes, num_classes=iterator.num_classes
+            )
+        else:
+            labels = iterator.classes.astype(iterator.dtype)
+        super().__init__(
+            paths=iterator.filepaths,
+            labels=labels,
+            datagen=iterator.image_data_generator,
+            image_size=list(iterator.image_shape),
+            batch_size=iterator.batch_size,
+            scaled_decoding=True,
+            shuffle=iterator.shuffle,
+            seed=iterator.seed,
+            interpolation=iterator.interpolation,
+        )
+        self.class_mode = iterator.class_mode
+        self.image_data_generator = iterator.image_data_generator
+        self.samples = iterator.samples
+        self.classes = iterator.classes
+        self.class_indices = iterator.class_indices
+        self.num_classes = iterator.num_classes
+        self.filenames = iterator.filenames
+        self.filepaths = iterator.filepaths
+
+    def __getitem__(self, index: int):
+        images, labels = super().__getitem__(index)
+        if self.class_mode is None:
+            return images
+        return images, labels
+
+
+def flow_from_directory(
+    datagen: tf.keras.preprocessing.image.ImageDataGenerator,
+    directory: Path,
+    scaled_decoding: bool,
+    **kwargs,
+):
+    """Same as `datagen.flow_from_directory`, with scaled JPEG decoding if
+    `scaled_decoding` is `True`.
+
+    Args:
+        datagen (ImageDataGenerator): The ImageDataGenerator.
+        directory (Path): The directory of the images, with a subdirectory
+            per class.
+        scaled_decoding (bool): Whether to use scaled JPEG decoding.
+        **kwargs: The other arguments of `flow_from_directory`.
+
+    Returns:
+        DirectoryIterator | ScaledDirectorySequence: The generator.
+    """
+    iterator = datagen.flow_from_directory(directory=directory, **kwargs)
+    if not scaled_decoding:
+        return iterator
+    return ScaledDirectorySequence(iterator=iterator)
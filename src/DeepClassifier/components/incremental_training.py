@@ -0,0 +1,368 @@
+"""This module contains the code for IncrementalTraining.
+
+The training saves a manifest of the images the trained model was trained on
+and of the images it was validated on. The images ingested since are found by
+comparing the manifest of the data ingestion with it: an image is new if its
+path is not in the training manifest, or if its CRC-32 or size changed. The
+trained model is then fine-tuned on the new images, mixed with a random replay
+sample of the previously trained-on images so that it does not forget them,
+for at most `INCREMENTAL_MAX_STEPS` batches.
+
+The validation images are pinned by the training manifest: the split of
+`VALIDATION_SPLIT` takes the first files of each class, so newly ingested
+files would otherwise move trained-on images into the validation subset and
+validation images into the training subset. Both the trained model and the
+fine-tuned one are evaluated on the pinned validation images, and the
+fine-tuned model only replaces the trained model if its validation accuracy
+does not drop by more than `INCREMENTAL_MAX_ACCURACY_DROP`.
+"""
+
+import os
+import time
+import numpy as np
+import tensorflow as tf
+
+from pathlib import Path
+
+from DeepClassifier.entities import IncrementalTrainingConfig
+from DeepClassifier.components.tf_threads import configure_threads
+from DeepClassifier.components.image_loading import (
+    ImageListSequence,
+    flow_from_directory,
+)
+from DeepClassifier.components.shared_weights import save_flat_model
+from DeepClassifier.utils import load_json, save_json
+from DeepClassifier import logger, log_event
+
+
+def get_manifest_key(path: Path, ingestion_dir: Path) -> str:
+    """Returns the key of an image in the manifests, i.e., its path in the zip
+    file.
+
+    Args:
+        path (Path): Path of the image.
+        ingestion_dir (Path): Directory the zip file was extracted to.
+
+    Returns:
+        str: The key of the image.
+    """
+    return Path(os.path.relpath(path, ingestion_dir)).as_posix()
+
+
+def build_training_manifest(
+    ingestion_manifest: dict,
+    trained_paths: list,
+    validation_paths: list,
+    ingestion_dir: Path,
+) -> dict:
+    """Builds the manifest of the images a model was trained and validated on.
+
+    Args:
+        ingestion_manifest (dict): The manifest of the data ingestion.
+        trained_paths (list): Paths of the images the model was trained on.
+        validation_paths (list): Paths of the images the model was validated
+            on.
+        ingestion_dir (Path): Directory the zip file was extracted to.
+
+    Returns:
+        dict: The manifest entries of the trained-on images under `trained`,
+            and of the validation images under `validation`.
+    """
+
+    def get_entries(paths: list) -> dict:
+        keys = [get_manifest_key(path, ingestion_dir) for path in paths]
+        return {key: ingestion_manifest.get(key) for key in keys}
+
+    return {
+        "trained": get_entries(trained_paths),
+        "validation": get_entries(validation_paths),
+    }
+
+
+def split_images(
+    paths: list,
+    ingestion_dir: Path,
+    ingestion_manifest: dict,
+    training_manifest: dict,
+) -> tuple:
+    """Splits images into the pinned validation images, the images ingested
+    since the last training and the images the model was trained on.
+
+    Args:
+        paths (list): Paths of the images.
+        ingestion_dir (Path): Directory the zip file was extracted to.
+        ingestion_manifest (dict): The manifest of the data ingestion.
+        training_manifest (dict): The manifest of the last training.
+
+    Returns:
+        tuple: The indices in `paths` of the new images, of the old images and
+            of the validation images.
+    """
+    new_images, old_images, validation_images = [], [], []
+    for index, path in enumerate(paths):
+        key = get_manifest_key(path, ingestion_dir)
+        if key in training_manifest["validation"]:
+            validation_images.append(index)
+        elif key in training_manifest["trained"] and training_manifest["trained"][
+            key
+        ] == ingestion_manifest.get(key):
+            old_images.append(index)
+        else:
+            new_images.append(index)
+    return (
+        np.array(new_images, dtype=int),
+        np.array(old_images, dtype=int),
+        np.array(validation_images, dtype=int),
+    )
+
+
+def should_promote(current: dict, candidate: dict, max_accuracy_drop: float) -> bool:
+    """Decides whether the fine-tuned model replaces the trained model.
+
+    Args:
+        current (dict): The validation scores of the trained model.
+        candidate (dict): The validation scores of the fine-tuned model.
+        max_accuracy_drop (float): Validation accuracy drop allowed.
+
+    Returns:
+        bool: Whether the fine-tuned model is promoted.
+    """
+    return current["accuracy"] - candidate["accuracy"] <= max_accuracy_drop
+
+
+class IncrementalTraining:
+    def __init__(self, config: IncrementalTrainingConfig) -> None:
+        """Inits IncrementalTraining.
+
+        Args:
+            config (IncrementalTrainingConfig): The IncrementalTrainingConfig.
+        """
+        logger.info(">>>>>>>>>>>> IncrementalTraining Log Started <<<<<<<<<<<<")
+        self.config = config
+        configure_threads(
+            intra_op_threads=self.config.params_intra_op_threads,
+            inter_op_threads=self.config.params_inter_op_threads,
+        )
+
+    def can_run(self) -> bool:
+        """Checks whether there is a trained model, and a manifest of the
+        images it was trained on, to start from.
+
+        Returns:
+            bool: Whether the incremental training can run.
+        """
+        if not all(
+            os.path.exists(path)
+            for path in [
+                self.config.trained_model_path,
+                self.config.training_manifest_path,
+                self.config.ingestion_manifest_path,
+            ]
+        ):
+            return False
+        # Manifests saved before the validation images were pinned cannot be
+        # used, as the images the model was validated on are not known
+        return "validation" in load_json(path=Path(self.config.training_manifest_path))
+
+    def _get_generators(self):
+        """Saves the generator of all the images (without shuffling) in the
+        variable `self.image_generator`, and the validation generator of the
+        evaluation stage in `self.validation_generator`.
+        """
+        dataflow_kwargs = dict(
+            directory=self.config.training_data_dir,
+            target_size=self.config.params_image_size[:-1],
+            batch_size=self.config.params_batch_size,
+            interpolation="bilinear",
+            scaled_decoding=self.config.params_scaled_decoding,
+            shuffle=False,
+        )
+        self.image_generator = flow_from_directory(
+            datagen=tf.keras.preprocessing.image.ImageDataGenerator(rescale=1.0 / 255),
+            **dataflow_kwargs,
+        )
+        self.validation_generator = flow_from_directory(
+            datagen=tf.keras.preprocessing.image.ImageDataGenerator(
+                rescale=1.0 / 255,
+                validation_split=self.config.params_validation_split,
+            ),
+            subset="validation",
+            **dataflow_kwargs,
+        )
+
+    def _get_sequence(
+        self,
+        indices: np.ndarray,
+        datagen: tf.keras.preprocessing.image.ImageDataGenerator,
+        shuffle: bool,
+    ) -> ImageListSequence:
+        """Returns the sequence of some of the images of `self.image_generator`."""
+        labels = tf.keras.utils.to_categorical(
+            self.image_generator.classes[indices],
+            num_classes=self.image_generator.num_classes,
+        )
+        return ImageListSequence(
+            paths=[self.image_generator.filepaths[i] for i in indices],
+            labels=labels,
+            datagen=datagen,
+            image_size=self.config.params_image_size,
+            batch_size=self.config.params_batch_size,
+            scaled_decoding=self.config.params_scaled_decoding,
+            shuffle=shuffle,
+        )
+
+    def _get_train_sequence(self, new_images, old_images) -> ImageListSequence:
+        """Returns the sequence of the new images and of a replay sample of the
+        old images, with the augmentation of the training.
+        """
+        rng = np.random.default_rng(42)
+        replayed = min(
+            int(round(self.config.params_replay_ratio * len(new_images))),
+            len(old_images),
+        )
+        self.replayed_images = rng.choice(old_images, size=replayed, replace=False)
+        logger.info(
+            f"Fine-tuning on {len(new_images)} new images and {replayed} replayed images"
+        )
+
+        datagen_kwargs: dict = dict(rescale=1.0 / 255)
+        if self.config.params_augmentation:
+            datagen_kwargs.update(
+                rotation_range=self.config.params_rotation_range,
+                horizontal_flip=self.config.params_horizontal_flip,
+                width_shift_range=self.config.params_width_shift_range,
+                height_shift_range=self.config.params_height_shift_range,
+                shear_range=self.config.params_shear_range,
+                zoom_range=self.config.params_zoom_range,
+            )
+
+        return self._get_sequence(
+            indices=np.concatenate([new_images, self.replayed_images]),
+            datagen=tf.keras.preprocessing.image.ImageDataGenerator(**datagen_kwargs),
+            shuffle=True,
+        )
+
+    def _evaluate(self, model: tf.keras.Model) -> dict:
+        """Returns the loss and the accuracy of a model on the pinned
+        validation images.
+        """
+        loss, accuracy = model.evaluate(self.validation_sequence, verbose=0)
+        return {"loss": float(loss), "accuracy": float(accuracy)}
+
+    def train(self) -> dict:
+        """Fine-tunes the trained model on the new images, and promotes it if
+        its validation accuracy does not regress. The outcome is saved as the
+        training report.
+
+        Returns:
+            dict: The training report.
+        """
+        self._get_generators()
+        ingestion_manifest = load_json(path=Path(self.config.ingestion_manifest_path))
+        training_manifest = load_json(path=Path(self.config.training_manifest_path))
+        new_images, old_images, validation_images = split_images(
+            paths=self.image_generator.filepaths,
+            ingestion_dir=self.config.ingestion_dir,
+            ingestion_manifest=ingestion_manifest,
+            training_manifest=training_manifest,
+        )
+        logger.info(
+            f"{len(new_images)} new, {len(old_images)} previously trained-on and {len(validation_images)} validation images"
+        )
+        self.validation_sequence = self._get_sequence(
+            indices=validation_images,
+            datagen=tf.keras.preprocessing.image.ImageDataGenerator(rescale=1.0 / 255),
+            shuffle=False,
+        )
+
+        logger.info("Loading the trained model")
+        self.trained_model = tf.keras.models.load_model(
+            filepath=self.config.trained_model_path
+        )
+        report: dict = {
+            "mode": "incremental",
+            "new_images": len(new_images),
+            "replayed_images": 0,
+            "validation_images": len(validation_images),
+            "steps": 0,
+            "training_seconds": 0.0,
+            "promoted": False,
+            # The batch size and the threads may come from tuning.yaml, which
+            # DVC does not track
+            "batch_size": self.config.params_batch_size,
+            "intra_op_threads": self.config.params_intra_op_threads,
+            "inter_op_threads": self.config.params_inter_op_threads,
+        }
+        if len(new_images) == 0 or len(validation_images) == 0:
+            if len(new_images) == 0:
+                logger.info("No new images since the last training. Keeping the model")
+            else:
+                logger.warning(
+                    "None of the validation images of the last training are left to compare the models on. Keeping the model"
+                )
+            save_json(path=self.config.training_report_path, data=report)
+            return report
+
+        report["current"] = self._evaluate(self.trained_model)
+
+        train_sequence = self._get_train_sequence(new_images, old_images)
+        epochs = self.config.params_epochs
+        # Bounding the compute of the fine-tuning
+        steps_per_epoch = min(
+            len(train_sequence), max(self.config.params_max_steps // epochs, 1)
+        )
+        report.update(
+            replayed_images=len(self.replayed_images),
+            steps=steps_per_epoch * epochs,
+        )
+
+        candidate = tf.keras.models.load_model(filepath=self.config.trained_model_path)
+        candidate.optimizer.learning_rate.assign(self.config.params_learning_rate)
+        logger.info(
+            f"Fine-tuning the trained model for {epochs} epochs of {steps_per_epoch} steps"
+        )
+        start_time = time.perf_counter()
+        candidate.fit(train_sequence, epochs=epochs, steps_per_epoch=steps_per_epoch)
+        report["training_seconds"] = time.perf_counter() - start_time
+        report["candidate"] = self._evaluate(candidate)
+
+        report["promoted"] = should_promote(
+            current=report["current"],
+            candidate=report["candidate"],
+            max_accuracy_drop=self.config.params_max_accuracy_drop,
+        )
+        if report["promoted"]:
+            logger.info(
+                f"Promoting the fine-tuned model: {report['candidate']} (was {report['current']})"
+            )
+            self.trained_model = candidate
+            self.trained_model.save(self.config.trained_model_path)
+            save_flat_model(
+                model=self.trained_model, path=self.config.trained_flat_model_path
+            )
+            # The new images are now part of the trained model, and the
+            # validation images stay pinned
+            new_manifest = build_training_manifest(
+                ingestion_manifest=ingestion_manifest,
+                trained_paths=[self.image_generator.filepaths[i] for i in new_images],
+                validation_paths=[],
+                ingestion_dir=self.config.ingestion_dir,
+            )
+            save_json(
+                path=Path(self.config.training_manifest_path),
+                data={
+                    "trained": {
+                        **training_manifest["trained"],
+                        **new_manifest["trained"],
+                    },
+                    "validation": training_manifest["validation"],
+                },
+            )
+        else:
+            logger.warning(
+                f"Keeping the trained model, as the fine-tuned one regresses: {report['candidate']} (was {report['current']})"
+            )
+
+        log_event("incremental_training", **report)
+        save_json(path=self.config.training_report_path, data=report)
+        return report
@@ -0,0 +1,299 @@
+"""This module contains the code for MultiHeadEngine.
+
+The models trained with this pipeline are a backbone (VGG16 and the flatten
+layer) followed by an output layer, the head. Several heads (e.g., the cat/dog
+classifier and other binary attributes) are often trained on the same frozen
+backbone, so running each model separately runs the same convolutions once per
+head.
+
+The engine splits each saved model into its backbone and its head, and groups
+the models whose backbones are identical, i.e., whose layers have the same
+configs and the same weights, as found by hashing them. Each group keeps a
+single copy of its backbone, which runs once per batch, and fans its output
+out to the heads of the group.
+"""
+
+import json
+import time
+import functools
+import hashlib
+import numpy as np
+import tensorflow as tf
+
+from pathlib import Path
+
+from DeepClassifier.entities import MultiHeadConfig
+from DeepClassifier.components.tf_threads import configure_threads
+from DeepClassifier.components.image_loading import load_image
+from DeepClassifier.components.shared_weights import load_flat_model
+from DeepClassifier.utils import save_json
+from DeepClassifier import logger, log_event
+
+
+def load_model(path: Path) -> tf.keras.Model:
+    """Loads a model for inference, from a flat weights file (memory-mapped)
+    or from a file saved by `tf.keras.Model.save`.
+
+    Args:
+        path (Path): Path of the model.
+
+    Returns:
+        tf.keras.Model: The model, not compiled.
+    """
+    if Path(path).suffix == ".flat":
+        return load_flat_model(path=Path(path), compile=False)
+    return tf.keras.models.load_model(filepath=path, compile=False)
+
+
+def split_model(model: tf.keras.Model, head_name: str) -> tuple:
+    """Splits a model into its backbone, up to the layer before the output
+    layer, and its head, a copy of the output layer on its own input.
+
+    Args:
+        model (tf.keras.Model): The model.
+        head_name (str): Name of the head, which must be unique among the
+            heads that share the backbone.
+
+    Returns:
+        tuple: The backbone and the head, as `tf.keras.Model`s.
+    """
+    backbone = tf.keras.models.Model(
+        inputs=model.input, outputs=model.layers[-2].output
+    )
+    # The output layer is copied, so that the head does not keep the rest of
+    # the model alive
+    output_layer = model.layers[-1]
+    head_layer = output_layer.__class__.from_config(output_layer.get_config())
+    inputs = tf.keras.layers.Input(shape=backbone.output_shape[1:])
+    head = tf.keras.models.Model(
+        inputs=inputs, outputs=head_layer(inputs), name=head_name
+    )
+    head_layer.set_weights(output_layer.get_weights())
+    return backbone, head
+
+
+def get_weights_hash(model: tf.keras.Model) -> str:
+    """Returns a hash of the layers of a model: their types, their configs
+    (without the names and the trainable flags, which do not change the
+    outputs) and their weights.
+
+    Args:
+        model (tf.keras.Model): The model.
+
+    Returns:
+        str: The SHA-256 hex digest.
+    """
+    digest = hashlib.sha256()
+    for layer in model.layers:
+        config = {
+            key: value
+            for key, value in layer.get_config().items()
+            if key not in ("name", "trainable")
+        }
+        digest.update(layer.__class__.__name__.encode())
+        digest.update(json.dumps(config, sort_keys=True, default=str).encode())
+        for weight in layer.get_weights():
+            digest.update(f"{weight.dtype.str}{weight.shape}".encode())
+            digest.update(np.ascontiguousarray(weight).tobytes())
+    return digest.hexdigest()
+
+
+def count_macs(model: tf.keras.Model) -> int:
+    """Returns the number of multiply-accumulates of the convolutional and
+    dense layers of a model (and of the models nested in it) per image, which
+    make up nearly all of its compute.
+
+    Args:
+        model (tf.keras.Model): The model.
+
+    Returns:
+        int: The number of multiply-accumulates per image.
+    """
+    macs = 0
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.Model):
+            macs += count_macs(layer)
+        elif isinstance(layer, tf.keras.layers.Conv2D):
+            kernel_height, kernel_width = layer.kernel_size
+            _, height, width, filters = layer.output_shape
+            macs += (
+                height
+                * width
+                * filters
+                * kernel_height
+                * kernel_width
+                * layer.input_shape[-1]
+            )
+        elif isinstance(layer, tf.keras.layers.Dense):
+            macs += layer.input_shape[-1] * layer.units
+    return macs
+
+
+def _weights_bytes(model: tf.keras.Model) -> int:
+    """Returns the size of the weights of a model, in bytes."""
+    return sum(weight.nbytes for weight in model.get_weights())
+
+
+class MultiHeadEngine:
+    def __init__(self, config: MultiHeadConfig) -> None:
+        """Inits MultiHeadEngine.
+
+        Args:
+            config (MultiHeadConfig): The MultiHeadConfig.
+        """
+        logger.info(">>>>>>>>>>>> MultiHeadEngine Log Started <<<<<<<<<<<<")
+        self.config = config
+        configure_threads(
+            intra_op_threads=self.config.params_intra_op_threads,
+            inter_op_threads=self.config.params_inter_op_threads,
+        )
+
+    def load_models(self):
+        """Loads the models of the heads, and saves the groups of heads that
+        share a backbone in the variable `self.groups`. Each group holds its
+        backbone once, its heads, and a model that runs the backbone once and
+        outputs the predictions of all its heads.
+        """
+        groups: dict = {}
+        # The compute and the weights of each model, when it runs separately
+        self.separate = {}
+        for name, path in self.config.heads.items():
+            logger.info(f"Loading the model of the head '{name}' from: {path}")
+            model = load_model(path=path)
+            backbone, head = split_model(model=model, head_name=name)
+            backbone_hash = get_weights_hash(backbone)
+            self.separate[name] = {
+                "macs": count_macs(model),
+                "weights_bytes": _weights_bytes(model),
+            }
+
+            if backbone_hash not in groups:
+                groups[backbone_hash] = {"backbone": backbone, "heads": {}}
+            else:
+                logger.info(
+                    f"The head '{name}' shares its backbone with: {list(groups[backbone_hash]['heads'])}"
+                )
+            groups[backbone_hash]["heads"][name] = head
+            # Only the backbone of the first model of each group is kept
+            del model, backbone
+
+        self.groups = []
+        for backbone_hash, group in groups.items():
+            backbone = group["backbone"]
+            heads = group["heads"]
+            group["hash"] = backbone_hash
+            group["model"] = tf.keras.models.Model(
+                inputs=backbone.input,
+                outputs=[head(backbone.output) for head in heads.values()],
+            )
+            self.groups.append(group)
+        logger.info(
+            f"{len(self.config.heads)} heads in {len(self.groups)} groups sharing a backbone"
+        )
+
+    def predict(self, images: np.ndarray) -> dict:
+        """Predicts the outputs of all the heads for a batch of preprocessed
+        images.
+
+        Args:
+            images (np.ndarray): The batch of preprocessed images.
+
+        Returns:
+            dict: The output of each head, by head name.
+        """
+        predictions: dict = {}
+        for group in self.groups:
+            outputs = group["model"].predict(
+                images, batch_size=self.config.params_batch_size, verbose=0
+            )
+            if len(group["heads"]) == 1:
+                outputs = [outputs]
+            predictions.update(zip(group["heads"], outputs))
+        return predictions
+
+    def predict_images(self, paths: list) -> dict:
+        """Predicts the outputs of all the heads for a list of images.
+
+        Args:
+            paths (list): Paths of the images.
+
+        Returns:
+            dict: The probabilities of each head for each image, by head name.
+        """
+        images = np.stack(
+            [
+                load_image(
+                    path=Path(path),
+                    image_size=self.config.params_image_size,
+                    scaled_decoding=self.config.params_scaled_decoding,
+                )
+                for path in paths
+            ]
+        )
+        return {
+            name: probabilities.tolist()
+            for name, probabilities in self.predict(images=images).items()
+        }
+
+    def _time_per_image(self, predict, images: np.ndarray) -> float:
+        """Returns the mean time of `predict` per image, after a warm-up."""
+        predict(images)
+        start_time = time.perf_counter()
+        for _ in range(self.config.params_benchmark_steps):
+            predict(images)
+        seconds = time.perf_counter() - start_time
+        return seconds / (self.config.params_benchmark_steps * len(images))
+
+    def report(self) -> dict:
+        """Reports the compute (multiply-accumulates and measured time per
+        image) and the weights of the engine against running the models of
+        the heads separately, and saves the report.
+
+        Returns:
+            dict: The report.
+        """
+        images = np.random.default_rng(42).random(
+            (self.config.params_batch_size, *self.config.params_image_size),
+            dtype=np.float32,
+        )
+
+        # Running the models separately, one at a time as they are only
+        # needed for the timing
+        separate_seconds = 0.0
+        for name, path in self.config.heads.items():
+            model = load_model(path=path)
+            separate_seconds += self._time_per_image(
+                functools.partial(
+                    model.predict, batch_size=self.config.params_batch_size, verbose=0
+                ),
+                images,
+            )
+        shared_seconds = self._time_per_image(self.predict, images)
+
+        separate_macs = sum(head["macs"] for head in self.separate.values())
+        separate_bytes = sum(head["weights_bytes"] for head in self.separate.values())
+        shared_macs = sum(count_macs(group["model"]) for group in self.groups)
+        shared_bytes = sum(_weights_bytes(group["model"]) for group in self.groups)
+        report = {
+            "heads": len(self.config.heads),
+            "groups": [
+                {"backbone_hash": group["hash"], "heads": list(group["heads"])}
+                for group in self.groups
+            ],
+            "separate": {
+                "macs_per_image": separate_macs,
+                "seconds_per_image": separate_seconds,
+                "weights_mb": separate_bytes / 1024**2,
+            },
+            "shared": {
+                "macs_per_image": shared_macs,
+                "seconds_per_image": shared_seconds,
+                "weights_mb": shared_bytes / 1024**2,
+            },
+            "macs_saved": 1 - shared_macs / separate_macs,
+            "time_saved": 1 - shared_seconds / separate_seconds,
+            "weights_saved": 1 - shared_bytes / separate_bytes,
+        }
+        log_event("multi_head_report", **report)
+        save_json(path=self.config.report_path, data=report)
+        return report
@@ -0,0 +1,141 @@
+"""This module contains the code for Prediction."""
+
+import numpy as np
+import tensorflow as tf
+
+from pathlib import Path
+
+from DeepClassifier.entities import PredictionConfig
+from DeepClassifier.components.tf_threads import configure_threads
+from DeepClassifier.components.tta import build_tta_model
+from DeepClassifier.components.xla import predict_fixed_shape
+from DeepClassifier.components.image_loading import load_image
+from DeepClassifier.components.shared_weights import load_flat_model
+from DeepClassifier.utils import load_json
+from DeepClassifier import logger
+
+
+class Prediction:
+    def __init__(self, config: PredictionConfig) -> None:
+        """Inits Prediction.
+
+        Args:
+            config (PredictionConfig): The PredictionConfig.
+        """
+        logger.info(">>>>>>>>>>>> Prediction Log Started <<<<<<<<<<<<")
+        self.config = config
+        configure_threads(
+            intra_op_threads=self.config.params_intra_op_threads,
+            inter_op_threads=self.config.params_inter_op_threads,
+        )
+
+    def get_model(self):
+        """Loads the trained model in the variable `self.model`, with its
+        weights memory-mapped if `params_shared_weights` is `True`. The model
+        is wrapped for test-time augmentation if `params_tta` is `True`. With
+        `params_cascade`, the small model of the cascade and its confidence
+        threshold are also loaded.
+        """
+        logger.info("Loading the trained model")
+        if self.config.params_shared_weights:
+            self.model = load_flat_model(
+                path=self.config.flat_model_path, compile=False
+            )
+        else:
+            self.model = tf.keras.models.load_model(filepath=self.config.model_path)
+
+        if self.config.params_tta:
+            self.model = build_tta_model(
+                model=self.model,
+                views=self.config.params_tta_views,
+                jit_compile=self.config.params_jit_compile,
+            )
+        else:
+            # `jit_compile` is not saved with the model, so it is set again
+            self.model.jit_compile = self.config.params_jit_compile
+
+        if self.config.params_cascade:
+            logger.info("Loading the small model of the cascade")
+            self.small_model = tf.keras.models.load_model(
+                filepath=self.config.cascade_small_model_path
+            )
+            self.threshold = load_json(path=self.config.cascade_report_path).threshold
+            logger.info(f"Confidence threshold of the cascade: {self.threshold}")
+
+    def load_image(self, path: Path) -> np.ndarray:
+        """Loads and preprocesses an image the same way as the training data.
+
+        Args:
+            path (Path): Path of the image.
+
+        Returns:
+            np.ndarray: The preprocessed image.
+        """
+        return load_image(
+            path=path,
+            image_size=self.config.params_image_size,
+            scaled_decoding=self.config.params_scaled_decoding,
+        )
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        """Predicts the class probabilities of a batch of preprocessed images.
+        With `params_cascade`, the trained model only runs on the images for
+        which the small model is not confident enough.
+
+        Args:
+            images (np.ndarray): The batch of preprocessed images.
+
+        Returns:
+            np.ndarray: The class probabilities of each image.
+        """
+        if not self.config.params_cascade:
+            return self._predict_full(images=images)
+
+        probabilities = self.small_model.predict(
+            images, batch_size=self.config.params_batch_size, verbose=0
+        )
+        escalated = probabilities.max(axis=1) < self.threshold
+        if np.any(escalated):
+            probabilities[escalated] = self._predict_full(images=images[escalated])
+        return probabilities
+
+    def _predict_full(self, images: np.ndarray) -> np.ndarray:
+        """Predicts the class probabilities of a batch of preprocessed images
+        with the trained model.
+
+        Args:
+            images (np.ndarray): The batch of preprocessed images.
+
+        Returns:
+            np.ndarray: The class probabilities of each image.
+        """
+        if self.config.params_jit_compile:
+            # Padding the last partial batch, so that XLA does not recompile
+            # the model for its shape
+            return predict_fixed_shape(
+                model=self.model,
+                images=images,
+                batch_size=self.config.params_batch_size,
+            )
+        return self.model.predict(
+            images, batch_size=self.config.params_batch_size, verbose=0
+        )
+
+    def predict_images(self, paths: list) -> list:
+        """Predicts the classes of a list of images.
+
+        Args:
+            paths (list): Paths of the images.
+
+        Returns:
+            list: The predicted class name and probability of each image.
+        """
+        images = np.stack([self.load_image(path=Path(path)) for path in paths])
+        probabilities = self.predict(images=images)
+        return [
+            {
+                "class": self.config.class_names[int(np.argmax(probability))],
+                "probability": float(np.max(probability)),
+            }
+            for probability in probabilities
+        ]
@@ -42,6 +42,7 @@ class PrepareBaseModel:
         freeze_all: bool,
         freeze_till: int,
         learning_rate: float,
+        jit_compile: bool = False,
     ) -> tf.keras.Model:
         """Prepares full model using the base model.
 
@@ -52,6 +53,8 @@ class PrepareBaseModel:
             freeze_till (int): Number of layers (from the end) of the base model to
                 be made trainable. This parameter is ignored if `freeze_all` is `True`.
             learning_rate (float): The learning rate for the full model.
+            jit_compile (bool, optional): Whether to compile the full model with
+                XLA. Defaults to False.
 
         Returns:
             tf.keras.Model: The full model.
@@ -94,6 +97,7 @@ class PrepareBaseModel:
             optimizer=tf.keras.optimizers.SGD(learning_rate=learning_rate),
             loss=tf.keras.losses.CategoricalCrossentropy(),
             metrics=["accuracy"],
+            jit_compile=jit_compile,
         )
 
         # Getting the summary of the full model
@@ -113,6 +117,7 @@ class PrepareBaseModel:
             freeze_all=True,
             freeze_till=None,
             learning_rate=self.config.params_learning_rate,
+            jit_compile=self.config.params_jit_compile,
         )
 
         # Saving the full model
@@ -45,7 +45,7 @@ class PrepareCallbacks:
             tf.keras.callbacks.Callback: ModelCheckpoint callback.
         """
         return tf.keras.callbacks.ModelCheckpoint(
-            filepath=self.config.checkpoint_model_filepath,
+            filepath=str(self.config.checkpoint_model_filepath),
             save_best_only=True,
         )
 
@@ -0,0 +1,141 @@
+"""This module contains the code to save a model as a flat weights file, and to
+load it with its weights memory-mapped from the file.
+
+The file is a small JSON header (the architecture, the compile config and the
+dtype, shape and offset of each weight) followed by the raw weights, each
+aligned to `ALIGNMENT` bytes. When it is loaded, the variables of the model
+are created directly on the memory-mapped weights, without any copy, so the
+weights are only pages of the file in the page cache: all the processes of a
+host that load the same file share them, instead of each holding a private
+copy as with `tf.keras.models.load_model`.
+
+The mapping is copy-on-write, so a process that updates the weights (e.g., by
+training) only gets a private copy of the pages it writes, and the file is
+never modified.
+"""
+
+import json
+import numpy as np
+import tensorflow as tf
+
+from pathlib import Path
+
+from DeepClassifier import logger
+
+MAGIC = b"DCFLAT01"
+# Alignment of each weight in the file, so that TensorFlow can use the weights
+# in place
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    """Returns the first multiple of `ALIGNMENT` that is not below `offset`."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_flat_model(model: tf.keras.Model, path: Path):
+    """Saves a model as a flat weights file.
+
+    Args:
+        model (tf.keras.Model): The model to be saved.
+        path (Path): Path of the flat weights file.
+    """
+    weights = model.get_weights()
+    entries = []
+    # The offsets are relative to the end of the header, whose size depends on
+    # them
+    offset = 0
+    for variable, weight in zip(model.weights, weights):
+        offset = _align(offset)
+        entries.append(
+            {
+                "name": variable.name,
+                "dtype": weight.dtype.str,
+                "shape": list(weight.shape),
+                "offset": offset,
+            }
+        )
+        offset += weight.nbytes
+
+    header = json.dumps(
+        {
+            "architecture": json.loads(model.to_json()),
+            "compile_config": model.get_compile_config(),
+            "weights": entries,
+        }
+    ).encode()
+    data_offset = _align(len(MAGIC) + 8 + len(header))
+
+    logger.info(f"Saving the flat weights file to: {path}")
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for entry, weight in zip(entries, weights):
+            f.seek(data_offset + entry["offset"])
+            f.write(np.ascontiguousarray(weight).tobytes())
+
+
+def load_flat_model(path: Path, compile: bool = True) -> tf.keras.Model:
+    """Loads a model saved with `save_flat_model`, with its weights
+    memory-mapped from the file.
+
+    Args:
+        path (Path): Path of the flat weights file.
+        compile (bool, optional): Whether to compile the model as it was
+            compiled when it was saved. The optimizer keeps its own copies of
+            the weights, e.g., its momentum, so models which only predict
+            should not be compiled. Defaults to True.
+
+    Raises:
+        ValueError: If the file is not a flat weights file, or if its weights
+            do not match its architecture.
+
+    Returns:
+        tf.keras.Model: The model.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a flat weights file: {path}")
+        header_size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_size))
+    data_offset = _align(len(MAGIC) + 8 + header_size)
+
+    buffer = np.memmap(path, dtype=np.uint8, mode="c")
+    tensors = []
+    for entry in header["weights"]:
+        dtype = np.dtype(entry["dtype"])
+        start = data_offset + entry["offset"]
+        size = int(np.prod(entry["shape"])) * dtype.itemsize
+        weight = (
+            np.asarray(buffer[start : start + size]).view(dtype).reshape(entry["shape"])
+        )
+        # DLPack hands the memory of the array to TensorFlow without a copy
+        tensors.append(tf.experimental.dlpack.from_dlpack(weight.__dlpack__()))
+
+    created_variables: list = []
+
+    def create_on_mapped_weights(next_creator, **kwargs):
+        # The variables are created in the order of `model.weights`, so each
+        # one is created on the next weight instead of its initializer
+        if len(created_variables) < len(tensors):
+            kwargs["initial_value"] = tensors[len(created_variables)]
+        variable = next_creator(**kwargs)
+        created_variables.append(variable)
+        return variable
+
+    logger.info(f"Loading the model with memory-mapped weights from: {path}")
+    with tf.variable_creator_scope(create_on_mapped_weights):
+        model = tf.keras.models.model_from_json(json.dumps(header["architecture"]))
+
+    if len(model.weights) != len(tensors) or any(
+        variable is not created_variable or list(variable.shape) != entry["shape"]
+        for variable, created_variable, entry in zip(
+            model.weights, created_variables, header["weights"]
+        )
+    ):
+        raise ValueError(f"The weights do not match the architecture in: {path}")
+
+    if compile and header["compile_config"] is not None:
+        model.compile_from_config(header["compile_config"])
+    return model
@@ -0,0 +1,38 @@
+"""This module contains the code to set the number of threads of TensorFlow.
+
+TensorFlow's threads can only be set before it runs its first operation, so
+each component sets them when it is created, with the values chosen by the
+auto-tuner or set in params.yaml.
+"""
+
+import tensorflow as tf
+
+from DeepClassifier import logger
+
+
+def configure_threads(intra_op_threads: int, inter_op_threads: int):
+    """Sets the number of threads of TensorFlow, if it did not run any
+    operation yet. Otherwise, its threads are kept as they are.
+
+    Args:
+        intra_op_threads (int): Number of threads used to run a single
+            operation, 0 for the TensorFlow default.
+        inter_op_threads (int): Number of operations run concurrently, 0 for
+            the TensorFlow default.
+    """
+    if (
+        tf.config.threading.get_intra_op_parallelism_threads() == intra_op_threads
+        and tf.config.threading.get_inter_op_parallelism_threads() == inter_op_threads
+    ):
+        return
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+        logger.info(
+            f"Using {intra_op_threads} intra-op and {inter_op_threads} inter-op threads"
+        )
+    except RuntimeError:
+        # E.g., when all the stages run in a single process
+        logger.warning(
+            "TensorFlow is already initialized. Hence, keeping its threads as they are"
+        )
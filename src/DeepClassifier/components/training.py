@@ -1,10 +1,28 @@
 """This module contains the code for Training."""
 
+import os
 import tensorflow as tf
 
 from pathlib import Path
 
 from DeepClassifier.entities import TrainingConfig
+from DeepClassifier.components.tf_threads import configure_threads
+from DeepClassifier.components.xla import FixedBatchSequence
+from DeepClassifier.components.image_loading import (
+    ImageListSequence,
+    flow_from_directory,
+)
+from DeepClassifier.components.training_models import (
+    GradientAccumulationModel,
+    HardExampleModel,
+)
+from DeepClassifier.components.shared_weights import save_flat_model
+from DeepClassifier.components.hard_example_sampling import (
+    HardExampleSequence,
+    TrainingReport,
+)
+from DeepClassifier.components.incremental_training import build_training_manifest
+from DeepClassifier.utils import load_json, save_json
 from DeepClassifier import logger
 
 
@@ -17,16 +35,34 @@ class Training:
         """
         logger.info(">>>>>>>>>>>> Training Log Started <<<<<<<<<<<<")
         self.config = config
+        configure_threads(
+            intra_op_threads=self.config.params_intra_op_threads,
+            inter_op_threads=self.config.params_inter_op_threads,
+        )
 
-    def get_updated_base_model(self):
+    def get_updated_base_model(self, model: tf.keras.Model = None):
         """Loads the updated base model in the variable `self.update_base_model`,
         that was saved while preparing the base model.
+
+        Args:
+            model (tf.keras.Model, optional): The updated base model, if it is
+                already in memory. Defaults to None, i.e., it is loaded from
+                `updated_base_model_path`.
         """
-        # Loading the updated base model
-        logger.info("Loading the updated base model")
-        self.updated_base_model = tf.keras.models.load_model(
-            filepath=self.config.updated_base_model_path
-        )
+        if model is not None:
+            # Using the updated base model that is already in memory
+            logger.info("Using the updated base model already in memory")
+            self.updated_base_model = model
+        else:
+            # Loading the updated base model
+            logger.info("Loading the updated base model")
+            self.updated_base_model = tf.keras.models.load_model(
+                filepath=self.config.updated_base_model_path
+            )
+
+        # `jit_compile` is not saved with the model, so it is set again
+        logger.info(f"Setting jit_compile = {self.config.params_jit_compile}")
+        self.updated_base_model.jit_compile = self.config.params_jit_compile
 
     def train_val_generator(self):
         """Saves the training and validation generators in the variables
@@ -58,8 +94,10 @@ class Training:
 
         # Creating validation_generator
         logger.info("Creating validation_generator")
-        self.validation_generator = val_datagen.flow_from_directory(
+        self.validation_generator = flow_from_directory(
+            datagen=val_datagen,
             directory=self.config.training_data_dir,
+            scaled_decoding=self.config.params_scaled_decoding,
             subset="validation",
             shuffle=False,
             **dataflow_kwargs,
@@ -85,8 +123,10 @@ class Training:
 
         # Creating train_generator
         logger.info("Creating train_generator")
-        self.train_generator = train_datagen.flow_from_directory(
+        self.train_generator = flow_from_directory(
+            datagen=train_datagen,
             directory=self.config.training_data_dir,
+            scaled_decoding=self.config.params_scaled_decoding,
             subset="training",
             shuffle=True,
             **dataflow_kwargs,
@@ -110,22 +150,110 @@ class Training:
         )
         logger.info(f"validation_steps = {self.validation_steps}")
 
+        train_data, validation_data = self.train_generator, self.validation_generator
+        if self.config.params_jit_compile:
+            # Padding the last partial batches, so that XLA does not recompile
+            # the model for their shapes
+            logger.info("Padding the last partial batches to fixed shapes for XLA")
+            train_data = FixedBatchSequence(self.train_generator)
+            validation_data = FixedBatchSequence(self.validation_generator)
+
+        accumulation_steps = self.config.params_gradient_accumulation_steps
+        if accumulation_steps > 1:
+            logger.info(
+                f"Accumulating the gradients of {accumulation_steps} batches per"
+                f" update, i.e., an effective batch size of"
+                f" {accumulation_steps * self.train_generator.batch_size}"
+            )
+
+        model = self.updated_base_model
+        if self.config.params_sampling == "hard_example":
+            # Wrapping the model to keep a loss table of the training images,
+            # which weights the sampling of the next epochs
+            logger.info("Using hard_example sampling of the training images")
+            model = HardExampleModel(
+                model=self.updated_base_model,
+                number_of_samples=self.train_generator.samples,
+                accumulation_steps=accumulation_steps,
+            )
+            model.compile_like_wrapped_model()
+            train_data = HardExampleSequence(
+                images=ImageListSequence(
+                    paths=self.train_generator.filepaths,
+                    labels=tf.keras.utils.to_categorical(
+                        self.train_generator.classes,
+                        num_classes=self.train_generator.num_classes,
+                    ),
+                    datagen=self.train_generator.image_data_generator,
+                    image_size=self.config.params_image_size,
+                    batch_size=self.config.params_batch_size,
+                    scaled_decoding=self.config.params_scaled_decoding,
+                    shuffle=False,
+                ),
+                loss_table=model.loss_table,
+                fraction=self.config.params_hard_example_fraction,
+                uniform_mix=self.config.params_hard_example_uniform_mix,
+                warmup_epochs=self.config.params_hard_example_warmup_epochs,
+            )
+            self.steps_per_epoch = len(train_data)
+            logger.info(f"steps_per_epoch = {self.steps_per_epoch}")
+        elif accumulation_steps > 1:
+            # Wrapping the model to accumulate the gradients of the batches
+            model = GradientAccumulationModel(
+                model=self.updated_base_model, accumulation_steps=accumulation_steps
+            )
+            model.compile_like_wrapped_model()
+
+        training_report = TrainingReport(
+            path=self.config.training_report_path,
+            sampling=self.config.params_sampling,
+            batch_size=self.train_generator.batch_size,
+            accumulation_steps=accumulation_steps,
+            intra_op_threads=self.config.params_intra_op_threads,
+            inter_op_threads=self.config.params_inter_op_threads,
+        )
+
         # Training the updated model
         logger.info("Starting the training of the updated model")
-        self.trained_model = self.updated_base_model.fit(
-            x=self.train_generator,
+        self.history = model.fit(
+            x=train_data,
             epochs=self.config.params_epochs,
             steps_per_epoch=self.steps_per_epoch,
             validation_steps=self.validation_steps,
-            validation_data=self.validation_generator,
-            callbacks=callbacks,
+            validation_data=validation_data,
+            callbacks=callbacks + [training_report],
         )
         logger.info("Training completed. Saving the trained model")
+        self.trained_model = self.updated_base_model
 
         self.save_model(
             model=self.trained_model,
             path=self.config.trained_model_path,
         )
+        # Also saving the model as a flat weights file, which evaluation and
+        # prediction can memory-map
+        save_flat_model(
+            model=self.trained_model, path=self.config.trained_flat_model_path
+        )
+
+        if os.path.exists(self.config.ingestion_manifest_path):
+            # Recording the images the model was trained and validated on, so
+            # that the incremental training can find the images ingested since
+            # and evaluate on the same validation images
+            logger.info(
+                f"Saving the manifest of the training images to: {self.config.training_manifest_path}"
+            )
+            save_json(
+                path=self.config.training_manifest_path,
+                data=build_training_manifest(
+                    ingestion_manifest=load_json(
+                        path=self.config.ingestion_manifest_path
+                    ),
+                    trained_paths=self.train_generator.filepaths,
+                    validation_paths=self.validation_generator.filepaths,
+                    ingestion_dir=self.config.ingestion_dir,
+                ),
+            )
 
     @staticmethod
     def save_model(model: tf.keras.Model, path: Path):
@@ -0,0 +1,184 @@
+"""This module contains models that wrap the full model to customize its
+training step.
+
+The wrappers train the variables of the wrapped (functional) model, and they
+save the wrapped model, so that the saved artifacts and the callbacks (e.g.,
+`ModelCheckpoint`) are the same as without a wrapper.
+"""
+
+import tensorflow as tf
+
+
+class WrappedModel(tf.keras.Model):
+    def __init__(self, model: tf.keras.Model) -> None:
+        """Inits WrappedModel.
+
+        Args:
+            model (tf.keras.Model): The compiled model to be wrapped.
+        """
+        super().__init__()
+        self.model = model
+
+    def call(self, inputs, training=None):
+        return self.model(inputs, training=training)
+
+    def compile_like_wrapped_model(self, **kwargs):
+        """Compiles the wrapper with the optimizer and the loss of the wrapped
+        model.
+        """
+        self.compile(
+            optimizer=self.model.optimizer,
+            loss=self.model.loss,
+            metrics=["accuracy"],
+            jit_compile=self.model.jit_compile,
+            **kwargs,
+        )
+
+    def save(self, *args, **kwargs):
+        return self.model.save(*args, **kwargs)
+
+    def save_weights(self, *args, **kwargs):
+        return self.model.save_weights(*args, **kwargs)
+
+
+class GradientAccumulationModel(WrappedModel):
+    def __init__(self, model: tf.keras.Model, accumulation_steps: int = 1) -> None:
+        """Inits GradientAccumulationModel, which sums the gradients of
+        `accumulation_steps` consecutive (micro-)batches before each update of
+        the weights. The update is the same as with a batch
+        `accumulation_steps` times larger, while the memory of the activations
+        is the one of a single micro-batch. The accumulated gradients take the
+        memory of one more copy of the trainable weights.
+
+        The accumulated gradients are kept across the epochs, so the
+        micro-batches of an update can span two epochs.
+
+        Args:
+            model (tf.keras.Model): The compiled model to be wrapped.
+            accumulation_steps (int, optional): Number of micro-batches per
+                update. Defaults to 1, i.e., an update per batch.
+        """
+        super().__init__(model=model)
+        if accumulation_steps < 1:
+            raise ValueError(
+                f"accumulation_steps must be at least 1, got: {accumulation_steps}"
+            )
+        self.accumulation_steps = accumulation_steps
+        if accumulation_steps > 1:
+            self.accumulated_gradients = [
+                tf.Variable(
+                    tf.zeros_like(variable),
+                    trainable=False,
+                    name=f"accumulated_{variable.name.replace(':', '_')}",
+                )
+                for variable in model.trainable_variables
+            ]
+            self.micro_step = tf.Variable(0, trainable=False, dtype=tf.int64)
+
+    def compile_like_wrapped_model(self, **kwargs):
+        super().compile_like_wrapped_model(**kwargs)
+        # Creating the variables of the optimizer now, as they cannot be
+        # created in the conditional update of `apply_gradients`
+        self.optimizer.build(self.model.trainable_variables)
+
+    def apply_gradients(self, gradients: list):
+        """Updates the weights with the gradients, or adds them to the
+        accumulated gradients and updates the weights with their mean every
+        `accumulation_steps` calls.
+
+        Args:
+            gradients (list): The gradients of the trainable variables of the
+                wrapped model.
+        """
+        variables = self.model.trainable_variables
+        if self.accumulation_steps == 1:
+            self.optimizer.apply_gradients(zip(gradients, variables))
+            return
+
+        for accumulated_gradient, gradient in zip(
+            self.accumulated_gradients, gradients
+        ):
+            accumulated_gradient.assign_add(gradient / self.accumulation_steps)
+        self.micro_step.assign_add(1)
+
+        def update():
+            self.optimizer.apply_gradients(
+                zip([g.read_value() for g in self.accumulated_gradients], variables)
+            )
+            for accumulated_gradient in self.accumulated_gradients:
+                accumulated_gradient.assign(tf.zeros_like(accumulated_gradient))
+            return tf.constant(True)
+
+        tf.cond(
+            self.micro_step % self.accumulation_steps == 0,
+            update,
+            lambda: tf.constant(False),
+        )
+
+    def train_step(self, data):
+        x, y, sample_weight = tf.keras.utils.unpack_x_y_sample_weight(data)
+
+        with tf.GradientTape() as tape:
+            y_pred = self.model(x, training=True)
+            loss = self.compute_loss(
+                x=x, y=y, y_pred=y_pred, sample_weight=sample_weight
+            )
+        self.apply_gradients(tape.gradient(loss, self.model.trainable_variables))
+        return self.compute_metrics(
+            x=x, y=y, y_pred=y_pred, sample_weight=sample_weight
+        )
+
+
+class HardExampleModel(GradientAccumulationModel):
+    def __init__(
+        self,
+        model: tf.keras.Model,
+        number_of_samples: int,
+        accumulation_steps: int = 1,
+    ) -> None:
+        """Inits HardExampleModel, which keeps a table of the latest loss of
+        each training sample. The table is updated from the forward passes of
+        the training steps, so it costs no extra computation.
+
+        The training batches are `((images, sample_ids), labels,
+        importance_weights)`, e.g., from `HardExampleSequence`.
+
+        Args:
+            model (tf.keras.Model): The compiled model to be wrapped.
+            number_of_samples (int): Number of training samples.
+            accumulation_steps (int, optional): Number of micro-batches per
+                update. Defaults to 1.
+        """
+        super().__init__(model=model, accumulation_steps=accumulation_steps)
+        number_of_classes = model.output_shape[-1]
+        # The samples that were not seen yet have the loss of a random guess
+        self.loss_table = tf.Variable(
+            tf.fill([number_of_samples], tf.math.log(float(number_of_classes))),
+            trainable=False,
+            name="loss_table",
+        )
+
+    def call(self, inputs, training=None):
+        # The training batches also contain the ids of the samples
+        if isinstance(inputs, (tuple, list)):
+            inputs = inputs[0]
+        return self.model(inputs, training=training)
+
+    def train_step(self, data):
+        x, y, sample_weight = tf.keras.utils.unpack_x_y_sample_weight(data)
+        images, sample_ids = x
+
+        with tf.GradientTape() as tape:
+            y_pred = self.model(images, training=True)
+            # The importance weights keep the loss an unbiased estimate of the
+            # loss over all the samples
+            loss = self.compute_loss(
+                x=images, y=y, y_pred=y_pred, sample_weight=sample_weight
+            )
+        self.apply_gradients(tape.gradient(loss, self.model.trainable_variables))
+
+        per_sample_loss = tf.keras.losses.categorical_crossentropy(y, y_pred)
+        self.loss_table.scatter_nd_update(
+            tf.expand_dims(tf.cast(sample_ids, tf.int64), axis=-1), per_sample_loss
+        )
+        return self.compute_metrics(x=images, y=y, y_pred=y_pred, sample_weight=None)
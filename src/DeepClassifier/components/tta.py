@@ -0,0 +1,110 @@
+"""This module contains the code for test-time augmentation (TTA)."""
+
+import tensorflow as tf
+
+from DeepClassifier import logger
+
+
+def _shift(images: tf.Tensor, size: tuple, fraction: float = 0.1) -> tf.Tensor:
+    """Shifts a batch of images down and to the right, filling the border by
+    reflection.
+
+    Args:
+        images (tf.Tensor): The batch of images.
+        size (tuple): Height and width of the images.
+        fraction (float, optional): The shift as a fraction of the image size.
+            Defaults to 0.1.
+
+    Returns:
+        tf.Tensor: The shifted batch of images.
+    """
+    height, width = size
+    dy, dx = int(height * fraction), int(width * fraction)
+    padded = tf.pad(images, [[0, 0], [dy, 0], [dx, 0], [0, 0]], mode="REFLECT")
+    return padded[:, :height, :width, :]
+
+
+def _center_crop(images: tf.Tensor, size: tuple, fraction: float = 0.875) -> tf.Tensor:
+    """Crops the center of a batch of images and resizes it back to the
+    original size.
+
+    Args:
+        images (tf.Tensor): The batch of images.
+        size (tuple): Height and width of the images.
+        fraction (float, optional): The fraction of the image kept by the
+            crop. Defaults to 0.875.
+
+    Returns:
+        tf.Tensor: The cropped batch of images.
+    """
+    cropped = tf.image.central_crop(images, central_fraction=fraction)
+    return tf.image.resize(cropped, size=size, method="bilinear")
+
+
+# The views that can be used for TTA
+TTA_VIEWS = {
+    "original": lambda images, size: images,
+    "horizontal_flip": lambda images, size: tf.image.flip_left_right(images),
+    "center_crop": _center_crop,
+    "shift": _shift,
+}
+
+
+def build_tta_model(
+    model: tf.keras.Model, views: list, jit_compile: bool = False
+) -> tf.keras.Model:
+    """Wraps a model so that it predicts on several views of each image.
+
+    Each batch of `B` images is expanded in-graph into a single batch of
+    `K * B` images (`K` views per image) that goes through the model in one
+    pass. The `K` predictions of each image are then averaged back into one.
+
+    Args:
+        model (tf.keras.Model): The model to be wrapped.
+        views (list): Names of the views, i.e., keys of `TTA_VIEWS`.
+        jit_compile (bool, optional): Whether to compile the TTA model with
+            XLA. Defaults to False.
+
+    Raises:
+        ValueError: If a view is not known.
+
+    Returns:
+        tf.keras.Model: The compiled TTA model.
+    """
+    unknown_views = [view for view in views if view not in TTA_VIEWS]
+    if unknown_views:
+        raise ValueError(
+            f"Unknown TTA views: {unknown_views}. Expected any of: {list(TTA_VIEWS)}"
+        )
+    view_functions = [TTA_VIEWS[view] for view in views]
+    number_of_views = len(view_functions)
+    size = tuple(model.input_shape[1:3])
+
+    logger.info(f"Building the TTA model with the views: {list(views)}")
+    inputs = tf.keras.Input(shape=model.input_shape[1:])
+
+    # (B, H, W, C) -> (K * B, H, W, C)
+    expanded = tf.keras.layers.Lambda(
+        lambda images: tf.concat(
+            [view(images, size) for view in view_functions], axis=0
+        ),
+        name="tta_expand",
+    )(inputs)
+
+    predictions = model(expanded)
+
+    # (K * B, classes) -> (K, B, classes) -> (B, classes)
+    outputs = tf.keras.layers.Lambda(
+        lambda y: tf.reduce_mean(
+            tf.reshape(y, [number_of_views, -1, y.shape[-1]]), axis=0
+        ),
+        name="tta_reduce",
+    )(predictions)
+
+    tta_model = tf.keras.models.Model(inputs=inputs, outputs=outputs)
+    tta_model.compile(
+        loss=tf.keras.losses.CategoricalCrossentropy(),
+        metrics=["accuracy"],
+        jit_compile=jit_compile,
+    )
+    return tta_model
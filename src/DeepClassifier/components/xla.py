@@ -0,0 +1,102 @@
+"""This module contains the code for running models compiled with XLA
+(`jit_compile=True`) on fixed-shape batches.
+
+XLA compiles a separate program for every input shape it sees, so the last
+partial batch of an epoch would trigger a recompilation. The helpers below pad
+it to the full batch size instead.
+"""
+
+import numpy as np
+import tensorflow as tf
+
+
+def pad_to_batch_size(array: np.ndarray, batch_size: int) -> np.ndarray:
+    """Pads an array with zeros along its first axis to a multiple of the
+    batch size.
+
+    Args:
+        array (np.ndarray): The array to be padded.
+        batch_size (int): The batch size.
+
+    Returns:
+        np.ndarray: The padded array.
+    """
+    number_of_pads = -len(array) % batch_size
+    if number_of_pads == 0:
+        return array
+    pads = np.zeros((number_of_pads,) + array.shape[1:], dtype=array.dtype)
+    return np.concatenate([array, pads])
+
+
+class FixedBatchSequence(tf.keras.utils.Sequence):
+    def __init__(self, generator: tf.keras.utils.Sequence) -> None:
+        """Inits FixedBatchSequence, which pads every batch of a generator to
+        the full batch size. The padded samples get a sample weight of 0, so
+        that they do not contribute to the gradients or the metrics.
+
+        Args:
+            generator (tf.keras.utils.Sequence): The generator, e.g., returned
+                by `ImageDataGenerator.flow_from_directory`.
+        """
+        super().__init__()
+        self.generator = generator
+        self.batch_size = generator.batch_size
+
+    def __len__(self) -> int:
+        return len(self.generator)
+
+    def __getitem__(self, index: int) -> tuple:
+        x, y = self.generator[index]
+        sample_weight = pad_to_batch_size(
+            np.ones(len(x), dtype=np.float32), batch_size=self.batch_size
+        )
+        return (
+            pad_to_batch_size(x, batch_size=self.batch_size),
+            pad_to_batch_size(y, batch_size=self.batch_size),
+            sample_weight,
+        )
+
+    def on_epoch_end(self):
+        self.generator.on_epoch_end()
+
+
+def predict_fixed_shape(
+    model: tf.keras.Model, images: np.ndarray, batch_size: int
+) -> np.ndarray:
+    """Predicts on a batch of images, padding the last partial batch.
+
+    Args:
+        model (tf.keras.Model): The model.
+        images (np.ndarray): The images.
+        batch_size (int): The batch size.
+
+    Returns:
+        np.ndarray: The predictions of the images.
+    """
+    padded_images = pad_to_batch_size(images, batch_size=batch_size)
+    predictions = model.predict(padded_images, batch_size=batch_size, verbose=0)
+    return predictions[: len(images)]
+
+
+def evaluate_fixed_shape(model: tf.keras.Model, generator) -> list:
+    """Evaluates a model on a (non-shuffled) generator, padding the last
+    partial batch.
+
+    The loss and the accuracy are computed from the predictions of the real
+    samples only, so they match the ones of `model.evaluate`.
+
+    Args:
+        model (tf.keras.Model): The model.
+        generator: The generator, e.g., returned by
+            `ImageDataGenerator.flow_from_directory` with `shuffle=False`.
+
+    Returns:
+        list: The loss and the accuracy.
+    """
+    predictions = model.predict(FixedBatchSequence(generator))[: generator.samples]
+    labels = tf.keras.utils.to_categorical(
+        generator.classes, num_classes=predictions.shape[-1]
+    )
+    loss = tf.reduce_mean(tf.keras.losses.categorical_crossentropy(labels, predictions))
+    accuracy = np.mean(np.argmax(predictions, axis=-1) == generator.classes)
+    return [float(loss), float(accuracy)]
@@ -2,16 +2,30 @@
 
 import os
 from pathlib import Path
+from box import ConfigBox
 
 from DeepClassifier.entities import (
     DataIngestionConfig,
     PrepareBaseModelConfig,
     PrepareCallbacksConfig,
     TrainingConfig,
+    IncrementalTrainingConfig,
     EvaluationConfig,
+    PredictionConfig,
+    EmbeddingIndexConfig,
+    CrossValidationConfig,
+    AutoTuningConfig,
+    MultiHeadConfig,
+    CascadeConfig,
+    CompressionConfig,
+    ExportConfig,
 )
 from DeepClassifier.utils import read_yaml, create_directories
-from DeepClassifier.constants import CONFIG_FILE_PATH, PARAMS_FILE_PATH
+from DeepClassifier.constants import (
+    CONFIG_FILE_PATH,
+    PARAMS_FILE_PATH,
+    TUNING_FILE_PATH,
+)
 from DeepClassifier import logger
 
 
@@ -20,6 +34,7 @@ class ConfigurationManager:
         self,
         config_file_path: Path = CONFIG_FILE_PATH,
         params_file_path: Path = PARAMS_FILE_PATH,
+        tuning_file_path: Path = TUNING_FILE_PATH,
     ) -> None:
         """Inits ConfigurationManager.
 
@@ -28,14 +43,40 @@ class ConfigurationManager:
                 Defaults to the constant CONFIG_FILE_PATH.
             params_file_path (Path, optional): Path of the params.yaml file.
                 Defaults to the constant PARAMS_FILE_PATH.
+            tuning_file_path (Path, optional): Path of the tuning file written
+                by the auto-tuner, whose batch sizes and threads override the
+                ones of params.yaml if it exists. Defaults to the constant
+                TUNING_FILE_PATH.
         """
         # Getting information in the config.yaml and params.yaml file
         self.config = read_yaml(yaml_file_path=config_file_path)
         self.params = read_yaml(yaml_file_path=params_file_path)
+        self.tuning_file_path = tuning_file_path
+
+        # Getting the batch sizes and the threads chosen by the auto-tuner for
+        # this host, if it was run
+        self.tuning = None
+        if os.path.exists(tuning_file_path):
+            logger.info(f"Using the batch sizes and threads of: {tuning_file_path}")
+            self.tuning = read_yaml(yaml_file_path=tuning_file_path)
 
         # Creating the 'artifacts' directory
         create_directories(paths_of_directories=[self.config.artifacts_root])
 
+    def _get_tuned_params(self, mode: str) -> ConfigBox:
+        """Returns the params, with the values chosen by the auto-tuner for a
+        mode if there is a tuning file.
+
+        Args:
+            mode (str): 'training' or 'inference'.
+
+        Returns:
+            ConfigBox: The params.
+        """
+        if self.tuning is None:
+            return self.params
+        return ConfigBox({**self.params, **self.tuning[mode].params})
+
     def get_data_ingestion_config(self) -> DataIngestionConfig:
         """Creates and returns DataIngestionConfig.
 
@@ -58,6 +99,7 @@ class ConfigurationManager:
             source_URL=config.source_URL,
             zipped_data_file_path=config.zipped_data_file_path,
             unzipped_file_dir=config.unzipped_file_dir,
+            manifest_path=config.manifest_path,
         )
         logger.info(f"DataIngestionConfig: {data_ingestion_config}")
         return data_ingestion_config
@@ -88,6 +130,7 @@ class ConfigurationManager:
             params_include_top=self.params.INCLUDE_TOP,
             params_weights=self.params.WEIGHTS,
             params_classes=self.params.CLASSES,
+            params_jit_compile=self.params.JIT_COMPILE,
         )
         logger.info(f"PrepareBaseModelConfig: {prepare_base_model_config}")
         return prepare_base_model_config
@@ -131,9 +174,20 @@ class ConfigurationManager:
     def get_training_config(self) -> TrainingConfig:
         """Creates and returns TrainingConfig.
 
+        Raises:
+            ValueError: If `SAMPLING` is not 'uniform' or 'hard_example'.
+
         Returns:
             TrainingConfig: The TrainingConfig.
         """
+        # Checking the sampling of the training images, so that a typo does
+        # not silently fall back to the uniform sampling
+        if self.params.SAMPLING not in {"uniform", "hard_example"}:
+            raise ValueError(
+                "SAMPLING must be 'uniform' or 'hard_example', not:"
+                f" {self.params.SAMPLING!r}"
+            )
+
         # Getting the values in the `training` key of the config.yaml
         # file
         logger.info("Getting the config info for model training")
@@ -153,17 +207,26 @@ class ConfigurationManager:
             "PetImages",
         )
 
+        # Getting the params, with the batch size and the threads chosen by
+        # the auto-tuner for training
+        params = self._get_tuned_params(mode="training")
+
         # Creating and returning `TrainingConfig`
         logger.info("Creating TrainingConfig")
         training_config = TrainingConfig(
             root_dir=Path(config.root_dir),
             trained_model_path=Path(config.trained_model_path),
+            trained_flat_model_path=Path(config.trained_flat_model_path),
+            training_report_path=Path(config.training_report_path),
+            ingestion_manifest_path=Path(self.config.data_ingestion.manifest_path),
+            training_manifest_path=Path(config.manifest_path),
+            ingestion_dir=Path(self.config.data_ingestion.unzipped_file_dir),
             updated_base_model_path=Path(
                 self.config.prepare_base_model.updated_base_model_path
             ),
             training_data_dir=Path(training_data_dir),
             params_epochs=self.params.EPOCHS,
-            params_batch_size=self.params.BATCH_SIZE,
+            params_batch_size=params.BATCH_SIZE,
             params_augmentation=self.params.AUGMENTATION,
             params_image_size=self.params.IMAGE_SIZE,
             params_validation_split=self.params.VALIDATION_SPLIT,
@@ -173,16 +236,92 @@ class ConfigurationManager:
             params_height_shift_range=self.params.HEIGHT_SHIFT_RANGE,
             params_shear_range=self.params.SHEAR_RANGE,
             params_zoom_range=self.params.ZOOM_RANGE,
+            params_jit_compile=self.params.JIT_COMPILE,
+            params_scaled_decoding=self.params.SCALED_DECODING,
+            params_sampling=self.params.SAMPLING,
+            params_hard_example_fraction=self.params.HARD_EXAMPLE_FRACTION,
+            params_hard_example_uniform_mix=self.params.HARD_EXAMPLE_UNIFORM_MIX,
+            params_hard_example_warmup_epochs=self.params.HARD_EXAMPLE_WARMUP_EPOCHS,
+            params_gradient_accumulation_steps=self.params.GRADIENT_ACCUMULATION_STEPS,
+            params_incremental_training=self.params.INCREMENTAL_TRAINING,
+            params_intra_op_threads=params.INTRA_OP_THREADS,
+            params_inter_op_threads=params.INTER_OP_THREADS,
         )
         logger.info(f"TrainingConfig: {training_config}")
         return training_config
 
+    def get_incremental_training_config(self) -> IncrementalTrainingConfig:
+        """Creates and returns IncrementalTrainingConfig.
+
+        Returns:
+            IncrementalTrainingConfig: The IncrementalTrainingConfig.
+        """
+        # Getting the values in the `training` key of the config.yaml
+        # file
+        logger.info("Getting the config info for incremental training")
+        config = self.config.training
+
+        # Getting the directory of the training data from the 'data ingestion'
+        # key of the config.yaml file
+        training_data_dir = os.path.join(
+            self.config.data_ingestion.unzipped_file_dir,
+            "PetImages",
+        )
+
+        # Getting the params, with the batch size and the threads chosen by the
+        # auto-tuner for training
+        params = self._get_tuned_params(mode="training")
+
+        # Creating and returning `IncrementalTrainingConfig`
+        logger.info("Creating IncrementalTrainingConfig")
+        incremental_training_config = IncrementalTrainingConfig(
+            trained_model_path=Path(config.trained_model_path),
+            trained_flat_model_path=Path(config.trained_flat_model_path),
+            training_report_path=Path(config.training_report_path),
+            ingestion_manifest_path=Path(self.config.data_ingestion.manifest_path),
+            training_manifest_path=Path(config.manifest_path),
+            ingestion_dir=Path(self.config.data_ingestion.unzipped_file_dir),
+            training_data_dir=Path(training_data_dir),
+            params_image_size=self.params.IMAGE_SIZE,
+            params_batch_size=params.BATCH_SIZE,
+            params_validation_split=self.params.VALIDATION_SPLIT,
+            params_scaled_decoding=self.params.SCALED_DECODING,
+            params_augmentation=self.params.AUGMENTATION,
+            params_rotation_range=self.params.ROTATION_RANGE,
+            params_horizontal_flip=self.params.HORIZONTAL_FLIP,
+            params_width_shift_range=self.params.WIDTH_SHIFT_RANGE,
+            params_height_shift_range=self.params.HEIGHT_SHIFT_RANGE,
+            params_shear_range=self.params.SHEAR_RANGE,
+            params_zoom_range=self.params.ZOOM_RANGE,
+            params_learning_rate=self.params.INCREMENTAL_LEARNING_RATE,
+            params_epochs=self.params.INCREMENTAL_EPOCHS,
+            params_max_steps=self.params.INCREMENTAL_MAX_STEPS,
+            params_replay_ratio=self.params.INCREMENTAL_REPLAY_RATIO,
+            params_max_accuracy_drop=self.params.INCREMENTAL_MAX_ACCURACY_DROP,
+            params_intra_op_threads=params.INTRA_OP_THREADS,
+            params_inter_op_threads=params.INTER_OP_THREADS,
+        )
+        logger.info(f"IncrementalTrainingConfig: {incremental_training_config}")
+        return incremental_training_config
+
     def get_evaluation_config(self) -> EvaluationConfig:
         """Creates and returns EvaluationConfig.
 
         Returns:
             EvaluationConfig: EvaluationConfig
         """
+        # Getting the values in the `evaluation` key of the config.yaml
+        # file
+        logger.info("Getting the config info for model evaluation")
+        config = self.config.evaluation
+
+        # Creating the directories 'artifacts/evaluation' and
+        # 'artifacts/evaluation/cache'
+        logger.info("Creating the directory for the evaluation cache")
+        create_directories(
+            paths_of_directories=[Path(config.root_dir), Path(config.cache_dir)]
+        )
+
         # Getting the directory of the training data from the 'data ingestion'
         # key of the config.yaml file
         logger.info(
@@ -193,14 +332,372 @@ class ConfigurationManager:
             "PetImages",
         )
 
+        # Getting the params, with the batch size and the threads chosen by
+        # the auto-tuner for inference
+        params = self._get_tuned_params(mode="inference")
+
         # Creating and returning `EvaluationConfig`
         logger.info("Creating EvaluationConfig")
         evaluation_config = EvaluationConfig(
             model_path=Path(self.config.training.trained_model_path),
+            flat_model_path=Path(self.config.training.trained_flat_model_path),
             training_data_dir=Path(training_data_dir),
+            cache_dir=Path(config.cache_dir),
             params_validation_split=self.params.VALIDATION_SPLIT,
             params_image_size=self.params.IMAGE_SIZE,
-            params_batch_size=self.params.BATCH_SIZE,
+            params_batch_size=params.BATCH_SIZE,
+            params_cache_size=self.params.EVALUATION_CACHE_SIZE,
+            params_tta=self.params.TTA,
+            params_tta_views=self.params.TTA_VIEWS,
+            params_jit_compile=self.params.JIT_COMPILE,
+            params_scaled_decoding=self.params.SCALED_DECODING,
+            params_shared_weights=self.params.SHARED_WEIGHTS,
+            params_intra_op_threads=params.INTRA_OP_THREADS,
+            params_inter_op_threads=params.INTER_OP_THREADS,
+            params_cv_folds=self.params.CV_FOLDS,
         )
         logger.info(f"EvaluationConfig: {evaluation_config}")
         return evaluation_config
+
+    def get_prediction_config(self) -> PredictionConfig:
+        """Creates and returns PredictionConfig.
+
+        Returns:
+            PredictionConfig: The PredictionConfig.
+        """
+        # Getting the values in the `prediction` key of the config.yaml
+        # file
+        logger.info("Getting the config info for prediction")
+        config = self.config.prediction
+
+        # Getting the params, with the batch size and the threads chosen by
+        # the auto-tuner for inference
+        params = self._get_tuned_params(mode="inference")
+
+        # Creating and returning `PredictionConfig`
+        logger.info("Creating PredictionConfig")
+        prediction_config = PredictionConfig(
+            model_path=Path(self.config.training.trained_model_path),
+            flat_model_path=Path(self.config.training.trained_flat_model_path),
+            class_names=list(config.class_names),
+            params_image_size=self.params.IMAGE_SIZE,
+            params_batch_size=params.BATCH_SIZE,
+            params_tta=self.params.TTA,
+            params_tta_views=self.params.TTA_VIEWS,
+            params_jit_compile=self.params.JIT_COMPILE,
+            params_scaled_decoding=self.params.SCALED_DECODING,
+            params_shared_weights=self.params.SHARED_WEIGHTS,
+            cascade_small_model_path=Path(self.config.cascade.small_model_path),
+            cascade_report_path=Path(self.config.cascade.report_path),
+            params_cascade=self.params.CASCADE,
+            params_intra_op_threads=params.INTRA_OP_THREADS,
+            params_inter_op_threads=params.INTER_OP_THREADS,
+        )
+        logger.info(f"PredictionConfig: {prediction_config}")
+        return prediction_config
+
+    def get_embedding_index_config(self) -> EmbeddingIndexConfig:
+        """Creates and returns EmbeddingIndexConfig.
+
+        Returns:
+            EmbeddingIndexConfig: The EmbeddingIndexConfig.
+        """
+        # Getting the values in the `embedding_index` key of the config.yaml
+        # file
+        logger.info("Getting the config info for the embedding index")
+        config = self.config.embedding_index
+
+        # Creating the directories 'artifacts/embedding_index' and
+        # 'artifacts/embedding_index/index'
+        logger.info("Creating the directories for the embedding index")
+        create_directories(
+            paths_of_directories=[Path(config.root_dir), Path(config.index_dir)]
+        )
+
+        # Getting the directory of the training data from the 'data ingestion'
+        # key of the config.yaml file
+        training_data_dir = os.path.join(
+            self.config.data_ingestion.unzipped_file_dir,
+            "PetImages",
+        )
+
+        # Creating and returning `EmbeddingIndexConfig`
+        logger.info("Creating EmbeddingIndexConfig")
+        embedding_index_config = EmbeddingIndexConfig(
+            root_dir=Path(config.root_dir),
+            model_path=Path(self.config.training.trained_model_path),
+            training_data_dir=Path(training_data_dir),
+            embeddings_path=Path(config.embeddings_path),
+            filenames_path=Path(config.filenames_path),
+            pca_path=Path(config.pca_path),
+            index_dir=Path(config.index_dir),
+            params_image_size=self.params.IMAGE_SIZE,
+            params_batch_size=self.params.BATCH_SIZE,
+            params_scaled_decoding=self.params.SCALED_DECODING,
+            params_pca_components=self.params.EMBEDDING_PCA_COMPONENTS,
+            params_pca_samples=self.params.EMBEDDING_PCA_SAMPLES,
+            params_index_lists=self.params.INDEX_LISTS,
+            params_index_probes=self.params.INDEX_PROBES,
+        )
+        logger.info(f"EmbeddingIndexConfig: {embedding_index_config}")
+        return embedding_index_config
+
+    def get_cross_validation_config(self) -> CrossValidationConfig:
+        """Creates and returns CrossValidationConfig.
+
+        Returns:
+            CrossValidationConfig: The CrossValidationConfig.
+        """
+        # Getting the values in the `cross_validation` key of the config.yaml
+        # file
+        logger.info("Getting the config info for cross-validation")
+        config = self.config.cross_validation
+
+        # Creating the directories 'artifacts/cross_validation' and
+        # 'artifacts/cross_validation/cache'
+        logger.info("Creating the directories for cross-validation")
+        create_directories(
+            paths_of_directories=[Path(config.root_dir), Path(config.cache_dir)]
+        )
+
+        # Getting the directory of the training data from the 'data ingestion'
+        # key of the config.yaml file
+        training_data_dir = os.path.join(
+            self.config.data_ingestion.unzipped_file_dir,
+            "PetImages",
+        )
+
+        # Creating and returning `CrossValidationConfig`
+        logger.info("Creating CrossValidationConfig")
+        cross_validation_config = CrossValidationConfig(
+            root_dir=Path(config.root_dir),
+            folds_path=Path(config.folds_path),
+            cache_dir=Path(config.cache_dir),
+            scores_path=Path(config.scores_path),
+            updated_base_model_path=Path(
+                self.config.prepare_base_model.updated_base_model_path
+            ),
+            training_data_dir=Path(training_data_dir),
+            params_folds=self.params.CV_FOLDS,
+            params_workers=self.params.CV_WORKERS,
+            params_worker_memory_mb=self.params.CV_WORKER_MEMORY_MB,
+            params_epochs=self.params.EPOCHS,
+            params_batch_size=self.params.BATCH_SIZE,
+            params_image_size=self.params.IMAGE_SIZE,
+            params_scaled_decoding=self.params.SCALED_DECODING,
+            params_augmentation=self.params.AUGMENTATION,
+            params_rotation_range=self.params.ROTATION_RANGE,
+            params_horizontal_flip=self.params.HORIZONTAL_FLIP,
+            params_width_shift_range=self.params.WIDTH_SHIFT_RANGE,
+            params_height_shift_range=self.params.HEIGHT_SHIFT_RANGE,
+            params_shear_range=self.params.SHEAR_RANGE,
+            params_zoom_range=self.params.ZOOM_RANGE,
+        )
+        logger.info(f"CrossValidationConfig: {cross_validation_config}")
+        return cross_validation_config
+
+    def get_auto_tuning_config(self) -> AutoTuningConfig:
+        """Creates and returns AutoTuningConfig.
+
+        Returns:
+            AutoTuningConfig: The AutoTuningConfig.
+        """
+        # Creating and returning `AutoTuningConfig`
+        logger.info("Creating AutoTuningConfig")
+        auto_tuning_config = AutoTuningConfig(
+            tuning_file_path=Path(self.tuning_file_path),
+            params_image_size=self.params.IMAGE_SIZE,
+            params_include_top=self.params.INCLUDE_TOP,
+            params_classes=self.params.CLASSES,
+            params_learning_rate=self.params.LEARNING_RATE,
+            params_batch_sizes=list(self.params.AUTOTUNE_BATCH_SIZES),
+            params_steps=self.params.AUTOTUNE_STEPS,
+            params_memory_limit_mb=self.params.AUTOTUNE_MEMORY_LIMIT_MB,
+        )
+        logger.info(f"AutoTuningConfig: {auto_tuning_config}")
+        return auto_tuning_config
+
+    def get_multi_head_config(self) -> MultiHeadConfig:
+        """Creates and returns MultiHeadConfig.
+
+        Returns:
+            MultiHeadConfig: The MultiHeadConfig.
+        """
+        # Getting the values in the `multi_head` key of the config.yaml file
+        logger.info("Getting the config info for the multi-head engine")
+        config = self.config.multi_head
+
+        # Creating the directory 'artifacts/multi_head'
+        logger.info("Creating the directory for the multi-head engine")
+        create_directories(paths_of_directories=[Path(config.root_dir)])
+
+        # Getting the params, with the batch size and the threads chosen by
+        # the auto-tuner for inference
+        params = self._get_tuned_params(mode="inference")
+
+        # Creating and returning `MultiHeadConfig`
+        logger.info("Creating MultiHeadConfig")
+        multi_head_config = MultiHeadConfig(
+            root_dir=Path(config.root_dir),
+            report_path=Path(config.report_path),
+            heads={name: Path(path) for name, path in config.heads.items()},
+            params_image_size=self.params.IMAGE_SIZE,
+            params_batch_size=params.BATCH_SIZE,
+            params_scaled_decoding=self.params.SCALED_DECODING,
+            params_benchmark_steps=self.params.MULTI_HEAD_BENCHMARK_STEPS,
+            params_intra_op_threads=params.INTRA_OP_THREADS,
+            params_inter_op_threads=params.INTER_OP_THREADS,
+        )
+        logger.info(f"MultiHeadConfig: {multi_head_config}")
+        return multi_head_config
+
+    def get_cascade_config(self) -> CascadeConfig:
+        """Creates and returns CascadeConfig.
+
+        Returns:
+            CascadeConfig: The CascadeConfig.
+        """
+        # Getting the values in the `cascade` key of the config.yaml file
+        logger.info("Getting the config info for the cascade")
+        config = self.config.cascade
+
+        # Creating the directory 'artifacts/cascade'
+        logger.info("Creating the directory for the cascade")
+        create_directories(paths_of_directories=[Path(config.root_dir)])
+
+        # Getting the directory of the training data from the 'data ingestion'
+        # key of the config.yaml file
+        training_data_dir = os.path.join(
+            self.config.data_ingestion.unzipped_file_dir,
+            "PetImages",
+        )
+
+        # Getting the params, with the batch size and the threads chosen by
+        # the auto-tuner for inference, as the cascade is measured on it
+        params = self._get_tuned_params(mode="inference")
+
+        # Creating and returning `CascadeConfig`
+        logger.info("Creating CascadeConfig")
+        cascade_config = CascadeConfig(
+            root_dir=Path(config.root_dir),
+            small_model_path=Path(config.small_model_path),
+            report_path=Path(config.report_path),
+            model_path=Path(self.config.training.trained_model_path),
+            flat_model_path=Path(self.config.training.trained_flat_model_path),
+            training_data_dir=Path(training_data_dir),
+            params_image_size=self.params.IMAGE_SIZE,
+            params_batch_size=params.BATCH_SIZE,
+            params_validation_split=self.params.VALIDATION_SPLIT,
+            params_classes=self.params.CLASSES,
+            params_scaled_decoding=self.params.SCALED_DECODING,
+            params_shared_weights=self.params.SHARED_WEIGHTS,
+            params_augmentation=self.params.AUGMENTATION,
+            params_rotation_range=self.params.ROTATION_RANGE,
+            params_horizontal_flip=self.params.HORIZONTAL_FLIP,
+            params_width_shift_range=self.params.WIDTH_SHIFT_RANGE,
+            params_height_shift_range=self.params.HEIGHT_SHIFT_RANGE,
+            params_shear_range=self.params.SHEAR_RANGE,
+            params_zoom_range=self.params.ZOOM_RANGE,
+            params_small_image_size=self.params.CASCADE_IMAGE_SIZE,
+            params_epochs=self.params.CASCADE_EPOCHS,
+            params_learning_rate=self.params.CASCADE_LEARNING_RATE,
+            params_target_accuracy=self.params.CASCADE_TARGET_ACCURACY,
+            params_intra_op_threads=params.INTRA_OP_THREADS,
+            params_inter_op_threads=params.INTER_OP_THREADS,
+        )
+        logger.info(f"CascadeConfig: {cascade_config}")
+        return cascade_config
+
+    def get_compression_config(self) -> CompressionConfig:
+        """Creates and returns CompressionConfig.
+
+        Returns:
+            CompressionConfig: The CompressionConfig.
+        """
+        # Getting the values in the `compression` key of the config.yaml file
+        logger.info("Getting the config info for the compression")
+        config = self.config.compression
+
+        # Creating the directory 'artifacts/compression'
+        logger.info("Creating the directory for the compression")
+        create_directories(paths_of_directories=[Path(config.root_dir)])
+
+        # Getting the directory of the training data from the 'data ingestion'
+        # key of the config.yaml file
+        training_data_dir = os.path.join(
+            self.config.data_ingestion.unzipped_file_dir,
+            "PetImages",
+        )
+
+        # Getting the params, with the batch size and the threads chosen by
+        # the auto-tuner for training, as the pruned model is fine-tuned
+        params = self._get_tuned_params(mode="training")
+
+        # Creating and returning `CompressionConfig`
+        logger.info("Creating CompressionConfig")
+        compression_config = CompressionConfig(
+            root_dir=Path(config.root_dir),
+            compressed_model_path=Path(config.compressed_model_path),
+            report_path=Path(config.report_path),
+            model_path=Path(self.config.training.trained_model_path),
+            training_data_dir=Path(training_data_dir),
+            params_image_size=self.params.IMAGE_SIZE,
+            params_batch_size=params.BATCH_SIZE,
+            params_validation_split=self.params.VALIDATION_SPLIT,
+            params_scaled_decoding=self.params.SCALED_DECODING,
+            params_sparsity=self.params.COMPRESSION_SPARSITY,
+            params_pruning_iterations=self.params.COMPRESSION_PRUNING_ITERATIONS,
+            params_finetune_steps=self.params.COMPRESSION_FINETUNE_STEPS,
+            params_learning_rate=self.params.COMPRESSION_LEARNING_RATE,
+            params_clusters=self.params.COMPRESSION_CLUSTERS,
+            params_latency_runs=self.params.COMPRESSION_LATENCY_RUNS,
+            params_intra_op_threads=params.INTRA_OP_THREADS,
+            params_inter_op_threads=params.INTER_OP_THREADS,
+        )
+        logger.info(f"CompressionConfig: {compression_config}")
+        return compression_config
+
+    def get_export_config(self) -> ExportConfig:
+        """Creates and returns ExportConfig.
+
+        Returns:
+            ExportConfig: The ExportConfig.
+        """
+        # Getting the values in the `export` key of the config.yaml file
+        logger.info("Getting the config info for the export")
+        config = self.config.export
+
+        # Creating the directory 'artifacts/export'
+        logger.info("Creating the directory for the export")
+        create_directories(paths_of_directories=[Path(config.root_dir)])
+
+        # Getting the directory of the training data from the 'data ingestion'
+        # key of the config.yaml file
+        training_data_dir = os.path.join(
+            self.config.data_ingestion.unzipped_file_dir,
+            "PetImages",
+        )
+
+        # Getting the params, with the batch size and the threads chosen by
+        # the auto-tuner for inference
+        params = self._get_tuned_params(mode="inference")
+
+        # Creating and returning `ExportConfig`
+        logger.info("Creating ExportConfig")
+        export_config = ExportConfig(
+            root_dir=Path(config.root_dir),
+            bundle_dir=Path(config.bundle_dir),
+            report_path=Path(config.report_path),
+            model_path=Path(self.config.training.trained_model_path),
+            training_data_dir=Path(training_data_dir),
+            params_image_size=self.params.IMAGE_SIZE,
+            params_batch_size=params.BATCH_SIZE,
+            params_validation_split=self.params.VALIDATION_SPLIT,
+            params_scaled_decoding=self.params.SCALED_DECODING,
+            params_check_images=self.params.EXPORT_CHECK_IMAGES,
+            params_load_runs=self.params.EXPORT_LOAD_RUNS,
+            params_intra_op_threads=params.INTRA_OP_THREADS,
+            params_inter_op_threads=params.INTER_OP_THREADS,
+        )
+        logger.info(f"ExportConfig: {export_config}")
+        return export_config
@@ -3,3 +3,7 @@ from pathlib import Path
 
 CONFIG_FILE_PATH = Path("configs/config.yaml")
 PARAMS_FILE_PATH = Path("params.yaml")
+DVC_FILE_PATH = Path("dvc.yaml")
+PIPELINE_STATE_FILE_PATH = Path(".pipeline_state.json")
+TUNING_FILE_PATH = Path("tuning.yaml")
+TELEMETRY_DIR_PATH = Path("artifacts/telemetry")
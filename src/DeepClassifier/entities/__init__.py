@@ -3,5 +3,14 @@ from DeepClassifier.entities.config_entities import (
     PrepareBaseModelConfig,
     PrepareCallbacksConfig,
     TrainingConfig,
+    IncrementalTrainingConfig,
     EvaluationConfig,
+    PredictionConfig,
+    EmbeddingIndexConfig,
+    CrossValidationConfig,
+    AutoTuningConfig,
+    MultiHeadConfig,
+    CascadeConfig,
+    CompressionConfig,
+    ExportConfig,
 )
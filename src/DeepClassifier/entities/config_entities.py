@@ -11,6 +11,8 @@ class DataIngestionConfig:
     source_URL: str  # URL of the data
     zipped_data_file_path: Path  # Path of the downloaded zipped data file
     unzipped_file_dir: Path  # Directory of the unzipped data file
+    manifest_path: Path  # Path of the manifest (CRC-32 and size) of the
+    # ingested images
 
 
 @dataclass(frozen=True)
@@ -28,6 +30,7 @@ class PrepareBaseModelConfig:
     params_weights: str  # Value of the `weights` parameter
     params_classes: int  # Value of the `classes` parameter that will be
     # passed as an argument to the `units` parameter of the final output layer
+    params_jit_compile: bool  # Whether to compile the model with XLA
 
 
 @dataclass(frozen=True)
@@ -45,6 +48,15 @@ class TrainingConfig:
     root_dir: Path  # Directory where the artifacts of `TrainingConfig` will be
     # saved
     trained_model_path: Path  # Path where the trained model will be saved
+    trained_flat_model_path: Path  # Path where the trained model will also be
+    # saved as a flat weights file
+    training_report_path: Path  # Path where the training report (throughput
+    # and accuracy per compute-hour) will be saved
+    ingestion_manifest_path: Path  # Path of the manifest of the ingested
+    # images
+    training_manifest_path: Path  # Path where the manifest of the images the
+    # model was trained on will be saved
+    ingestion_dir: Path  # Directory the paths of the manifests are relative to
     updated_base_model_path: Path  # Path where the updated base model will be
     # saved
     training_data_dir: Path  # Directory where the training data is saved
@@ -66,12 +78,309 @@ class TrainingConfig:
     # augmentation
     params_zoom_range: float  # Value of the `zoom_range` parameter for data
     # augmentation
+    params_jit_compile: bool  # Whether to compile the model with XLA
+    params_scaled_decoding: bool  # Whether to decode the JPEG images at a
+    # reduced resolution
+    params_sampling: str  # How the training images are sampled: 'uniform'
+    # or 'hard_example'
+    params_hard_example_fraction: float  # Fraction of the training images
+    # drawn per epoch with 'hard_example' sampling
+    params_hard_example_uniform_mix: float  # Weight of the uniform
+    # distribution in the 'hard_example' sampling distribution
+    params_hard_example_warmup_epochs: int  # Number of epochs with uniform
+    # sampling before 'hard_example' sampling
+    params_gradient_accumulation_steps: int  # Number of batches whose
+    # gradients are accumulated before each update of the weights
+    params_incremental_training: bool  # Whether to fine-tune the trained
+    # model on the newly ingested images instead of a full training
+    params_intra_op_threads: int  # Number of threads used to run a single
+    # operation, 0 for the TensorFlow default
+    params_inter_op_threads: int  # Number of operations run concurrently, 0
+    # for the TensorFlow default
+
+
+@dataclass(frozen=True)
+class IncrementalTrainingConfig:
+    trained_model_path: Path  # Path of the trained model, which is replaced
+    # by the fine-tuned model if it is promoted
+    trained_flat_model_path: Path  # Path of the trained model as a flat
+    # weights file
+    training_report_path: Path  # Path where the training report will be saved
+    ingestion_manifest_path: Path  # Path of the manifest of the ingested
+    # images
+    training_manifest_path: Path  # Path of the manifest of the images the
+    # trained model was trained on
+    ingestion_dir: Path  # Directory the paths of the manifests are relative to
+    training_data_dir: Path  # Directory where the training data is saved
+    params_image_size: list  # Value of the `image_size` parameter
+    params_batch_size: int  # Value of the `batch_size` parameter
+    params_validation_split: float  # Value of the `validation_split` parameter
+    params_scaled_decoding: bool  # Whether to decode the JPEG images at a
+    # reduced resolution
+    params_augmentation: bool  # Whether to use augmentation on images during
+    # training
+    params_rotation_range: float  # Value of the `rotation_range` parameter for
+    # data augmentation
+    params_horizontal_flip: bool  # Value of the `horizontal_flip` parameter
+    # for data augmentation
+    params_width_shift_range: float  # Value of the `width_shift_range`
+    # parameter for data augmentation
+    params_height_shift_range: float  # Value of the `height_shift_range`
+    # parameter for data augmentation
+    params_shear_range: float  # Value of the `shear_range` parameter for data
+    # augmentation
+    params_zoom_range: float  # Value of the `zoom_range` parameter for data
+    # augmentation
+    params_learning_rate: float  # Learning rate of the fine-tuning
+    params_epochs: int  # Number of epochs over the new and replayed images
+    params_max_steps: int  # Maximum number of batches of the fine-tuning
+    params_replay_ratio: float  # Number of previously trained-on images
+    # replayed per new image
+    params_max_accuracy_drop: float  # Validation accuracy drop allowed for
+    # the fine-tuned model to be promoted
+    params_intra_op_threads: int  # Number of threads used to run a single
+    # operation, 0 for the TensorFlow default
+    params_inter_op_threads: int  # Number of operations run concurrently, 0
+    # for the TensorFlow default
 
 
 @dataclass(frozen=True)
 class EvaluationConfig:
     model_path: Path  # Path of the saved model
+    flat_model_path: Path  # Path of the saved model as a flat weights file
     training_data_dir: Path  # Path of the training data
+    cache_dir: Path  # Directory where the cached evaluation results are saved
     params_validation_split: float  # Value of the `validation_split` parameter
     params_image_size: list  # Value of the `image_size` parameter
     params_batch_size: int  # Value of the `batch_size` parameter
+    params_cache_size: int  # Maximum number of cached evaluation results
+    params_tta: bool  # Whether to also evaluate the model with test-time
+    # augmentation
+    params_tta_views: list  # Names of the views used for test-time
+    # augmentation
+    params_jit_compile: bool  # Whether to compile the model with XLA
+    params_scaled_decoding: bool  # Whether to decode the JPEG images at a
+    # reduced resolution
+    params_shared_weights: bool  # Whether to load the model with its weights
+    # memory-mapped from the flat weights file
+    params_intra_op_threads: int  # Number of threads used to run a single
+    # operation, 0 for the TensorFlow default
+    params_inter_op_threads: int  # Number of operations run concurrently, 0
+    # for the TensorFlow default
+    params_cv_folds: int  # Number of cross-validation folds, 0 to disable
+    # cross-validation
+
+
+@dataclass(frozen=True)
+class PredictionConfig:
+    model_path: Path  # Path of the saved model
+    flat_model_path: Path  # Path of the saved model as a flat weights file
+    class_names: list  # Names of the classes, in the order of their indices
+    params_image_size: list  # Value of the `image_size` parameter
+    params_batch_size: int  # Value of the `batch_size` parameter
+    params_tta: bool  # Whether to use test-time augmentation
+    params_tta_views: list  # Names of the views used for test-time
+    # augmentation
+    params_jit_compile: bool  # Whether to compile the model with XLA
+    params_scaled_decoding: bool  # Whether to decode the JPEG images at a
+    # reduced resolution
+    params_shared_weights: bool  # Whether to load the model with its weights
+    # memory-mapped from the flat weights file
+    cascade_small_model_path: Path  # Path of the small model of the cascade
+    cascade_report_path: Path  # Path of the cascade report, which holds the
+    # calibrated confidence threshold
+    params_cascade: bool  # Whether to run the small model first and the
+    # trained model only on the images it is not confident about
+    params_intra_op_threads: int  # Number of threads used to run a single
+    # operation, 0 for the TensorFlow default
+    params_inter_op_threads: int  # Number of operations run concurrently, 0
+    # for the TensorFlow default
+
+
+@dataclass(frozen=True)
+class EmbeddingIndexConfig:
+    root_dir: Path  # Directory where the artifacts of `EmbeddingIndex` will be
+    # saved
+    model_path: Path  # Path of the trained model
+    training_data_dir: Path  # Directory of the images to be indexed
+    embeddings_path: Path  # Path of the memory-mapped embeddings (`.npy`)
+    filenames_path: Path  # Path of the filenames of the indexed images
+    pca_path: Path  # Path of the fitted PCA
+    index_dir: Path  # Directory of the nearest-neighbour index
+    params_image_size: list  # Value of the `image_size` parameter
+    params_batch_size: int  # Value of the `batch_size` parameter
+    params_scaled_decoding: bool  # Whether to decode the JPEG images at a
+    # reduced resolution
+    params_pca_components: int  # Number of PCA components of the embeddings,
+    # 0 to not use PCA
+    params_pca_samples: int  # Number of images the PCA is fitted on
+    params_index_lists: int  # Number of lists of the index, 0 to use the
+    # square root of the number of images
+    params_index_probes: int  # Number of lists scanned per query
+
+
+@dataclass(frozen=True)
+class CrossValidationConfig:
+    root_dir: Path  # Directory where the artifacts of `CrossValidation` will
+    # be saved
+    folds_path: Path  # Path of the fold of each image
+    cache_dir: Path  # Directory of the decoded images or features shared by
+    # the folds
+    scores_path: Path  # Path of the scores of each fold
+    updated_base_model_path: Path  # Path of the updated base model, which is
+    # trained on each fold
+    training_data_dir: Path  # Directory where the training data is saved
+    params_folds: int  # Number of folds
+    params_workers: int  # Number of folds trained concurrently, 0 for as many
+    # as the CPU cores and the memory allow
+    params_worker_memory_mb: int  # Memory reserved per worker
+    params_epochs: int  # Value of the `epochs` parameter
+    params_batch_size: int  # Value of the `batch_size` parameter
+    params_image_size: list  # Value of the `image_size` parameter
+    params_scaled_decoding: bool  # Whether to decode the JPEG images at a
+    # reduced resolution
+    params_augmentation: bool  # Whether to use augmentation on images during
+    # training
+    params_rotation_range: float  # Value of the `rotation_range` parameter for
+    # data augmentation
+    params_horizontal_flip: bool  # Value of the `horizontal_flip` parameter
+    # for data augmentation
+    params_width_shift_range: float  # Value of the `width_shift_range`
+    # parameter for data augmentation
+    params_height_shift_range: float  # Value of the `height_shift_range`
+    # parameter for data augmentation
+    params_shear_range: float  # Value of the `shear_range` parameter for data
+    # augmentation
+    params_zoom_range: float  # Value of the `zoom_range` parameter for data
+    # augmentation
+
+
+@dataclass(frozen=True)
+class AutoTuningConfig:
+    tuning_file_path: Path  # Path where the chosen batch sizes and threads
+    # will be saved
+    params_image_size: list  # Value of the `image_size` parameter
+    params_include_top: bool  # Value of the `include_top` parameter
+    params_classes: int  # Value of the `classes` parameter
+    params_learning_rate: float  # Value of the `learning_rate` parameter
+    params_batch_sizes: list  # Batch sizes to be probed
+    params_steps: int  # Number of timed steps per probed batch size
+    params_memory_limit_mb: int  # Peak memory allowed to a probe, 0 for 80%
+    # of the available memory
+
+
+@dataclass(frozen=True)
+class MultiHeadConfig:
+    root_dir: Path  # Directory where the artifacts of `MultiHeadEngine` will
+    # be saved
+    report_path: Path  # Path where the report of the compute and the memory
+    # saved will be saved
+    heads: dict  # Path of the saved model of each head, by head name
+    params_image_size: list  # Value of the `image_size` parameter
+    params_batch_size: int  # Value of the `batch_size` parameter
+    params_scaled_decoding: bool  # Whether to decode the JPEG images at a
+    # reduced resolution
+    params_benchmark_steps: int  # Number of timed batches per model in the
+    # report
+    params_intra_op_threads: int  # Number of threads used to run a single
+    # operation, 0 for the TensorFlow default
+    params_inter_op_threads: int  # Number of operations run concurrently, 0
+    # for the TensorFlow default
+
+
+@dataclass(frozen=True)
+class CascadeConfig:
+    root_dir: Path  # Directory where the artifacts of `Cascade` will be saved
+    small_model_path: Path  # Path where the small model will be saved
+    report_path: Path  # Path where the cascade report (calibrated threshold,
+    # escalation rate, accuracy and latency) will be saved
+    model_path: Path  # Path of the trained model
+    flat_model_path: Path  # Path of the trained model as a flat weights file
+    training_data_dir: Path  # Directory where the training data is saved
+    params_image_size: list  # Value of the `image_size` parameter
+    params_batch_size: int  # Value of the `batch_size` parameter
+    params_validation_split: float  # Value of the `validation_split` parameter
+    params_classes: int  # Number of classes
+    params_scaled_decoding: bool  # Whether to decode the JPEG images at a
+    # reduced resolution
+    params_shared_weights: bool  # Whether to load the trained model with its
+    # weights memory-mapped from the flat weights file
+    params_augmentation: bool  # Whether to use augmentation on images during
+    # the training of the small model
+    params_rotation_range: float  # Value of the `rotation_range` parameter for
+    # data augmentation
+    params_horizontal_flip: bool  # Value of the `horizontal_flip` parameter
+    # for data augmentation
+    params_width_shift_range: float  # Value of the `width_shift_range`
+    # parameter for data augmentation
+    params_height_shift_range: float  # Value of the `height_shift_range`
+    # parameter for data augmentation
+    params_shear_range: float  # Value of the `shear_range` parameter for data
+    # augmentation
+    params_zoom_range: float  # Value of the `zoom_range` parameter for data
+    # augmentation
+    params_small_image_size: int  # Side of the images the small model runs
+    # on, after resizing its inputs
+    params_epochs: int  # Number of epochs of the training of the small model
+    params_learning_rate: float  # Learning rate of the small model
+    params_target_accuracy: float  # Validation accuracy the threshold is
+    # calibrated to meet, at most the accuracy of the trained model
+    params_intra_op_threads: int  # Number of threads used to run a single
+    # operation, 0 for the TensorFlow default
+    params_inter_op_threads: int  # Number of operations run concurrently, 0
+    # for the TensorFlow default
+
+
+@dataclass(frozen=True)
+class CompressionConfig:
+    root_dir: Path  # Directory where the artifacts of `Compression` will be
+    # saved
+    compressed_model_path: Path  # Path where the compressed model will be
+    # saved
+    report_path: Path  # Path where the compression report (sparsity, size,
+    # latency and accuracy) will be saved
+    model_path: Path  # Path of the trained model
+    training_data_dir: Path  # Directory where the training data is saved
+    params_image_size: list  # Value of the `image_size` parameter
+    params_batch_size: int  # Value of the `batch_size` parameter
+    params_validation_split: float  # Value of the `validation_split` parameter
+    params_scaled_decoding: bool  # Whether to decode the JPEG images at a
+    # reduced resolution
+    params_sparsity: float  # Fraction of the weights of each kernel that are
+    # pruned at the end of the pruning
+    params_pruning_iterations: int  # Number of pruning iterations, each
+    # followed by a short fine-tuning
+    params_finetune_steps: int  # Number of batches of fine-tuning after each
+    # pruning iteration
+    params_learning_rate: float  # Learning rate of the fine-tuning
+    params_clusters: int  # Number of clusters of the weights of each kernel,
+    # 0 to not cluster the weights
+    params_latency_runs: int  # Number of timed single-image predictions per
+    # model
+    params_intra_op_threads: int  # Number of threads used to run a single
+    # operation, 0 for the TensorFlow default
+    params_inter_op_threads: int  # Number of operations run concurrently, 0
+    # for the TensorFlow default
+
+
+@dataclass(frozen=True)
+class ExportConfig:
+    root_dir: Path  # Directory where the artifacts of `Export` will be saved
+    bundle_dir: Path  # Directory where the inference bundle (SavedModel) will
+    # be saved
+    report_path: Path  # Path where the export report (size, load time and
+    # request payload size) will be saved
+    model_path: Path  # Path of the trained model
+    training_data_dir: Path  # Directory where the training data is saved
+    params_image_size: list  # Value of the `image_size` parameter
+    params_batch_size: int  # Value of the `batch_size` parameter
+    params_validation_split: float  # Value of the `validation_split` parameter
+    params_scaled_decoding: bool  # Whether to decode the JPEG images at a
+    # reduced resolution
+    params_check_images: int  # Number of validation images the predictions
+    # of the bundle are checked against the trained model on
+    params_load_runs: int  # Number of timed loads of each model
+    params_intra_op_threads: int  # Number of threads used to run a single
+    # operation, 0 for the TensorFlow default
+    params_inter_op_threads: int  # Number of operations run concurrently, 0
+    # for the TensorFlow default
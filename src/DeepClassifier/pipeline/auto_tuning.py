@@ -0,0 +1,33 @@
+"""Probes the batch sizes and the threads of TensorFlow on this host, and saves
+the fastest configuration for training and for inference to `tuning.yaml`,
+which the training, evaluation and prediction then use instead of the values
+of params.yaml. Delete `tuning.yaml` to use the values of params.yaml again.
+
+Usage:
+    python src/DeepClassifier/pipeline/auto_tuning.py
+"""
+
+from DeepClassifier.config import ConfigurationManager
+from DeepClassifier.components import AutoTuner
+from DeepClassifier import logger, event_stream
+
+
+STAGE_NAME = "Auto-Tuning"
+
+
+def main():
+    config = ConfigurationManager()
+    auto_tuning_config = config.get_auto_tuning_config()
+    auto_tuner = AutoTuner(config=auto_tuning_config)
+    auto_tuner.run()
+
+
+if __name__ == "__main__":
+    try:
+        with event_stream(STAGE_NAME):
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
+            main()
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -0,0 +1,371 @@
+"""Runs the stages of `dvc.yaml` without DVC.
+
+The stage graph is built from the `deps` and `outs` of the stages: a stage
+depends on every stage that outputs one of its deps. Independent stages run
+concurrently, each in its own process with its output in
+`logs/stages/<stage>.log`.
+
+A stage is skipped when its command, the hashes of its deps and outs, and the
+values of its params are the same as after its last successful run, which are
+saved in `.pipeline_state.json`. The hashes of the files are cached by size and
+modification time, so the unchanged files are not read again.
+
+Usage:
+    python src/DeepClassifier/pipeline/executor.py --jobs 2
+    python src/DeepClassifier/pipeline/executor.py training --force
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import hashlib
+import threading
+import subprocess
+
+from pathlib import Path
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from DeepClassifier.constants import (
+    DVC_FILE_PATH,
+    PARAMS_FILE_PATH,
+    PIPELINE_STATE_FILE_PATH,
+)
+from DeepClassifier.utils import read_yaml, get_file_hash
+from DeepClassifier import logger
+
+STAGE_LOGS_DIR = Path("logs") / "stages"
+
+
+def _paths(entries: list) -> list:
+    """Returns the paths of a list of `deps`, `outs` or `metrics`, whose
+    entries are either paths or `{path: options}`.
+    """
+    paths: list = []
+    for entry in entries or []:
+        paths.extend(entry.keys() if isinstance(entry, dict) else [entry])
+    return [os.path.normpath(path) for path in paths]
+
+
+def _overlaps(path_1: str, path_2: str) -> bool:
+    """Returns whether one of the paths is the other or contains it."""
+    return (
+        path_1 == path_2
+        or path_1.startswith(path_2 + os.sep)
+        or path_2.startswith(path_1 + os.sep)
+    )
+
+
+class PipelineExecutor:
+    def __init__(
+        self,
+        dvc_file_path: Path = DVC_FILE_PATH,
+        params_file_path: Path = PARAMS_FILE_PATH,
+        state_file_path: Path = PIPELINE_STATE_FILE_PATH,
+    ) -> None:
+        """Inits PipelineExecutor.
+
+        Args:
+            dvc_file_path (Path, optional): Path of the file declaring the
+                stages. Defaults to DVC_FILE_PATH.
+            params_file_path (Path, optional): Path of the params file.
+                Defaults to PARAMS_FILE_PATH.
+            state_file_path (Path, optional): Path of the file in which the
+                hashes of the last successful runs are saved. Defaults to
+                PIPELINE_STATE_FILE_PATH.
+        """
+        logger.info(">>>>>>>>>>>> Pipeline Executor Log Started <<<<<<<<<<<<")
+        self.params_file_path = params_file_path
+        self.state_file_path = state_file_path
+        self.stages = {}
+        for name, stage in read_yaml(dvc_file_path).stages.items():
+            self.stages[name] = {
+                "cmd": stage.cmd,
+                "deps": _paths(stage.get("deps")),
+                "params": list(stage.get("params") or []),
+                "outs": _paths(stage.get("outs"))
+                + _paths(stage.get("metrics"))
+                + _paths(stage.get("plots")),
+            }
+        self.upstream = {
+            name: sorted(
+                other
+                for other, other_stage in self.stages.items()
+                if other != name
+                and any(
+                    _overlaps(dep, out)
+                    for dep in stage["deps"]
+                    for out in other_stage["outs"]
+                )
+            )
+            for name, stage in self.stages.items()
+        }
+        self._check_no_cycle()
+
+        self.state: dict = {"stages": {}, "files": {}}
+        if os.path.exists(self.state_file_path):
+            with open(self.state_file_path) as f:
+                self.state = json.load(f)
+        self.file_hash_hits = 0
+        self.file_hash_misses = 0
+        self.lock = threading.Lock()
+
+    def _check_no_cycle(self):
+        """Raises a `ValueError` if the stage graph has a cycle."""
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"The stage graph has a cycle at: {name}")
+            visiting.add(name)
+            for upstream in self.upstream[name]:
+                visit(upstream)
+            visiting.remove(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _with_upstream(self, targets: list) -> list:
+        """Returns the targets and all the stages they depend on."""
+        selected: set = set()
+        to_visit = list(targets)
+        while to_visit:
+            name = to_visit.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                to_visit.extend(self.upstream[name])
+        return [name for name in self.stages if name in selected]
+
+    def _hash_file(self, path: str) -> str:
+        """Returns the hash of a file, from the cache if its size and its
+        modification time did not change.
+        """
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        with self.lock:
+            cached = self.state["files"].get(path)
+        if cached is not None and cached["signature"] == signature:
+            with self.lock:
+                self.file_hash_hits += 1
+            return cached["hash"]
+
+        file_hash = get_file_hash(Path(path))
+        with self.lock:
+            self.file_hash_misses += 1
+            self.state["files"][path] = {"signature": signature, "hash": file_hash}
+        return file_hash
+
+    def _hash_path(self, path: str):
+        """Returns the hash of a file or a directory, or None if the path does
+        not exist.
+        """
+        if os.path.isfile(path):
+            return self._hash_file(path)
+        if not os.path.isdir(path):
+            return None
+
+        sha256 = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file in sorted(files):
+                file_path = os.path.join(root, file)
+                relative_path = os.path.relpath(file_path, path)
+                sha256.update(
+                    f"{relative_path}:{self._hash_file(file_path)}\n".encode()
+                )
+        return sha256.hexdigest()
+
+    def _stage_inputs(self, name: str) -> dict:
+        """Returns the command, the hashes of the deps and the values of the
+        params of a stage.
+        """
+        stage = self.stages[name]
+        params = read_yaml(self.params_file_path)
+        param_values = {}
+        for entry in stage["params"]:
+            if isinstance(entry, dict):
+                # `{params_file: [keys]}`
+                for params_file, keys in entry.items():
+                    file_params = read_yaml(Path(params_file))
+                    for key in keys:
+                        param_values[f"{params_file}:{key}"] = file_params.get(key)
+            else:
+                param_values[entry] = params.get(entry)
+        return {
+            "cmd": stage["cmd"],
+            "deps": {dep: self._hash_path(dep) for dep in stage["deps"]},
+            "params": json.loads(json.dumps(param_values, default=str)),
+        }
+
+    def _stage_outs(self, name: str) -> dict:
+        """Returns the hashes of the outs of a stage."""
+        return {out: self._hash_path(out) for out in self.stages[name]["outs"]}
+
+    def is_up_to_date(self, name: str, inputs: dict) -> bool:
+        """Returns whether the inputs and the outs of a stage are the same as
+        after its last successful run.
+
+        Args:
+            name (str): Name of the stage.
+            inputs (dict): The current inputs of the stage, as returned by
+                `_stage_inputs`.
+
+        Returns:
+            bool: Whether the stage can be skipped.
+        """
+        saved = self.state["stages"].get(name)
+        if saved is None or saved["inputs"] != inputs:
+            return False
+        outs = self._stage_outs(name)
+        return None not in outs.values() and saved["outs"] == outs
+
+    def _run_stage(self, name: str, force: bool) -> dict:
+        """Runs a stage, unless it is up to date.
+
+        Returns:
+            dict: The status ('skipped', 'ran' or 'failed') and the wall time
+                of the stage.
+        """
+        start_time = time.perf_counter()
+        # Hashing the inputs before the run, so that the stage is run again
+        # next time if they are modified while it is running
+        inputs = self._stage_inputs(name)
+        if not force and self.is_up_to_date(name=name, inputs=inputs):
+            logger.info(f"Stage '{name}' is up to date. Hence, skipping it")
+            return {"status": "skipped", "seconds": time.perf_counter() - start_time}
+
+        os.makedirs(STAGE_LOGS_DIR, exist_ok=True)
+        log_path = STAGE_LOGS_DIR / f"{name}.log"
+        logger.info(f"Running the stage '{name}' with the output in: {log_path}")
+        with open(log_path, "w") as log_file:
+            result = subprocess.run(
+                self.stages[name]["cmd"],
+                shell=True,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+            )
+        seconds = time.perf_counter() - start_time
+        if result.returncode != 0:
+            logger.error(f"Stage '{name}' failed. See: {log_path}")
+            return {"status": "failed", "seconds": seconds, "log": str(log_path)}
+
+        outs = self._stage_outs(name)
+        with self.lock:
+            self.state["stages"][name] = {"inputs": inputs, "outs": outs}
+            self._save_state()
+        return {"status": "ran", "seconds": seconds}
+
+    def _save_state(self):
+        """Saves the state file, atomically."""
+        temporary_path = f"{self.state_file_path}.tmp"
+        with open(temporary_path, "w") as f:
+            json.dump(self.state, f, indent=4)
+        os.replace(temporary_path, self.state_file_path)
+
+    def run(
+        self, targets: Optional[list] = None, jobs: int = 2, force: bool = False
+    ) -> dict:
+        """Runs the targets and the stages they depend on. A stage starts as
+        soon as all the stages it depends on succeeded, in parallel with the
+        other stages that are ready, up to `jobs` stages at a time. The stages
+        that depend on a failed stage are not run.
+
+        Args:
+            targets (list, optional): Names of the stages to be run. Defaults
+                to None, i.e., all the stages.
+            jobs (int, optional): Maximum number of stages run concurrently.
+                Defaults to 2.
+            force (bool, optional): Whether to run the stages even if they are
+                up to date. Defaults to False.
+
+        Returns:
+            dict: The status and the wall time of each stage.
+        """
+        pending = self._with_upstream(targets or list(self.stages))
+        results: dict = {}
+        running: dict = {}
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            while pending or running:
+                for name in list(pending):
+                    statuses = [
+                        results[upstream]["status"] if upstream in results else None
+                        for upstream in self.upstream[name]
+                    ]
+                    if "failed" in statuses or "not run" in statuses:
+                        results[name] = {"status": "not run", "seconds": 0.0}
+                        pending.remove(name)
+                    elif None not in statuses:
+                        running[pool.submit(self._run_stage, name, force)] = name
+                        pending.remove(name)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        return {name: results[name] for name in self.stages if name in results}
+
+    def report(self, results: dict, total_seconds: float) -> str:
+        """Returns a table with the status and the wall time of each stage, and
+        the cache hit rates.
+
+        Args:
+            results (dict): The results returned by `run`.
+            total_seconds (float): The wall time of the whole run.
+
+        Returns:
+            str: The report.
+        """
+        lines = [f"{'stage':<22} {'status':<8} {'seconds':>9}"]
+        for name, result in results.items():
+            lines.append(f"{name:<22} {result['status']:<8} {result['seconds']:>9.2f}")
+        lines.append(f"{'total':<22} {'':<8} {total_seconds:>9.2f}")
+
+        skipped = sum(result["status"] == "skipped" for result in results.values())
+        lines.append(
+            f"Stage cache hits: {skipped}/{len(results)}"
+            f" ({100 * skipped / max(len(results), 1):.0f}%)"
+        )
+        hashed = self.file_hash_hits + self.file_hash_misses
+        lines.append(
+            f"File hash cache hits: {self.file_hash_hits}/{hashed}"
+            f" ({100 * self.file_hash_hits / max(hashed, 1):.0f}%)"
+        )
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="Stages to run, with the stages they depend on. Defaults to all",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=2, help="Maximum number of concurrent stages"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Run the stages even if up to date"
+    )
+    args = parser.parse_args()
+
+    executor = PipelineExecutor()
+    start_time = time.perf_counter()
+    results = executor.run(targets=args.targets, jobs=args.jobs, force=args.force)
+    report = executor.report(
+        results=results, total_seconds=time.perf_counter() - start_time
+    )
+    print(report)
+    logger.info(f"Pipeline executor report:\n{report}")
+    if any(result["status"] in ("failed", "not run") for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Loads the models of the heads listed under `multi_head` in config.yaml into
+a single engine, which runs each backbone they share once per batch, and
+reports the compute and the memory saved against running the models
+separately. With image paths, also prints the outputs of all the heads for
+each image.
+
+Usage:
+    python src/DeepClassifier/pipeline/multi_head.py [IMAGE ...]
+"""
+
+import sys
+import json
+
+from typing import Optional
+
+from DeepClassifier.config import ConfigurationManager
+from DeepClassifier.components import MultiHeadEngine
+from DeepClassifier import logger, event_stream
+
+
+STAGE_NAME = "Multi-Head Inference"
+
+
+def main(paths: Optional[list] = None):
+    config = ConfigurationManager()
+    multi_head_config = config.get_multi_head_config()
+    engine = MultiHeadEngine(config=multi_head_config)
+    engine.load_models()
+    engine.report()
+    if paths:
+        print(json.dumps(engine.predict_images(paths=paths), indent=4))
+    return engine
+
+
+if __name__ == "__main__":
+    try:
+        with event_stream(STAGE_NAME):
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
+            main(paths=sys.argv[1:])
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
+    except Exception as e:
+        logger.exception(e)
+        raise e
@@ -1,6 +1,7 @@
 from DeepClassifier.config import ConfigurationManager
 from DeepClassifier.components import DataIngestion
-from DeepClassifier import logger
+from DeepClassifier.utils import monitor_resources
+from DeepClassifier import logger, event_stream
 
 
 STAGE_NAME = "Data Ingestion"
@@ -18,9 +19,10 @@ def main():
 
 if __name__ == "__main__":
     try:
-        logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
-        main()
-        logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
+        with event_stream(STAGE_NAME), monitor_resources(STAGE_NAME):
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
+            main()
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
     except Exception as e:
         logger.exception(e)
         raise e
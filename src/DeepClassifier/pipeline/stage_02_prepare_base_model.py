@@ -1,12 +1,19 @@
 from DeepClassifier.config import ConfigurationManager
 from DeepClassifier.components import PrepareBaseModel
-from DeepClassifier import logger
+from DeepClassifier.utils import monitor_resources
+from DeepClassifier import logger, event_stream
 
 
 STAGE_NAME = "Prepare Base Model"
 
 
 def main():
+    """Runs the stage.
+
+    Returns:
+        tf.keras.Model: The full model, so that it can be passed on in memory
+            to the training stage.
+    """
     config = ConfigurationManager()
 
     prepare_base_model_config = config.get_prepare_base_model_config()
@@ -14,13 +21,15 @@ def main():
     prepare_base_model = PrepareBaseModel(config=prepare_base_model_config)
     prepare_base_model.create_and_save_base_model()
     prepare_base_model.update_base_model_to_full_model_and_save_it()
+    return prepare_base_model.full_model
 
 
 if __name__ == "__main__":
     try:
-        logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
-        main()
-        logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
+        with event_stream(STAGE_NAME), monitor_resources(STAGE_NAME):
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
+            main()
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
     except Exception as e:
         logger.exception(e)
         raise e
@@ -1,30 +1,59 @@
 from DeepClassifier.config import ConfigurationManager
-from DeepClassifier.components import PrepareCallbacks, Training
-from DeepClassifier import logger
+from DeepClassifier.components import (
+    PrepareCallbacks,
+    Training,
+    IncrementalTraining,
+)
+from DeepClassifier.utils import monitor_resources
+from DeepClassifier import logger, event_stream
 
 
 STAGE_NAME = "Training"
 
 
-def main():
+def main(updated_base_model=None):
+    """Runs the stage.
+
+    Args:
+        updated_base_model (tf.keras.Model, optional): The updated base model
+            already in memory. Defaults to None, i.e., it is loaded from disk.
+
+    Returns:
+        Training | IncrementalTraining: The component holding the trained model
+            and the validation generator, so that they can be passed on in
+            memory to the evaluation stage.
+    """
     config = ConfigurationManager()
 
+    if config.get_training_config().params_incremental_training:
+        incremental_training = IncrementalTraining(
+            config=config.get_incremental_training_config()
+        )
+        if incremental_training.can_run():
+            # Fine-tuning the trained model on the images ingested since its
+            # last training, instead of training the updated base model
+            incremental_training.train()
+            return incremental_training
+        logger.info("No trained model to fine-tune yet. Running a full training")
+
     prepare_callbacks_config = config.get_prepare_callbacks_config()
     prepare_callbacks = PrepareCallbacks(config=prepare_callbacks_config)
     callbacks = prepare_callbacks.get_tb_and_checkpoint_callbacks()
 
     training_config = config.get_training_config()
     training = Training(config=training_config)
-    training.get_updated_base_model()
+    training.get_updated_base_model(model=updated_base_model)
     training.train_val_generator()
     training.train_model(callbacks=callbacks)
+    return training
 
 
 if __name__ == "__main__":
     try:
-        logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
-        main()
-        logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
+        with event_stream(STAGE_NAME), monitor_resources(STAGE_NAME):
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
+            main()
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
     except Exception as e:
         logger.exception(e)
         raise e
@@ -1,24 +1,55 @@
+import argparse
+
 from DeepClassifier.config import ConfigurationManager
-from DeepClassifier.components import Evaluation
-from DeepClassifier import logger
+from DeepClassifier.components import Evaluation, CrossValidation
+from DeepClassifier.utils import monitor_resources
+from DeepClassifier import logger, event_stream
 
 
 STAGE_NAME = "Evaluation"
 
 
-def main():
+def main(force_refresh: bool = False, model=None, validation_generator=None):
+    """Runs the stage.
+
+    Args:
+        force_refresh (bool, optional): Whether to ignore the cached
+            evaluation results. Defaults to False.
+        model (tf.keras.Model, optional): The trained model already in memory.
+            Defaults to None, i.e., it is loaded from disk if needed.
+        validation_generator (optional): The validation generator already in
+            memory. Defaults to None, i.e., it is created.
+    """
     config = ConfigurationManager()
     evaluation_config = config.get_evaluation_config()
     evaluation = Evaluation(config=evaluation_config)
-    evaluation.evaluation()
-    evaluation.save_score()
+    evaluation.evaluation(
+        force_refresh=force_refresh,
+        model=model,
+        validation_generator=validation_generator,
+    )
+
+    cross_validation_scores = None
+    if evaluation_config.params_cv_folds > 1:
+        cross_validation_config = config.get_cross_validation_config()
+        cross_validation = CrossValidation(config=cross_validation_config)
+        cross_validation_scores = cross_validation.run()
+    evaluation.save_scores(cross_validation_scores=cross_validation_scores)
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--force-refresh",
+        action="store_true",
+        help="Ignore the cached evaluation results and evaluate the model again",
+    )
+    args = parser.parse_args()
     try:
-        logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
-        main()
-        logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
+        with event_stream(STAGE_NAME), monitor_resources(STAGE_NAME):
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
+            main(force_refresh=args.force_refresh)
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
     except Exception as e:
         logger.exception(e)
         raise e
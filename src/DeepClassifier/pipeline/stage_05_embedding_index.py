@@ -0,0 +1,27 @@
+from DeepClassifier.config import ConfigurationManager
+from DeepClassifier.components import EmbeddingIndex
+from DeepClassifier.utils import monitor_resources
+from DeepClassifier import logger, event_stream
+
+
+STAGE_NAME = "Embedding Index"
+
+
+def main():
+    config = ConfigurationManager()
+    embedding_index_config = config.get_embedding_index_config()
+    embedding_index = EmbeddingIndex(config=embedding_index_config)
+    embedding_index.get_embedding_model()
+    embedding_index.extract_embeddings()
+    embedding_index.build_index()
+
+
+if __name__ == "__main__":
+    try:
+        with event_stream(STAGE_NAME), monitor_resources(STAGE_NAME):
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
+            main()
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
+    except Exception as e:
+        logger.exception(e)
+        raise e
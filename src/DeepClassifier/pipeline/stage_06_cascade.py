@@ -0,0 +1,26 @@
+from DeepClassifier.config import ConfigurationManager
+from DeepClassifier.components import Cascade
+from DeepClassifier.utils import monitor_resources
+from DeepClassifier import logger, event_stream
+
+
+STAGE_NAME = "Cascade"
+
+
+def main():
+    config = ConfigurationManager()
+    cascade_config = config.get_cascade_config()
+    cascade = Cascade(config=cascade_config)
+    cascade.train_small_model()
+    cascade.calibrate()
+
+
+if __name__ == "__main__":
+    try:
+        with event_stream(STAGE_NAME), monitor_resources(STAGE_NAME):
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
+            main()
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
+    except Exception as e:
+        logger.exception(e)
+        raise e
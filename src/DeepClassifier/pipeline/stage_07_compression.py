@@ -0,0 +1,27 @@
+from DeepClassifier.config import ConfigurationManager
+from DeepClassifier.components import Compression
+from DeepClassifier.utils import monitor_resources
+from DeepClassifier import logger, event_stream
+
+
+STAGE_NAME = "Compression"
+
+
+def main():
+    config = ConfigurationManager()
+    compression_config = config.get_compression_config()
+    compression = Compression(config=compression_config)
+    compression.prune()
+    compression.cluster()
+    compression.export()
+
+
+if __name__ == "__main__":
+    try:
+        with event_stream(STAGE_NAME), monitor_resources(STAGE_NAME):
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Started <<<<<<<<<<<<")
+            main()
+            logger.info(f">>>>>>>>>>>> {STAGE_NAME} Stage Completed <<<<<<<<<<<<\n\n\n\n")
+    except Exception as e:
+        logger.exception(e)
+        raise e
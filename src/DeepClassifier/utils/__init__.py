@@ -1 +1,3 @@
 from DeepClassifier.utils.common import *
+from DeepClassifier.utils.ann import PCA, IVFIndex
+from DeepClassifier.utils.telemetry import ResourceMonitor, monitor_resources
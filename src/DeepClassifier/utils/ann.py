@@ -0,0 +1,239 @@
+"""This module contains PCA and an approximate nearest-neighbour (ANN) index
+over embeddings, implemented with NumPy only.
+
+The index is an inverted file (IVF) index: the embeddings are clustered with
+k-means, and a query only scans the clusters (lists) whose centroids are the
+closest to it. The embeddings themselves stay in a memory-mapped `.npy` file,
+so the index works for datasets that do not fit in memory.
+"""
+
+import os
+import numpy as np
+
+from pathlib import Path
+
+
+def _squared_distances(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Returns the squared L2 distances between the rows of `x` and `y`."""
+    distances = (
+        np.sum(x**2, axis=1, keepdims=True)
+        - 2 * x @ y.T
+        + np.sum(y**2, axis=1)[np.newaxis, :]
+    )
+    # Clipping the small negative values caused by rounding errors
+    return np.maximum(distances, 0)
+
+
+class PCA:
+    def __init__(self, n_components: int) -> None:
+        """Inits PCA.
+
+        Args:
+            n_components (int): Number of principal components to keep.
+        """
+        self.n_components = n_components
+
+    def fit(self, x: np.ndarray) -> "PCA":
+        """Fits the principal components on a sample of the embeddings.
+
+        Args:
+            x (np.ndarray): The sample, of shape (samples, features).
+
+        Returns:
+            PCA: The fitted PCA.
+        """
+        x = x.astype(np.float32)
+        self.mean = x.mean(axis=0)
+        _, _, vt = np.linalg.svd(x - self.mean, full_matrices=False)
+        self.components = vt[: self.n_components].astype(np.float32)
+        return self
+
+    def transform(self, x: np.ndarray) -> np.ndarray:
+        """Projects embeddings on the principal components.
+
+        Args:
+            x (np.ndarray): The embeddings, of shape (samples, features).
+
+        Returns:
+            np.ndarray: The projected embeddings.
+        """
+        return (x - self.mean) @ self.components.T
+
+    def save(self, path: Path):
+        """Saves the fitted PCA to a `.npz` file.
+
+        Args:
+            path (Path): Path of the file.
+        """
+        np.savez(path, mean=self.mean, components=self.components)
+
+    @classmethod
+    def load(cls, path: Path) -> "PCA":
+        """Loads a fitted PCA from a `.npz` file.
+
+        Args:
+            path (Path): Path of the file.
+
+        Returns:
+            PCA: The fitted PCA.
+        """
+        data = np.load(path)
+        pca = cls(n_components=len(data["components"]))
+        pca.mean, pca.components = data["mean"], data["components"]
+        return pca
+
+
+class IVFIndex:
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        centroids: np.ndarray,
+        list_ids: np.ndarray,
+        list_offsets: np.ndarray,
+    ) -> None:
+        """Inits IVFIndex. Use `build` or `load` to create an index.
+
+        Args:
+            embeddings (np.ndarray): The (memory-mapped) embeddings.
+            centroids (np.ndarray): The centroids of the lists.
+            list_ids (np.ndarray): Ids of the embeddings, sorted by list.
+            list_offsets (np.ndarray): Start of each list in `list_ids`, plus
+                the total number of embeddings at the end.
+        """
+        self.embeddings = embeddings
+        self.centroids = centroids
+        self.list_ids = list_ids
+        self.list_offsets = list_offsets
+
+    @staticmethod
+    def _assign(
+        embeddings: np.ndarray, centroids: np.ndarray, chunk_size: int
+    ) -> np.ndarray:
+        """Returns the closest centroid of each embedding, in chunks."""
+        assignments = np.empty(len(embeddings), dtype=np.int64)
+        for start in range(0, len(embeddings), chunk_size):
+            chunk = np.asarray(embeddings[start : start + chunk_size])
+            distances = _squared_distances(chunk, centroids)
+            assignments[start : start + chunk_size] = np.argmin(distances, axis=1)
+        return assignments
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        n_lists: int,
+        n_iterations: int = 20,
+        sample_size: int = 100_000,
+        chunk_size: int = 10_000,
+        seed: int = 42,
+    ) -> "IVFIndex":
+        """Builds the index by clustering the embeddings with k-means.
+
+        Args:
+            embeddings (np.ndarray): The (memory-mapped) embeddings.
+            n_lists (int): Number of lists (k-means clusters).
+            n_iterations (int, optional): Number of k-means iterations.
+                Defaults to 20.
+            sample_size (int, optional): Number of embeddings the k-means is
+                trained on. Defaults to 100_000.
+            chunk_size (int, optional): Number of embeddings assigned to the
+                lists at a time. Defaults to 10_000.
+            seed (int, optional): The random seed. Defaults to 42.
+
+        Returns:
+            IVFIndex: The index.
+        """
+        rng = np.random.default_rng(seed)
+        n_lists = min(n_lists, len(embeddings))
+
+        # Training the k-means on a sample of the embeddings
+        sample_ids = np.sort(
+            rng.choice(
+                len(embeddings), min(sample_size, len(embeddings)), replace=False
+            )
+        )
+        sample = np.asarray(embeddings[sample_ids], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(n_iterations):
+            assignments = cls._assign(sample, centroids, chunk_size)
+            for list_id in range(n_lists):
+                members = sample[assignments == list_id]
+                if len(members) > 0:
+                    centroids[list_id] = members.mean(axis=0)
+
+        # Assigning all the embeddings to the lists
+        assignments = cls._assign(embeddings, centroids, chunk_size)
+        list_ids = np.argsort(assignments, kind="stable")
+        list_offsets = np.searchsorted(
+            assignments[list_ids], np.arange(n_lists + 1)
+        ).astype(np.int64)
+        return cls(embeddings, centroids, list_ids, list_offsets)
+
+    def search(self, queries: np.ndarray, k: int = 10, n_probe: int = 8) -> tuple:
+        """Searches the approximate `k` nearest neighbours of the queries.
+
+        Args:
+            queries (np.ndarray): The queries, of shape (queries, features).
+            k (int, optional): Number of neighbours. Defaults to 10.
+            n_probe (int, optional): Number of lists scanned per query.
+                Defaults to 8.
+
+        Returns:
+            tuple: The squared L2 distances and the ids of the neighbours, each
+                of shape (queries, k). Missing neighbours have the id -1.
+        """
+        queries = np.atleast_2d(queries).astype(np.float32)
+        n_probe = min(n_probe, len(self.centroids))
+        probed_lists = np.argsort(_squared_distances(queries, self.centroids), axis=1)[
+            :, :n_probe
+        ]
+
+        all_distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for i, (query, lists) in enumerate(zip(queries, probed_lists)):
+            candidate_ids = np.concatenate(
+                [
+                    self.list_ids[self.list_offsets[j] : self.list_offsets[j + 1]]
+                    for j in lists
+                ]
+            )
+            if len(candidate_ids) == 0:
+                continue
+            # Sorting the ids makes the reads from the memory map sequential
+            candidate_ids = np.sort(candidate_ids)
+            distances = _squared_distances(
+                query[np.newaxis, :], np.asarray(self.embeddings[candidate_ids])
+            )[0]
+            top = np.argsort(distances)[:k]
+            all_distances[i, : len(top)] = distances[top]
+            all_ids[i, : len(top)] = candidate_ids[top]
+        return all_distances, all_ids
+
+    def save(self, index_dir: Path):
+        """Saves the index (without the embeddings) to a directory.
+
+        Args:
+            index_dir (Path): The directory.
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        np.save(os.path.join(index_dir, "centroids.npy"), self.centroids)
+        np.save(os.path.join(index_dir, "list_ids.npy"), self.list_ids)
+        np.save(os.path.join(index_dir, "list_offsets.npy"), self.list_offsets)
+
+    @classmethod
+    def load(cls, index_dir: Path, embeddings: np.ndarray) -> "IVFIndex":
+        """Loads an index saved with `save`. The list ids are memory-mapped.
+
+        Args:
+            index_dir (Path): The directory of the index.
+            embeddings (np.ndarray): The (memory-mapped) embeddings.
+
+        Returns:
+            IVFIndex: The index.
+        """
+        return cls(
+            embeddings=embeddings,
+            centroids=np.load(os.path.join(index_dir, "centroids.npy")),
+            list_ids=np.load(os.path.join(index_dir, "list_ids.npy"), mmap_mode="r"),
+            list_offsets=np.load(os.path.join(index_dir, "list_offsets.npy")),
+        )
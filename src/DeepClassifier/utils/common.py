@@ -1,15 +1,19 @@
 import os
+import math
 import yaml
 import json
 import joblib
+import time
+import hashlib
 
 from ensure import ensure_annotations
 from box import ConfigBox
 from pathlib import Path
 from box.exceptions import BoxValueError
 from typing import Any
+from collections import Counter
 
-from DeepClassifier import logger
+from DeepClassifier import logger, log_event
 
 
 @ensure_annotations
@@ -37,6 +41,19 @@ def read_yaml(yaml_file_path: Path) -> ConfigBox:
         raise e
 
 
+@ensure_annotations
+def save_yaml(path: Path, data: dict):
+    """Saves data to a YAML file.
+
+    Args:
+        path (Path): Path of the YAML file to save the data into.
+        data (dict): The data to be saved into the YAML file.
+    """
+    with open(path, "w") as f:
+        yaml.safe_dump(data, f, sort_keys=False)
+    logger.info(f"YAML file saved at: {path}")
+
+
 @ensure_annotations
 def create_directories(paths_of_directories: list, verbose=True):
     """Creates directories using a given list of their paths.
@@ -121,3 +138,89 @@ def get_size(path: Path) -> str:
     """
     size_kb = round(os.path.getsize(path) / 1024)
     return f"~ {size_kb} KB"
+
+
+@ensure_annotations
+def get_file_hash(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Returns the SHA-256 hash of the content of a file.
+
+    Args:
+        path (Path): Path of the file.
+        chunk_size (int, optional): Number of bytes read at a time, so that
+            large files (e.g., models) are never loaded fully into memory.
+            Defaults to 1 MB.
+
+    Returns:
+        str: Hexadecimal SHA-256 digest of the file.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_available_memory_mb() -> float:
+    """Returns the memory available for new processes, in MB.
+
+    Returns:
+        float: The `MemAvailable` of `/proc/meminfo`, or infinity if it is not
+            known.
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        # E.g., on Windows or macOS
+        pass
+    return math.inf
+
+
+class LogSummary:
+    def __init__(self, name: str, interval: float = 10.0, examples: int = 5) -> None:
+        """Inits LogSummary, which replaces the log calls of a loop by counts
+        that are logged at most once per `interval` seconds, and by a final
+        summary event.
+
+        Args:
+            name (str): Name of the loop, used in the log messages.
+            interval (float, optional): Minimum number of seconds between two
+                log messages. Defaults to 10.0.
+            examples (int, optional): Number of examples kept per count, for
+                the final summary. Defaults to 5.
+        """
+        self.name = name
+        self.interval = interval
+        self.number_of_examples = examples
+        self.counts: Counter = Counter()
+        self.examples: dict = {}
+        self.last_log_time = time.perf_counter()
+
+    def add(self, key: str, example: Any = None):
+        """Counts an occurrence of `key`, e.g., a deleted file.
+
+        Args:
+            key (str): What is counted.
+            example (Any, optional): An example of the occurrence (e.g., the
+                path of the file), kept for the final summary. Defaults to
+                None.
+        """
+        self.counts[key] += 1
+        if example is not None:
+            examples = self.examples.setdefault(key, [])
+            if len(examples) < self.number_of_examples:
+                examples.append(str(example))
+
+        if time.perf_counter() - self.last_log_time >= self.interval:
+            logger.info(f"{self.name}: {dict(self.counts)}")
+            self.last_log_time = time.perf_counter()
+
+    def close(self):
+        """Logs the final counts and examples as an event."""
+        log_event(
+            f"{self.name.lower().replace(' ', '_')}_summary",
+            counts=dict(self.counts),
+            examples=self.examples,
+        )
@@ -0,0 +1,291 @@
+"""This module contains the code to monitor the resources used by a stage.
+
+A background thread samples the resident memory (RSS), the CPU time, the
+number of threads and the storage I/O of the process from `/proc/self`, and
+the summary of the stage (peak, mean and timeline) is saved as a JSON metrics
+file. A stage whose CPU sat mostly idle is flagged, as it likely waited on I/O
+or on its input pipeline.
+"""
+
+import os
+import time
+import threading
+import contextlib
+
+from pathlib import Path
+from typing import Optional
+
+from DeepClassifier.constants import TELEMETRY_DIR_PATH
+from DeepClassifier.utils.common import save_json
+from DeepClassifier import logger, log_event
+
+
+def _read_status() -> dict:
+    """Returns the RSS, the peak RSS (in MB) and the number of threads of the
+    process, from `/proc/self/status`.
+    """
+    status = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, value = line.split(":", 1)
+            if key in ("VmRSS", "VmHWM"):
+                status[key] = int(value.split()[0]) / 1024
+            elif key == "Threads":
+                status[key] = int(value)
+    return status
+
+
+def _read_cpu_seconds() -> float:
+    """Returns the CPU time (user and system) of all the threads of the
+    process, from `/proc/self/stat`.
+    """
+    with open("/proc/self/stat") as f:
+        # The name of the process, in parentheses, may contain spaces
+        fields = f.read().rsplit(")", 1)[1].split()
+    # `utime` and `stime` are the 14th and 15th fields of the file, in clock
+    # ticks
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _read_io() -> dict:
+    """Returns the bytes read and written by the process, from
+    `/proc/self/io`: from the storage (`read_bytes`, `write_bytes`), and in
+    total, including the page cache (`rchar`, `wchar`). Empty if the file
+    cannot be read, e.g., in some containers.
+    """
+    try:
+        with open("/proc/self/io") as f:
+            return {
+                key: int(value)
+                for key, value in (line.split(":", 1) for line in f)
+                if key in ("read_bytes", "write_bytes", "rchar", "wchar")
+            }
+    except OSError:
+        return {}
+
+
+class ResourceMonitor:
+    def __init__(self, interval: float = 0.5, max_samples: int = 500) -> None:
+        """Inits ResourceMonitor, which samples the resources of the process on
+        a background thread between `start` and `stop`.
+
+        Args:
+            interval (float, optional): Seconds between two samples. Defaults
+                to 0.5.
+            max_samples (int, optional): Maximum number of samples kept in the
+                timeline. When it is reached, every other sample is dropped and
+                the interval is doubled, so long stages keep a bounded
+                timeline. Defaults to 500.
+        """
+        self.interval = interval
+        self.max_samples = max_samples
+        self.samples: list = []
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="ResourceMonitor", daemon=True
+        )
+
+    def _sample(self):
+        status = _read_status()
+        io = _read_io()
+        self.samples.append(
+            {
+                "seconds": time.perf_counter() - self.start_time,
+                "rss_mb": status["VmRSS"],
+                "peak_rss_mb": status["VmHWM"],
+                "threads": status["Threads"],
+                "cpu_seconds": _read_cpu_seconds(),
+                "read_bytes": io.get("read_bytes"),
+                "write_bytes": io.get("write_bytes"),
+                "rchar": io.get("rchar"),
+                "wchar": io.get("wchar"),
+            }
+        )
+        if len(self.samples) > self.max_samples:
+            # Keeping the first and the last samples
+            self.samples = self.samples[:-1:2] + self.samples[-1:]
+            self.interval *= 2
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        """Takes the first sample and starts the background thread."""
+        try:
+            # Resetting the peak RSS of the process, so that the peak is the
+            # one of the stage when several stages run in the same process
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+        self.start_time = time.perf_counter()
+        self._sample()
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background thread and takes the last sample."""
+        self._stop_event.set()
+        self._thread.join()
+        self._sample()
+
+    def summary(self, idle_cpu_fraction: float = 0.5) -> dict:
+        """Summarizes the samples.
+
+        Args:
+            idle_cpu_fraction (float, optional): The CPU is flagged as idle if
+                the stage used less than this fraction of the CPU cores
+                available to it on average. Defaults to 0.5.
+
+        Returns:
+            dict: The peak and mean of each resource, the totals of the I/O,
+                the CPU idle flag and the timeline.
+        """
+        first, last = self.samples[0], self.samples[-1]
+        seconds = last["seconds"] - first["seconds"]
+        if hasattr(os, "sched_getaffinity"):
+            cores = len(os.sched_getaffinity(0))
+        else:
+            cores = os.cpu_count() or 1
+
+        # The CPU cores used between each sample and the previous one
+        timeline = []
+        for previous, sample in zip(self.samples, self.samples[1:]):
+            elapsed = max(sample["seconds"] - previous["seconds"], 1e-9)
+            timeline.append(
+                {
+                    "seconds": sample["seconds"],
+                    "rss_mb": sample["rss_mb"],
+                    "cpu_cores": (sample["cpu_seconds"] - previous["cpu_seconds"])
+                    / elapsed,
+                    "threads": sample["threads"],
+                    "read_mb": _delta_mb(previous, sample, "read_bytes"),
+                    "write_mb": _delta_mb(previous, sample, "write_bytes"),
+                }
+            )
+
+        cpu_cores = (last["cpu_seconds"] - first["cpu_seconds"]) / max(seconds, 1e-9)
+        cpu_fraction = cpu_cores / cores
+        return {
+            "seconds": seconds,
+            "interval_seconds": self.interval,
+            "cpu_cores_available": cores,
+            "rss_mb": {
+                "peak": max(last["peak_rss_mb"], *(s["rss_mb"] for s in self.samples)),
+                "mean": sum(s["rss_mb"] for s in self.samples) / len(self.samples),
+            },
+            "cpu_cores": {
+                "peak": max((point["cpu_cores"] for point in timeline), default=0.0),
+                "mean": cpu_cores,
+            },
+            "cpu_fraction": cpu_fraction,
+            "cpu_seconds": last["cpu_seconds"] - first["cpu_seconds"],
+            "threads": {
+                "peak": max(s["threads"] for s in self.samples),
+                "mean": sum(s["threads"] for s in self.samples) / len(self.samples),
+            },
+            "io": {
+                "read_mb": _delta_mb(first, last, "read_bytes"),
+                "write_mb": _delta_mb(first, last, "write_bytes"),
+                "read_mb_with_page_cache": _delta_mb(first, last, "rchar"),
+                "write_mb_with_page_cache": _delta_mb(first, last, "wchar"),
+            },
+            "cpu_idle": cpu_fraction < idle_cpu_fraction,
+            "timeline": timeline,
+        }
+
+
+def _unavailable_summary(stage_name: str) -> dict:
+    """Returns the summary of a stage run without telemetry, with the keys of
+    `ResourceMonitor.summary` and null values.
+    """
+    peak_and_mean = {"peak": None, "mean": None}
+    return {
+        "stage": stage_name,
+        "available": False,
+        "seconds": None,
+        "interval_seconds": None,
+        "cpu_cores_available": None,
+        "rss_mb": dict(peak_and_mean),
+        "cpu_cores": dict(peak_and_mean),
+        "cpu_fraction": None,
+        "cpu_seconds": None,
+        "threads": dict(peak_and_mean),
+        "io": {
+            "read_mb": None,
+            "write_mb": None,
+            "read_mb_with_page_cache": None,
+            "write_mb_with_page_cache": None,
+        },
+        "cpu_idle": None,
+        "timeline": [],
+    }
+
+
+def _delta_mb(first: dict, last: dict, key: str) -> Optional[float]:
+    """Returns the difference of an I/O counter between two samples, in MB,
+    or None if the counter is not known.
+    """
+    if first[key] is None or last[key] is None:
+        return None
+    return (last[key] - first[key]) / 1024**2
+
+
+@contextlib.contextmanager
+def monitor_resources(
+    stage_name: str,
+    path: Optional[Path] = None,
+    interval: float = 0.5,
+    idle_cpu_fraction: float = 0.5,
+):
+    """Monitors the resources used by a stage, and saves their summary to a
+    JSON metrics file, even if the stage fails. Where `/proc` is not available,
+    the stage runs without telemetry, and the summary is saved with null values
+    so the metrics file always exists.
+
+    Args:
+        stage_name (str): Name of the stage.
+        path (Path, optional): Path of the metrics file. Defaults to None,
+            i.e., `TELEMETRY_DIR_PATH/<stage>.json`.
+        interval (float, optional): Seconds between two samples. Defaults to
+            0.5.
+        idle_cpu_fraction (float, optional): The CPU is flagged as idle if the
+            stage used less than this fraction of the available CPU cores on
+            average. Defaults to 0.5.
+    """
+    if path is None:
+        path = TELEMETRY_DIR_PATH / f"{stage_name.lower().replace(' ', '_')}.json"
+    monitor = ResourceMonitor(interval=interval)
+    try:
+        monitor.start()
+    except (OSError, AttributeError, ValueError) as e:
+        # `/proc` or `os.sysconf` is not available, e.g., on Windows or macOS
+        logger.warning(
+            f"Running the stage '{stage_name}' without resource telemetry: {e!r}"
+        )
+        os.makedirs(Path(path).parent, exist_ok=True)
+        save_json(path=Path(path), data=_unavailable_summary(stage_name))
+        yield None
+        return
+    try:
+        yield monitor
+    finally:
+        monitor.stop()
+        summary = {
+            "stage": stage_name,
+            "available": True,
+            **monitor.summary(idle_cpu_fraction),
+        }
+        log_event(
+            "stage_telemetry",
+            **{key: value for key, value in summary.items() if key != "timeline"},
+        )
+        if summary["cpu_idle"]:
+            logger.warning(
+                f"The CPU sat idle during the stage '{stage_name}'"
+                f" ({summary['cpu_fraction']:.0%} of {summary['cpu_cores_available']}"
+                " cores used on average). It is likely waiting on I/O or on its"
+                " input pipeline"
+            )
+        os.makedirs(Path(path).parent, exist_ok=True)
+        save_json(path=Path(path), data=summary)
@@ -0,0 +1,50 @@
+from typing import Optional
+
+import pytest
+import tensorflow as tf
+
+
+@pytest.fixture
+def make_model():
+    """Returns a factory of tiny Input -> Conv2D -> Flatten -> Dense models.
+
+    Args of the factory:
+        input_shape (tuple, optional): Shape of the input. Defaults to
+            (8, 8, 3).
+        filters (int, optional): Filters of the Conv2D layer, which is left out
+            if None. Defaults to 4.
+        units (int, optional): Units of the softmax Dense layer. Defaults to 2.
+        seed (int, optional): Random seed of the weights. Defaults to 0.
+        head_seed (int, optional): Random seed of the Dense layer only, e.g.,
+            for several heads on the same backbone. Defaults to None.
+        optimizer (optional): If given, the model is compiled with it, the
+            categorical cross-entropy loss and the accuracy. Defaults to None.
+    """
+
+    def _make_model(
+        input_shape: tuple = (8, 8, 3),
+        filters: Optional[int] = 4,
+        units: int = 2,
+        seed: int = 0,
+        head_seed: Optional[int] = None,
+        optimizer=None,
+    ) -> tf.keras.Model:
+        tf.keras.utils.set_random_seed(seed)
+        inputs = tf.keras.layers.Input(shape=input_shape)
+        x = inputs
+        if filters is not None:
+            x = tf.keras.layers.Conv2D(filters=filters, kernel_size=3)(x)
+        x = tf.keras.layers.Flatten()(x)
+        if head_seed is not None:
+            tf.keras.utils.set_random_seed(head_seed)
+        outputs = tf.keras.layers.Dense(units=units, activation="softmax")(x)
+        model = tf.keras.models.Model(inputs=inputs, outputs=outputs)
+        if optimizer is not None:
+            model.compile(
+                optimizer=optimizer,
+                loss=tf.keras.losses.CategoricalCrossentropy(),
+                metrics=["accuracy"],
+            )
+        return model
+
+    return _make_model
@@ -0,0 +1,59 @@
+import numpy as np
+
+from DeepClassifier.utils.ann import PCA, IVFIndex
+
+
+def _clustered_embeddings(n_samples=2000, n_features=32, n_clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, n_features)) * 10
+    labels = rng.integers(0, n_clusters, size=n_samples)
+    return (centers[labels] + rng.normal(size=(n_samples, n_features))).astype(
+        np.float32
+    )
+
+
+def _exact_neighbours(embeddings, queries, k):
+    distances = ((queries[:, np.newaxis, :] - embeddings[np.newaxis]) ** 2).sum(-1)
+    return np.argsort(distances, axis=1)[:, :k]
+
+
+class Test_IVFIndex:
+    embeddings = _clustered_embeddings()
+    queries = embeddings[:50] + 0.01
+
+    def test_search_all_lists_is_exact(self):
+        index = IVFIndex.build(self.embeddings, n_lists=16)
+        _, ids = index.search(self.queries, k=5, n_probe=16)
+        expected = _exact_neighbours(self.embeddings, self.queries, k=5)
+        assert np.array_equal(np.sort(ids, axis=1), np.sort(expected, axis=1))
+
+    def test_search_recall(self):
+        index = IVFIndex.build(self.embeddings, n_lists=32)
+        _, ids = index.search(self.queries, k=10, n_probe=4)
+        expected = _exact_neighbours(self.embeddings, self.queries, k=10)
+        recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(ids, expected)])
+        assert recall >= 0.9
+
+    def test_save_and_load(self, tmp_path):
+        embeddings_path = tmp_path / "embeddings.npy"
+        np.save(embeddings_path, self.embeddings)
+        embeddings = np.load(embeddings_path, mmap_mode="r")
+
+        index = IVFIndex.build(embeddings, n_lists=16)
+        index.save(tmp_path / "index")
+        loaded_index = IVFIndex.load(tmp_path / "index", embeddings=embeddings)
+        assert np.array_equal(
+            index.search(self.queries, k=5)[1],
+            loaded_index.search(self.queries, k=5)[1],
+        )
+
+
+class Test_PCA:
+    def test_transform_shape(self, tmp_path):
+        embeddings = _clustered_embeddings()
+        pca = PCA(n_components=8).fit(embeddings)
+        assert pca.transform(embeddings).shape == (len(embeddings), 8)
+
+        pca.save(tmp_path / "pca.npz")
+        loaded_pca = PCA.load(tmp_path / "pca.npz")
+        assert np.allclose(pca.transform(embeddings), loaded_pca.transform(embeddings))
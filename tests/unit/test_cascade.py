@@ -0,0 +1,35 @@
+import numpy as np
+
+from DeepClassifier.components.cascade import calibrate_threshold
+
+
+class Test_calibrate_threshold:
+    confidences = np.array([0.55, 0.6, 0.6, 0.9, 0.95, 0.99])
+    small_correct = np.array([False, False, True, True, True, True])
+    full_correct = np.array([True, True, True, True, True, True])
+
+    def test_fewest_escalations_meeting_the_target(self):
+        threshold = calibrate_threshold(
+            self.confidences, self.small_correct, self.full_correct, 5 / 6
+        )
+        assert threshold == 0.6
+        threshold = calibrate_threshold(
+            self.confidences, self.small_correct, self.full_correct, 1.0
+        )
+        # The tie at 0.6 escalates both images, as no threshold splits them
+        assert threshold == 0.9
+
+    def test_no_escalation_when_the_small_model_meets_the_target(self):
+        threshold = calibrate_threshold(
+            self.confidences, self.small_correct, self.full_correct, 0.5
+        )
+        assert not np.any(self.confidences < threshold)
+
+    def test_target_capped_at_the_full_model_accuracy(self):
+        full_correct = np.array([True, False, False, True, True, True])
+        threshold = calibrate_threshold(
+            self.confidences, self.small_correct, full_correct, 1.0
+        )
+        # The full model is only correct on 4 of the 6 images, which the small
+        # model reaches without escalating any of them
+        assert not np.any(self.confidences < threshold)
@@ -0,0 +1,38 @@
+import numpy as np
+
+from DeepClassifier.components.compression import (
+    cluster_weights,
+    get_pruning_mask,
+    load_compressed_model,
+    save_compressed_model,
+)
+
+
+class Test_get_pruning_mask:
+    def test_prunes_the_smallest_weights(self):
+        weights = np.array([[0.5, -0.1], [0.05, -2.0]])
+        mask = get_pruning_mask(weights, sparsity=0.5)
+        np.testing.assert_array_equal(mask, [[True, False], [False, True]])
+
+
+class Test_compressed_model:
+    def test_save_and_load(self, tmp_path, make_model):
+        model = make_model(filters=16)
+        for layer in model.layers:
+            if hasattr(layer, "kernel"):
+                kernel = layer.kernel.numpy()
+                mask = get_pruning_mask(kernel, sparsity=0.75)
+                indices, centroids = cluster_weights(kernel[mask], clusters=8)
+                kernel[~mask] = 0
+                kernel[mask] = centroids[indices]
+                layer.kernel.assign(kernel)
+
+        path = tmp_path / "model.npz"
+        save_compressed_model(model=model, path=path)
+        loaded_model = load_compressed_model(path=path)
+
+        for expected, actual in zip(model.get_weights(), loaded_model.get_weights()):
+            np.testing.assert_array_equal(actual, expected)
+        conv_kernel = loaded_model.layers[1].kernel.numpy()
+        assert np.mean(conv_kernel == 0) == 0.75
+        assert len(np.unique(conv_kernel)) <= 9
@@ -0,0 +1,60 @@
+import pytest
+import yaml
+
+from DeepClassifier.config import ConfigurationManager
+
+
+def _write_files(tmp_path, tuning=None, params=None):
+    config_file_path = tmp_path / "config.yaml"
+    config_file_path.write_text(
+        yaml.safe_dump({"artifacts_root": str(tmp_path / "artifacts")})
+    )
+    params_file_path = tmp_path / "params.yaml"
+    params_file_path.write_text(
+        yaml.safe_dump(
+            {
+                "BATCH_SIZE": 16,
+                "INTRA_OP_THREADS": 0,
+                "INTER_OP_THREADS": 0,
+                **(params or {}),
+            }
+        )
+    )
+    tuning_file_path = tmp_path / "tuning.yaml"
+    if tuning is not None:
+        tuning_file_path.write_text(yaml.safe_dump(tuning))
+    return ConfigurationManager(
+        config_file_path=config_file_path,
+        params_file_path=params_file_path,
+        tuning_file_path=tuning_file_path,
+    )
+
+
+class Test_tuned_params:
+    def test_without_tuning_file(self, tmp_path):
+        config = _write_files(tmp_path)
+        assert config._get_tuned_params(mode="training").BATCH_SIZE == 16
+        assert config._get_tuned_params(mode="inference").BATCH_SIZE == 16
+
+    def test_with_tuning_file(self, tmp_path):
+        tuned = {"BATCH_SIZE": 32, "INTRA_OP_THREADS": 8, "INTER_OP_THREADS": 2}
+        config = _write_files(
+            tmp_path,
+            tuning={
+                "training": {"params": tuned},
+                "inference": {"params": {**tuned, "BATCH_SIZE": 64}},
+            },
+        )
+        training_params = config._get_tuned_params(mode="training")
+        assert training_params.BATCH_SIZE == 32
+        assert training_params.INTRA_OP_THREADS == 8
+        assert config._get_tuned_params(mode="inference").BATCH_SIZE == 64
+        # The params.yaml values are not modified
+        assert config.params.BATCH_SIZE == 16
+
+
+class Test_get_training_config:
+    def test_unknown_sampling(self, tmp_path):
+        config = _write_files(tmp_path, params={"SAMPLING": "hard_examples"})
+        with pytest.raises(ValueError):
+            config.get_training_config()
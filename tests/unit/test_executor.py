@@ -0,0 +1,80 @@
+import sys
+import yaml
+
+from pathlib import Path
+
+from DeepClassifier.pipeline.executor import PipelineExecutor
+
+
+def _write_pipeline(tmp_path, fail_b=False):
+    python = sys.executable
+    stages = {
+        "a": {
+            "cmd": f"{python} -c \"open('a.txt', 'w').write('a')\"",
+            "deps": ["input.txt"],
+            "outs": ["a.txt"],
+        },
+        "b": {
+            "cmd": (
+                f'{python} -c "raise SystemExit(1)"'
+                if fail_b
+                else f"{python} -c \"open('b.txt', 'w').write('b')\""
+            ),
+            "params": ["VALUE"],
+            "outs": ["b.txt"],
+        },
+        "c": {
+            "cmd": f"{python} -c \"open('c.txt', 'w').write('c')\"",
+            "deps": ["a.txt", "b.txt"],
+            "metrics": [{"c.txt": {"cache": False}}],
+        },
+    }
+    (tmp_path / "dvc.yaml").write_text(yaml.safe_dump({"stages": stages}))
+    (tmp_path / "params.yaml").write_text(yaml.safe_dump({"VALUE": 1}))
+    (tmp_path / "input.txt").write_text("input")
+
+
+def _run() -> dict:
+    executor = PipelineExecutor(
+        dvc_file_path=Path("dvc.yaml"),
+        params_file_path=Path("params.yaml"),
+        state_file_path=Path("state.json"),
+    )
+    results = executor.run(jobs=2)
+    return {name: result["status"] for name, result in results.items()}
+
+
+class Test_PipelineExecutor:
+    def test_graph(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write_pipeline(tmp_path)
+        executor = PipelineExecutor(
+            dvc_file_path=Path("dvc.yaml"), state_file_path=Path("state.json")
+        )
+        assert executor.upstream == {"a": [], "b": [], "c": ["a", "b"]}
+
+    def test_skip_and_rerun(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write_pipeline(tmp_path)
+        assert _run() == {"a": "ran", "b": "ran", "c": "ran"}
+        assert _run() == {"a": "skipped", "b": "skipped", "c": "skipped"}
+
+        # Changing a param reruns its stage, but not the independent one. The
+        # rerun writes the same b.txt, so the downstream stage is skipped, as
+        # the hashes of its deps did not change
+        (tmp_path / "params.yaml").write_text(yaml.safe_dump({"VALUE": 2}))
+        assert _run() == {"a": "skipped", "b": "ran", "c": "skipped"}
+
+        # Changing a dep reruns its stage. The downstream stage is skipped by
+        # the content hash, as the rerun writes the same a.txt
+        (tmp_path / "input.txt").write_text("new input")
+        assert _run() == {"a": "ran", "b": "skipped", "c": "skipped"}
+
+        # Changing an out reruns the stage that writes it
+        (tmp_path / "a.txt").write_text("changed")
+        assert _run()["a"] == "ran"
+
+    def test_failed_stage(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        _write_pipeline(tmp_path, fail_b=True)
+        assert _run() == {"a": "ran", "b": "failed", "c": "not run"}
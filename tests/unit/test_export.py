@@ -0,0 +1,46 @@
+import numpy as np
+import tensorflow as tf
+
+from PIL import Image
+
+from DeepClassifier.components.export import save_bundle
+from DeepClassifier.components.image_loading import load_image
+
+
+class Test_save_bundle:
+    def test_preprocessing_in_the_graph(self, tmp_path, make_model):
+        model = make_model(optimizer="adam")
+        save_bundle(model=model, image_size=[8, 8, 3], path=tmp_path / "bundle")
+        bundle = tf.saved_model.load(str(tmp_path / "bundle"))
+
+        rng = np.random.default_rng(0)
+        pixels = rng.integers(0, 256, size=(2, 8, 8, 3), dtype=np.uint8)
+        probabilities = bundle.signatures["serving_default"](tf.constant(pixels))
+        np.testing.assert_allclose(
+            probabilities["probabilities"].numpy(),
+            model.predict(pixels / 255.0, verbose=0),
+            atol=1e-6,
+        )
+
+        # A larger JPEG image is resized in the graph as by the training data
+        path = tmp_path / "image.jpg"
+        Image.fromarray(pixels[0]).resize((32, 24)).save(path, quality=95)
+        with open(path, "rb") as f:
+            probabilities = bundle.signatures["serving_jpeg"](tf.constant([f.read()]))
+        image = load_image(path=path, image_size=[8, 8, 3], scaled_decoding=False)
+        np.testing.assert_allclose(
+            probabilities["probabilities"].numpy(),
+            model.predict(image[np.newaxis], verbose=0),
+            atol=1e-2,
+        )
+
+    def test_no_optimizer_state(self, tmp_path, make_model):
+        model = make_model(optimizer="adam")
+        model.fit(np.zeros((2, 8, 8, 3)), np.eye(2), verbose=0)
+        save_bundle(model=model, image_size=[8, 8, 3], path=tmp_path / "bundle")
+        # Only the weights of the model are saved, without the Adam slots
+        variables = tf.train.list_variables(
+            str(tmp_path / "bundle" / "variables" / "variables")
+        )
+        saved = [name for name, _ in variables if name.endswith("VARIABLE_VALUE")]
+        assert len(saved) == len(model.weights)
@@ -0,0 +1,54 @@
+import numpy as np
+import tensorflow as tf
+
+from PIL import Image
+
+from DeepClassifier.components.image_loading import ImageListSequence
+from DeepClassifier.components.hard_example_sampling import HardExampleSequence
+
+
+def _images(tmp_path, number_of_images: int) -> ImageListSequence:
+    paths = []
+    for index in range(number_of_images):
+        path = tmp_path / f"{index}.png"
+        Image.fromarray(np.full((4, 4, 3), index, dtype=np.uint8)).save(path)
+        paths.append(path)
+    return ImageListSequence(
+        paths=paths,
+        labels=np.eye(2)[np.arange(number_of_images) % 2],
+        datagen=tf.keras.preprocessing.image.ImageDataGenerator(),
+        image_size=[4, 4, 3],
+        batch_size=2,
+        scaled_decoding=False,
+        shuffle=False,
+    )
+
+
+class Test_HardExampleSequence:
+    def test_warmup_covers_every_sample(self, tmp_path):
+        loss_table = tf.Variable(np.full(10, np.log(2), dtype=np.float32))
+        sequence = HardExampleSequence(
+            images=_images(tmp_path, number_of_images=10),
+            loss_table=loss_table,
+            fraction=0.3,
+            uniform_mix=0.2,
+            warmup_epochs=1,
+        )
+        assert len(sequence) == 1
+
+        # 2 samples per epoch, so the warm-up lasts 5 epochs instead of 1
+        drawn = []
+        for _ in range(5):
+            assert np.all(sequence.importance_weights == 1)
+            (images, sample_ids), labels, _ = sequence[0]
+            # The images are loaded by their index
+            np.testing.assert_array_equal(images[:, 0, 0, 0], sample_ids)
+            np.testing.assert_array_equal(labels, np.eye(2)[sample_ids % 2])
+            drawn.extend(sample_ids)
+            sequence.on_epoch_end()
+        assert sorted(drawn) == list(range(10))
+
+        # Weighted by the loss once every sample was drawn
+        loss_table.assign(np.eye(10, dtype=np.float32)[3] * 10)
+        sequence.on_epoch_end()
+        assert not np.all(sequence.importance_weights == 1)
@@ -0,0 +1,89 @@
+import os
+import numpy as np
+import tensorflow as tf
+
+from PIL import Image
+
+from DeepClassifier.components.image_loading import (
+    ImageListSequence,
+    ScaledDirectorySequence,
+    flow_from_directory,
+)
+
+
+class Test_ImageListSequence:
+    def _sequence(self, tmp_path, shuffle):
+        paths = []
+        for index in range(5):
+            path = tmp_path / f"{index}.png"
+            Image.fromarray(np.full((12, 10, 3), index * 50, dtype=np.uint8)).save(path)
+            paths.append(path)
+        return ImageListSequence(
+            paths=paths,
+            labels=np.eye(5),
+            datagen=tf.keras.preprocessing.image.ImageDataGenerator(rescale=1.0 / 255),
+            image_size=[8, 8, 3],
+            batch_size=2,
+            scaled_decoding=False,
+            shuffle=shuffle,
+        )
+
+    def test_batches_in_order(self, tmp_path):
+        sequence = self._sequence(tmp_path, shuffle=False)
+        assert len(sequence) == 3
+        batches = [sequence[index] for index in range(len(sequence))]
+        assert [len(images) for images, _ in batches] == [2, 2, 1]
+        images = np.concatenate([images for images, _ in batches])
+        labels = np.concatenate([labels for _, labels in batches])
+        assert images.shape == (5, 8, 8, 3)
+        np.testing.assert_allclose(images[:, 0, 0, 0], np.arange(5) * 50 / 255)
+        np.testing.assert_array_equal(labels, np.eye(5))
+
+    def test_shuffled_epoch_covers_every_image_once(self, tmp_path):
+        sequence = self._sequence(tmp_path, shuffle=True)
+        for _ in range(2):
+            labels = np.concatenate([sequence[i][1] for i in range(len(sequence))])
+            np.testing.assert_array_equal(labels.sum(axis=0), np.ones(5))
+            # The images stay paired with their labels
+            images = np.concatenate([sequence[i][0] for i in range(len(sequence))])
+            np.testing.assert_allclose(
+                images[:, 0, 0, 0], np.argmax(labels, axis=1) * 50 / 255
+            )
+            sequence.on_epoch_end()
+
+
+class Test_flow_from_directory:
+    def _generator(self, tmp_path, scaled_decoding, class_mode="categorical"):
+        for label in ["a", "b"]:
+            os.makedirs(tmp_path / label, exist_ok=True)
+            for index in range(3):
+                Image.fromarray(np.full((12, 10, 3), index * 50, dtype=np.uint8)).save(
+                    tmp_path / label / f"{index}.png"
+                )
+        return flow_from_directory(
+            datagen=tf.keras.preprocessing.image.ImageDataGenerator(rescale=1.0 / 255),
+            directory=tmp_path,
+            scaled_decoding=scaled_decoding,
+            target_size=(8, 8),
+            batch_size=4,
+            interpolation="bilinear",
+            class_mode=class_mode,
+            shuffle=False,
+        )
+
+    def test_scaled_decoding_matches_the_iterator(self, tmp_path):
+        iterator = self._generator(tmp_path, scaled_decoding=False)
+        sequence = self._generator(tmp_path, scaled_decoding=True)
+        assert isinstance(sequence, ScaledDirectorySequence)
+        assert len(sequence) == len(iterator) == 2
+        assert sequence.samples == iterator.samples
+        assert sequence.filenames == iterator.filenames
+        assert sequence.class_indices == iterator.class_indices
+        for index in range(len(iterator)):
+            # PNG images are decoded at full resolution either way
+            for expected, actual in zip(iterator[index], sequence[index]):
+                np.testing.assert_allclose(actual, expected)
+
+    def test_without_labels(self, tmp_path):
+        sequence = self._generator(tmp_path, scaled_decoding=True, class_mode=None)
+        assert sequence[0].shape == (4, 8, 8, 3)
@@ -0,0 +1,41 @@
+import sys
+import subprocess
+
+import pytest
+
+# Modules that do not need TensorFlow and must therefore never import it
+modules_without_tensorflow = [
+    "DeepClassifier",
+    "DeepClassifier.utils",
+    "DeepClassifier.entities",
+    "DeepClassifier.config",
+    "DeepClassifier.components",
+    "DeepClassifier.components.data_ingestion",
+    "DeepClassifier.pipeline.stage_01_data_ingestion",
+    "DeepClassifier.pipeline.executor",
+]
+
+
+def _import_in_new_process(module: str, cwd):
+    """Imports a module in a new Python process, and checks that it did not
+    import TensorFlow.
+    """
+    code = f"import sys\nimport {module}\nsys.exit(int('tensorflow' in sys.modules))\n"
+    # Running in `cwd`, since importing `DeepClassifier` creates the 'logs'
+    # directory
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True
+    )
+    assert result.returncode == 0, f"Importing '{module}' imported TensorFlow"
+
+
+@pytest.mark.parametrize("module", modules_without_tensorflow)
+def test_import_does_not_import_tensorflow(module, tmp_path):
+    _import_in_new_process(module=module, cwd=tmp_path)
+
+
+def test_components_lazy_access_unknown_name():
+    import DeepClassifier.components as components
+
+    with pytest.raises(AttributeError):
+        components.UnknownComponent
@@ -0,0 +1,96 @@
+import os
+
+from DeepClassifier.components.incremental_training import (
+    build_training_manifest,
+    should_promote,
+    split_images,
+)
+
+
+class Test_split_images:
+    ingestion_dir = os.path.join("artifacts", "data_ingestion")
+    ingestion_manifest = {
+        "PetImages/Cat/0.jpg": "aaaaaaaa-10",
+        "PetImages/Cat/1.jpg": "bbbbbbbb-20",
+        "PetImages/Cat/2.jpg": "cccccccc-31",
+        "PetImages/Dog/0.jpg": "dddddddd-40",
+        "PetImages/Dog/1.jpg": "eeeeeeee-50",
+    }
+    training_manifest = {
+        "trained": {
+            "PetImages/Cat/1.jpg": "bbbbbbbb-20",
+            "PetImages/Cat/2.jpg": "cccccccc-30",
+            "PetImages/Dog/1.jpg": "eeeeeeee-50",
+        },
+        "validation": {
+            "PetImages/Cat/0.jpg": "aaaaaaaa-10",
+            "PetImages/Dog/0.jpg": "dddddddd-40",
+        },
+    }
+
+    def _paths(self, ingestion_dir):
+        # The paths of the generators, under the training data directory
+        return [
+            os.path.join(ingestion_dir, "PetImages", class_name, filename)
+            for class_name, filename in [
+                ("Cat", "0.jpg"),
+                ("Cat", "1.jpg"),
+                ("Cat", "2.jpg"),
+                ("Cat", "3.jpg"),
+                ("Dog", "0.jpg"),
+                ("Dog", "1.jpg"),
+            ]
+        ]
+
+    def test_new_changed_unchanged_and_validation_images(self):
+        new_images, old_images, validation_images = split_images(
+            paths=self._paths(self.ingestion_dir),
+            ingestion_dir=self.ingestion_dir,
+            ingestion_manifest=self.ingestion_manifest,
+            training_manifest=self.training_manifest,
+        )
+        # Cat/2.jpg changed and Cat/3.jpg was never trained on
+        assert new_images.tolist() == [2, 3]
+        assert old_images.tolist() == [1, 5]
+        # Pinned, even though Cat/0.jpg and Dog/0.jpg could now fall in the
+        # training subset of the split
+        assert validation_images.tolist() == [0, 4]
+
+    def test_paths_normalised_against_the_ingestion_dir(self):
+        # E.g., `./artifacts/data_ingestion/PetImages/...` on the generators
+        new_images, old_images, validation_images = split_images(
+            paths=self._paths(os.path.join(".", self.ingestion_dir)),
+            ingestion_dir=self.ingestion_dir + os.sep,
+            ingestion_manifest=self.ingestion_manifest,
+            training_manifest=self.training_manifest,
+        )
+        assert new_images.tolist() == [2, 3]
+        assert old_images.tolist() == [1, 5]
+        assert validation_images.tolist() == [0, 4]
+
+
+class Test_build_training_manifest:
+    def test_trained_and_validation_images(self):
+        ingestion_dir = os.path.join("artifacts", "data_ingestion")
+        manifest = build_training_manifest(
+            ingestion_manifest={
+                "PetImages/Cat/0.jpg": "a-1",
+                "PetImages/Dog/0.jpg": "b-2",
+            },
+            trained_paths=[os.path.join(ingestion_dir, "PetImages", "Cat", "0.jpg")],
+            validation_paths=[os.path.join(ingestion_dir, "PetImages", "Dog", "0.jpg")],
+            ingestion_dir=ingestion_dir,
+        )
+        assert manifest == {
+            "trained": {"PetImages/Cat/0.jpg": "a-1"},
+            "validation": {"PetImages/Dog/0.jpg": "b-2"},
+        }
+
+
+class Test_should_promote:
+    def test_promote_or_keep(self):
+        current = {"loss": 0.4, "accuracy": 0.90}
+        assert should_promote(current, {"loss": 0.3, "accuracy": 0.92}, 0.0)
+        assert should_promote(current, {"loss": 0.4, "accuracy": 0.90}, 0.0)
+        assert not should_promote(current, {"loss": 0.5, "accuracy": 0.89}, 0.0)
+        assert should_promote(current, {"loss": 0.5, "accuracy": 0.89}, 0.02)
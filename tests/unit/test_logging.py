@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import subprocess
+
+
+def test_event_stream(tmp_path):
+    code = (
+        "from DeepClassifier import event_stream, log_event\n"
+        "with event_stream('Test Stage'):\n"
+        "    log_event('test_event', value=1)\n"
+    )
+    # Running in `tmp_path`, since the logs are written relative to the current
+    # directory
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={**os.environ, "DEEPCLASSIFIER_LOG_EVENTS": "1"},
+        check=True,
+    )
+
+    with open(tmp_path / "logs" / "events" / "test_stage.jsonl") as f:
+        events = [json.loads(line) for line in f]
+    assert [event["event"] for event in events] == [
+        "stage_started",
+        "test_event",
+        "stage_completed",
+    ]
+    assert events[1]["value"] == 1
+    assert "test_event: value=1" in (tmp_path / "logs" / "running_logs.log").read_text()
+
+
+def test_flush_logs(tmp_path):
+    code = (
+        "from DeepClassifier import logger, flush_logs\n"
+        "logger.info('flushed record')\n"
+        "flush_logs()\n"
+        "with open('logs/running_logs.log') as f:\n"
+        "    assert 'flushed record' in f.read()\n"
+        "logger.info('record after the flush')\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, check=True)
+    assert (
+        "record after the flush" in (tmp_path / "logs" / "running_logs.log").read_text()
+    )
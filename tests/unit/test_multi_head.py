@@ -0,0 +1,45 @@
+import numpy as np
+
+from DeepClassifier.entities import MultiHeadConfig
+from DeepClassifier.components.multi_head import MultiHeadEngine
+
+
+class Test_MultiHeadEngine:
+    def test_shared_backbone_runs_once(self, tmp_path, make_model):
+        models = {
+            "cat_dog": make_model(seed=0, head_seed=1),
+            "attribute": make_model(seed=0, head_seed=2, units=3),
+            "other": make_model(seed=3, head_seed=1),
+        }
+        for name, model in models.items():
+            model.save(tmp_path / f"{name}.h5")
+        engine = MultiHeadEngine(
+            config=MultiHeadConfig(
+                root_dir=tmp_path,
+                report_path=tmp_path / "report.json",
+                heads={name: tmp_path / f"{name}.h5" for name in models},
+                params_image_size=[8, 8, 3],
+                params_batch_size=4,
+                params_scaled_decoding=False,
+                params_benchmark_steps=1,
+                params_intra_op_threads=0,
+                params_inter_op_threads=0,
+            )
+        )
+        engine.load_models()
+
+        assert [list(group["heads"]) for group in engine.groups] == [
+            ["cat_dog", "attribute"],
+            ["other"],
+        ]
+        images = np.random.default_rng(0).random((4, 8, 8, 3), dtype=np.float32)
+        predictions = engine.predict(images)
+        for name, model in models.items():
+            np.testing.assert_allclose(
+                predictions[name], model.predict(images, verbose=0), rtol=1e-6
+            )
+
+        report = engine.report()
+        conv_macs = 6 * 6 * 4 * 3 * 3 * 3
+        assert report["separate"]["macs_per_image"] == 3 * conv_macs + 144 * 7
+        assert report["shared"]["macs_per_image"] == 2 * conv_macs + 144 * 7
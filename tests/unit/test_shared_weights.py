@@ -0,0 +1,88 @@
+import os
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from DeepClassifier.components.shared_weights import load_flat_model, save_flat_model
+
+
+class _DLPackCapsule:
+    """Wraps a DLPack capsule exported by TensorFlow for `np.from_dlpack`."""
+
+    def __init__(self, capsule) -> None:
+        self.capsule = capsule
+
+    def __dlpack__(self, stream=None):
+        return self.capsule
+
+    def __dlpack_device__(self):
+        return (1, 0)  # kDLCPU
+
+
+def _get_file_mappings(path) -> list:
+    """Returns the address ranges where a file is mapped in this process."""
+    mappings = []
+    with open("/proc/self/maps") as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) >= 6 and fields[5] == str(path):
+                start, end = (int(address, 16) for address in fields[0].split("-"))
+                mappings.append((start, end))
+    return mappings
+
+
+class Test_flat_model:
+    def test_save_and_load(self, tmp_path, make_model):
+        model = make_model(optimizer="sgd")
+        path = tmp_path / "model.flat"
+        save_flat_model(model=model, path=path)
+        loaded_model = load_flat_model(path=path)
+
+        images = np.random.default_rng(0).random((4, 8, 8, 3), dtype=np.float32)
+        labels = tf.keras.utils.to_categorical([0, 1, 0, 1], num_classes=2)
+        np.testing.assert_array_equal(
+            loaded_model.predict(images, verbose=0), model.predict(images, verbose=0)
+        )
+        np.testing.assert_allclose(
+            loaded_model.evaluate(images, labels, verbose=0),
+            model.evaluate(images, labels, verbose=0),
+        )
+
+    @pytest.mark.skipif(
+        not os.path.exists("/proc/self/maps"), reason="/proc is not available"
+    )
+    def test_weights_are_shared_with_the_file(self, tmp_path, make_model):
+        path = tmp_path / "model.flat"
+        save_flat_model(model=make_model(optimizer="sgd"), path=path)
+        loaded_model = load_flat_model(path=path, compile=False)
+        assert loaded_model.optimizer is None
+
+        # Each variable reads its values from the pages of the file, rather
+        # than from a private copy
+        mappings = _get_file_mappings(path)
+        for variable in loaded_model.weights:
+            weight = np.from_dlpack(
+                _DLPackCapsule(tf.experimental.dlpack.to_dlpack(variable.value()))
+            )
+            assert any(
+                start <= weight.ctypes.data < end for start, end in mappings
+            ), variable.name
+
+    def test_file_is_not_modified_by_training(self, tmp_path, make_model):
+        path = tmp_path / "model.flat"
+        save_flat_model(model=make_model(optimizer="sgd"), path=path)
+        file_content = path.read_bytes()
+
+        loaded_model = load_flat_model(path=path)
+        loaded_model.fit(
+            np.ones((4, 8, 8, 3), dtype=np.float32),
+            tf.keras.utils.to_categorical([0, 1, 0, 1], num_classes=2),
+            verbose=0,
+        )
+        assert path.read_bytes() == file_content
+
+    def test_not_a_flat_weights_file(self, tmp_path, make_model):
+        path = tmp_path / "model.h5"
+        make_model(optimizer="sgd").save(path)
+        with pytest.raises(ValueError):
+            load_flat_model(path=path)
@@ -0,0 +1,48 @@
+import json
+import time
+
+from DeepClassifier.utils import telemetry
+from DeepClassifier.utils.telemetry import monitor_resources
+
+
+class Test_monitor_resources:
+    def test_busy_stage(self, tmp_path):
+        path = tmp_path / "busy.json"
+        with monitor_resources("Busy", path=path, interval=0.05, idle_cpu_fraction=0.1):
+            end_time = time.perf_counter() + 0.5
+            while time.perf_counter() < end_time:
+                pass
+            (tmp_path / "data.bin").write_bytes(b"x" * 1024**2)
+
+        with open(path) as f:
+            summary = json.load(f)
+        assert summary["stage"] == "Busy"
+        assert summary["cpu_seconds"] > 0.2
+        assert not summary["cpu_idle"]
+        assert summary["rss_mb"]["peak"] >= summary["rss_mb"]["mean"] > 0
+        assert len(summary["timeline"]) >= 5
+        if summary["io"]["write_mb_with_page_cache"] is not None:
+            assert summary["io"]["write_mb_with_page_cache"] >= 1
+
+    def test_idle_stage_is_flagged(self, tmp_path):
+        path = tmp_path / "idle.json"
+        with monitor_resources("Idle", path=path, interval=0.05):
+            time.sleep(0.3)
+
+        with open(path) as f:
+            summary = json.load(f)
+        assert summary["available"] and summary["cpu_idle"]
+
+    def test_no_proc(self, tmp_path, monkeypatch):
+        def _read_status():
+            raise FileNotFoundError("/proc/self/status")
+
+        monkeypatch.setattr(telemetry, "_read_status", _read_status)
+        path = tmp_path / "no_proc.json"
+        with monitor_resources("No proc", path=path) as monitor:
+            ran = True
+        assert ran and monitor is None
+        with open(path) as f:
+            summary = json.load(f)
+        assert summary["stage"] == "No proc" and not summary["available"]
+        assert summary["rss_mb"]["peak"] is None
@@ -0,0 +1,52 @@
+import numpy as np
+import tensorflow as tf
+
+from DeepClassifier.components.training_models import GradientAccumulationModel
+
+
+class Test_GradientAccumulationModel:
+    def test_same_update_as_a_larger_batch(self, make_model):
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=(8, 4)).astype("float32")
+        y = tf.keras.utils.to_categorical(rng.integers(0, 2, size=8), num_classes=2)
+
+        large_batch_model = make_model(
+            input_shape=(4,),
+            filters=None,
+            optimizer=tf.keras.optimizers.SGD(learning_rate=0.1),
+        )
+        large_batch_model.fit(x, y, batch_size=8, epochs=1, shuffle=False, verbose=0)
+
+        micro_batch_model = make_model(
+            input_shape=(4,),
+            filters=None,
+            optimizer=tf.keras.optimizers.SGD(learning_rate=0.1),
+        )
+        wrapper = GradientAccumulationModel(
+            model=micro_batch_model, accumulation_steps=4
+        )
+        wrapper.compile_like_wrapped_model()
+        wrapper.fit(x, y, batch_size=2, epochs=1, shuffle=False, verbose=0)
+
+        for expected, actual in zip(
+            large_batch_model.get_weights(), micro_batch_model.get_weights()
+        ):
+            np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-6)
+        assert int(micro_batch_model.optimizer.iterations) == 1
+
+    def test_no_update_before_the_last_micro_batch(self, make_model):
+        x = np.ones((6, 4), dtype="float32")
+        y = tf.keras.utils.to_categorical([0, 1, 0, 1, 0, 1], num_classes=2)
+
+        model = make_model(
+            input_shape=(4,),
+            filters=None,
+            optimizer=tf.keras.optimizers.SGD(learning_rate=0.1),
+        )
+        initial_weights = model.get_weights()
+        wrapper = GradientAccumulationModel(model=model, accumulation_steps=4)
+        wrapper.compile_like_wrapped_model()
+        wrapper.fit(x, y, batch_size=2, epochs=1, shuffle=False, verbose=0)
+
+        for expected, actual in zip(initial_weights, model.get_weights()):
+            np.testing.assert_array_equal(actual, expected)
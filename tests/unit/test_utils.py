@@ -4,7 +4,7 @@ from pathlib import Path
 from box import ConfigBox
 from ensure.main import EnsureError
 
-from DeepClassifier.utils import read_yaml
+from DeepClassifier.utils import read_yaml, get_file_hash, LogSummary
 
 
 class Test_read_yaml:
@@ -25,3 +25,33 @@ class Test_read_yaml:
     def test_read_yaml_bad_type(self, yaml_file_path):
         with pytest.raises(EnsureError):
             read_yaml(yaml_file_path)
+
+
+class Test_get_file_hash:
+    def test_get_file_hash_same_content(self, tmp_path):
+        file_1 = tmp_path / "file_1.bin"
+        file_2 = tmp_path / "file_2.bin"
+        file_1.write_bytes(b"DeepClassifier")
+        file_2.write_bytes(b"DeepClassifier")
+        assert get_file_hash(file_1) == get_file_hash(file_2)
+
+    def test_get_file_hash_different_content(self, tmp_path):
+        file_1 = tmp_path / "file_1.bin"
+        file_2 = tmp_path / "file_2.bin"
+        file_1.write_bytes(b"DeepClassifier")
+        file_2.write_bytes(b"DeepClassifier!")
+        assert get_file_hash(file_1) != get_file_hash(file_2)
+
+    def test_get_file_hash_bad_type(self):
+        with pytest.raises(EnsureError):
+            get_file_hash("tests/data/demo.yaml")
+
+
+class Test_LogSummary:
+    def test_log_summary_counts_and_examples(self):
+        summary = LogSummary(name="Test", examples=2)
+        for i in range(5):
+            summary.add("deleted", example=f"{i}.jpg")
+        summary.add("extracted")
+        assert summary.counts == {"deleted": 5, "extracted": 1}
+        assert summary.examples == {"deleted": ["0.jpg", "1.jpg"]}